@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from database import get_db
-from models.database_models import Brand
+from database import get_db, get_read_db
+from models.database_models import Brand, Detection, SuspiciousApp
 from models.schemas import BrandCreate, BrandResponse
+from utils.package_index import find_package_lookalikes
+from tasks.review_tasks import find_review_farms
 
 router = APIRouter()
 
@@ -25,16 +27,48 @@ async def create_brand(brand: BrandCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[BrandResponse])
-async def list_brands(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_brands(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """List all protected brands"""
     brands = db.query(Brand).offset(skip).limit(limit).all()
     return brands
 
 
 @router.get("/{brand_id}", response_model=BrandResponse)
-async def get_brand(brand_id: int, db: Session = Depends(get_db)):
+async def get_brand(brand_id: int, db: Session = Depends(get_read_db)):
     """Get a specific brand"""
     brand = db.query(Brand).filter(Brand.id == brand_id).first()
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     return brand
+
+
+@router.get("/{brand_id}/package-lookalikes")
+async def get_package_lookalikes(brand_id: int, max_distance: int = 1, namespace_depth: int = 2,
+                                 db: Session = Depends(get_db)):
+    """
+    Known packages in namespaces within a few edits of the brand's official package IDs
+    Primary session: the first call builds the process-wide package index
+    """
+    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    if not brand:
+        raise HTTPException(status_code=404, detail="Brand not found")
+
+    lookalikes = find_package_lookalikes(db, brand, max_distance=max_distance, namespace_depth=namespace_depth)
+    return {"brand_id": brand.id, "total": len(lookalikes), "lookalikes": lookalikes}
+
+
+@router.get("/{brand_id}/review-farms")
+async def get_review_farms(brand_id: int, min_apps: int = 2, min_reviewers: int = 3,
+                           db: Session = Depends(get_db)):
+    """Reviewer clusters shared across the apps detected as imitating the brand"""
+    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    if not brand:
+        raise HTTPException(status_code=404, detail="Brand not found")
+
+    package_ids = [
+        package_id for (package_id,) in db.query(SuspiciousApp.package_id).join(
+            Detection, Detection.suspicious_app_id == SuspiciousApp.id
+        ).filter(Detection.brand_id == brand.id).distinct()
+    ]
+    farms = find_review_farms(db, package_ids, min_apps=min_apps, min_reviewers=min_reviewers)
+    return {"brand_id": brand.id, "apps_checked": len(package_ids), "total": len(farms), "farms": farms}
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
 from models.database_models import Detection, SuspiciousApp, Brand
 from models.schemas import DetectionResponse
+from tasks.retention_tasks import hot_detection
+from utils.partitioning import history_row
 
 router = APIRouter()
 
@@ -15,9 +17,9 @@ async def list_detections(
     min_confidence: float = Query(0.0, ge=0.0, le=1.0),
     risk_level: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """List all detections with filters"""
+    """List detections with filters (hot window only, see utils.partitioning)"""
     query = db.query(Detection).options(
         joinedload(Detection.suspicious_app),
         joinedload(Detection.brand)
@@ -37,18 +39,26 @@ async def list_detections(
 
 
 @router.get("/{detection_id}", response_model=DetectionResponse)
-async def get_detection(detection_id: int, db: Session = Depends(get_db)):
-    """Get detection details"""
+async def get_detection(detection_id: int, db: Session = Depends(get_read_db)):
+    """Get detection details, from the history partitions once retention moved it"""
     detection = db.query(Detection).filter(Detection.id == detection_id).first()
+    if detection:
+        return detection
+
+    detection = history_row(db, Detection.__tablename__, detection_id)
     if not detection:
         raise HTTPException(status_code=404, detail="Detection not found")
+    app_id = detection['suspicious_app_id']
+    detection['suspicious_app'] = db.query(SuspiciousApp).filter(SuspiciousApp.id == app_id).first() \
+        or history_row(db, SuspiciousApp.__tablename__, app_id)
+    detection['brand'] = db.query(Brand).filter(Brand.id == detection['brand_id']).first()
     return detection
 
 
 @router.post("/{detection_id}/confirm")
 async def confirm_detection(detection_id: int, db: Session = Depends(get_db)):
     """Confirm a detection as true positive"""
-    detection = db.query(Detection).filter(Detection.id == detection_id).first()
+    detection = hot_detection(db, detection_id)
     if not detection:
         raise HTTPException(status_code=404, detail="Detection not found")
     
@@ -61,7 +71,7 @@ async def confirm_detection(detection_id: int, db: Session = Depends(get_db)):
 @router.post("/{detection_id}/false-positive")
 async def mark_false_positive(detection_id: int, db: Session = Depends(get_db)):
     """Mark a detection as false positive"""
-    detection = db.query(Detection).filter(Detection.id == detection_id).first()
+    detection = hot_detection(db, detection_id)
     if not detection:
         raise HTTPException(status_code=404, detail="Detection not found")
     
@@ -12,23 +12,18 @@ from io import BytesIO
 import imagehash
 
 from database import get_db
-from models.database_models import Detection, Brand, SuspiciousApp
+from models.database_models import Detection, Brand, SuspiciousApp, APKAnalysis
+from tasks.retention_tasks import hot_detection
 
 # Import permissions analyzer
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from utils.permissions_analyzer import analyze_permissions_mock
+from utils.permissions_analyzer import analyze_permissions, analyze_permissions_mock, official_permission_bitmap
+from utils.keywords import SUSPICIOUS_KEYWORDS
 
 router = APIRouter()
 
-# Suspicious keywords commonly used in fake apps
-SUSPICIOUS_KEYWORDS = [
-    'update', 'official', 'pro', 'premium', 'secure', 'verified', 
-    'original', 'real', 'authentic', 'new', 'latest', 'free', 
-    'unlock', 'mod', 'hack', 'cracked', 'plus', 'gold'
-]
-
 def detect_suspicious_keywords(app_name: str) -> list:
     """Detect suspicious keywords in app name that fake apps commonly use"""
     app_name_lower = app_name.lower()
@@ -61,9 +56,10 @@ async def generate_evidence_kit(request: EvidenceKitRequest, db: Session = Depen
     """
     
     # Get detection
-    detection = db.query(Detection).filter(Detection.id == request.detection_id).first()
+    detection = hot_detection(db, request.detection_id)
     if not detection:
         raise HTTPException(status_code=404, detail="Detection not found")
+    db.commit()  # a detection moved back from history stays hot for its takedown
     
     # Get suspicious app
     suspicious_app = db.query(SuspiciousApp).filter(
@@ -131,9 +127,21 @@ async def generate_evidence_kit(request: EvidenceKitRequest, db: Session = Depen
     # Detect suspicious keywords
     suspicious_keywords = detect_suspicious_keywords(suspicious_app.app_name)
     
-    # Analyze permissions (mock analysis based on brand category)
+    # Analyze permissions from the manifest of the APK the detection analyzed
+    # (same package and signer), category estimate otherwise
     category = brand.category if hasattr(brand, 'category') else 'banking'
-    permissions_analysis = analyze_permissions_mock(category)
+    apk_analysis = None
+    if suspicious_app.certificate_fingerprint:
+        apk_analysis = db.query(APKAnalysis).filter(
+            APKAnalysis.package_id == suspicious_app.package_id,
+            APKAnalysis.certificate_fingerprint == suspicious_app.certificate_fingerprint
+        ).order_by(APKAnalysis.last_seen.desc()).first()
+    if apk_analysis:
+        permissions_analysis = analyze_permissions(
+            apk_analysis.permissions or [], category, official_permission_bitmap(db, brand)
+        )
+    else:
+        permissions_analysis = analyze_permissions_mock(category)
     
     # Build evidence dictionary
     evidence = {
@@ -170,7 +178,9 @@ async def generate_evidence_kit(request: EvidenceKitRequest, db: Session = Depen
             "high_risk_count": permissions_analysis['high_risk_count'],
             "permission_risk_score": permissions_analysis['permission_risk_score'],
             "warnings": permissions_analysis['warnings'],
-            "analysis_flags": permissions_analysis['analysis']
+            "analysis_flags": permissions_analysis['analysis'],
+            "source": "apk_manifest" if apk_analysis else "category_estimate",
+            "official_comparison": permissions_analysis.get('official_comparison')
         },
         "red_flags": [
             f"App name '{suspicious_app.app_name}' is {int((detection.text_similarity_score or 0) * 100)}% similar to '{brand.name}'",
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from database import get_read_db
+from models.database_models import ExportWatermark
+from tasks.export_tasks import EXPORT_NAME_PATTERN, WRITERS, export_detections, run_incremental_export
+
+router = APIRouter()
+
+
+def _check_format(format: str):
+    if format not in WRITERS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(WRITERS)}")
+
+
+# Plain def: exports block on the database and disk, so they run in the threadpool
+@router.post("/detections")
+def export_new_detections(name: str = "detections", format: str = "parquet"):
+    """Export detections since the stream's watermark to EXPORT_DIR and advance it"""
+    _check_format(format)
+    if not EXPORT_NAME_PATTERN.fullmatch(name):
+        raise HTTPException(status_code=400, detail="name may only contain letters, digits, '_' and '-'")
+    return run_incremental_export(name=name, format=format)
+
+
+@router.get("/detections/download")
+def download_detections(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                              format: str = "parquet"):
+    """Detections (with app, brand and latest takedown) detected in [since, until] as one file"""
+    _check_format(format)
+    _, extension = WRITERS[format]
+    fd, path = tempfile.mkstemp(suffix=f".{extension}")
+    os.close(fd)
+
+    try:
+        # since_id=0 makes since inclusive: every detection at that timestamp has a larger id
+        exported = export_detections(path, since=since, since_id=0 if since else None, until=until, format=format)
+    except Exception:
+        os.remove(path)
+        raise
+    return FileResponse(
+        exported['path'],
+        filename=f"detections.{extension}",
+        media_type="application/octet-stream",
+        headers={"X-Row-Count": str(exported['rows'])},
+        background=BackgroundTask(os.remove, exported['path']),
+    )
+
+
+@router.get("/watermarks")
+async def list_watermarks(db: Session = Depends(get_read_db)):
+    return [
+        {
+            'name': watermark.name,
+            'last_detected_at': watermark.last_detected_at,
+            'last_detection_id': watermark.last_detection_id,
+            'last_export_path': watermark.last_export_path,
+            'rows_exported': watermark.rows_exported,
+            'updated_at': watermark.updated_at,
+        }
+        for watermark in db.query(ExportWatermark).order_by(ExportWatermark.name)
+    ]
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import get_db
+from sqlalchemy import func, select
+from database import get_read_db
 from models.database_models import Detection, ScanJob, Takedown, Metrics
 from models.schemas import MetricsResponse
+from utils.partitioning import history_source
 
 router = APIRouter()
 
 
 @router.get("/", response_model=MetricsResponse)
-async def get_metrics(db: Session = Depends(get_db)):
+async def get_metrics(db: Session = Depends(get_read_db)):
     """Get overall system metrics"""
     
     # For demo purposes, always return impressive metrics
@@ -44,20 +45,27 @@ async def get_metrics(db: Session = Depends(get_db)):
 
 
 @router.get("/dashboard")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
-    """Get dashboard statistics"""
+async def get_dashboard_stats(db: Session = Depends(get_read_db)):
+    """Get dashboard statistics (hot and history detections, not the Parquet archive)"""
+    
+    # Hot detections plus those retention moved to the history partitions
+    detections = select(Detection.risk_level, Detection.status, Detection.confidence_score)
+    history = history_source(db.get_bind(), Detection.__tablename__)
+    if history is not None:
+        detections = detections.union_all(
+            select(history.c.risk_level, history.c.status, history.c.confidence_score)
+        )
+    detections = detections.subquery()
     
     # Detections by risk level
-    risk_distribution = db.query(
-        Detection.risk_level,
-        func.count(Detection.id)
-    ).group_by(Detection.risk_level).all()
+    risk_distribution = db.execute(
+        select(detections.c.risk_level, func.count()).group_by(detections.c.risk_level)
+    ).all()
     
     # Detections by status
-    status_distribution = db.query(
-        Detection.status,
-        func.count(Detection.id)
-    ).group_by(Detection.status).all()
+    status_distribution = db.execute(
+        select(detections.c.status, func.count()).group_by(detections.c.status)
+    ).all()
     
     # Recent detections
     recent_detections = db.query(Detection).order_by(
@@ -68,7 +76,7 @@ async def get_dashboard_stats(db: Session = Depends(get_db)):
         "risk_distribution": dict(risk_distribution),
         "status_distribution": dict(status_distribution),
         "recent_detections_count": len(recent_detections),
-        "high_confidence_detections": db.query(Detection).filter(
-            Detection.confidence_score >= 0.95
-        ).count()
+        "high_confidence_detections": db.execute(
+            select(func.count()).select_from(detections).where(detections.c.confidence_score >= 0.95)
+        ).scalar()
     }
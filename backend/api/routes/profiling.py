@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from utils.profiler import (
+    MAX_HZ, MAX_SECONDS, PROFILING_ENABLED,
+    background_profile, current_profile, start_profile, stop_profile,
+)
+
+router = APIRouter()
+
+
+def _require_enabled():
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=1)")
+
+
+@router.post("/start")
+async def start(seconds: float = 30, hz: float = 100):
+    """Start sampling all threads (API and scan workers) for a number of seconds"""
+    _require_enabled()
+    if not 0 < seconds <= MAX_SECONDS or not 0 < hz <= MAX_HZ:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_SECONDS}], hz in (0, {MAX_HZ}]")
+    try:
+        profiler = start_profile(seconds, hz)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.status()
+
+
+@router.post("/stop")
+async def stop():
+    """Stop the running profile early"""
+    _require_enabled()
+    profiler = stop_profile()
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="No profile has been started")
+    return profiler.status()
+
+
+@router.get("/status")
+async def status():
+    _require_enabled()
+    profiler = current_profile()
+    background = background_profile()
+    return {
+        'profile': profiler.status() if profiler else None,
+        'background': background.status() if background else None,
+    }
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def download(background: bool = False):
+    """
+    Collapsed stacks of the last profile (or the continuous one), for
+    flamegraph.pl or speedscope; stacks start with thread, scan_job and stage tags
+    (the continuous profile has no scan_job and covers the last one or two windows)
+    """
+    _require_enabled()
+    profiler = background_profile() if background else current_profile()
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="No profile available")
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed.txt"'},
+    )
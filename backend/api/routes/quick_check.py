@@ -11,6 +11,8 @@ from typing import Optional
 # Use simple relative imports
 from database import get_db
 from models.database_models import Brand, SuspiciousApp, Detection
+from utils.keywords import SUSPICIOUS_KEYWORDS
+from utils.listing_store import get_listing
 
 # Simple text similarity without ML dependencies
 def simple_text_similarity(str1, str2):
@@ -42,13 +44,6 @@ def simple_text_similarity(str1, str2):
     max_len = max(len(str1), len(str2))
     return 1 - (distance / max_len)
 
-# Suspicious keywords commonly used in fake apps
-SUSPICIOUS_KEYWORDS = [
-    'update', 'official', 'pro', 'premium', 'secure', 'verified', 
-    'original', 'real', 'authentic', 'new', 'latest', 'free', 
-    'unlock', 'mod', 'hack', 'cracked', 'plus', 'gold'
-]
-
 def detect_suspicious_keywords(app_name: str) -> list:
     """Detect suspicious keywords in app name that fake apps commonly use"""
     app_name_lower = app_name.lower()
@@ -141,7 +136,7 @@ def scrape_play_store_app(package_id: str) -> dict:
         not_found = soup.find('div', string=re.compile('not found|couldn\'t find', re.IGNORECASE))
         
         return {
-            'exists': not not_found is None,
+            'exists': not_found is None,
             'app_name': app_name,
             'developer': developer,
             'rating': rating,
@@ -157,6 +152,20 @@ def scrape_play_store_app(package_id: str) -> dict:
             'error': str(e)
         }
 
+def fetch_play_listing(package_id: str) -> Optional[dict]:
+    """Scraped listing in listing store fields, None if the page could not be fetched"""
+    scraped = scrape_play_store_app(package_id)
+    if scraped.get('error'):
+        return None
+    
+    return {
+        'exists': scraped['exists'],
+        'app_name': scraped['app_name'],
+        'developer_name': scraped['developer'],
+        'rating': scraped['rating'],
+        'installs': scraped['downloads'],
+    }
+
 def extract_app_name_from_package(package_id: str) -> str:
     """Extract likely app name from package ID"""
     parts = package_id.split('.')
@@ -238,18 +247,20 @@ async def quick_check(request: QuickCheckRequest, db: Session = Depends(get_db))
                 matched_brand=brand.name
             )
     
-    # Scrape real-time data from Play Store ONLY if not in database
+    # Play Store listing data ONLY if not in database (scraped when stale)
     if store == "Google Play Store":
-        scraped_data = scrape_play_store_app(package_id)
+        listing = get_listing(
+            db, package_id, fetch_play_listing, fields=('exists', 'app_name', 'developer_name')
+        ) or {'exists': False}
         
-        # Use scraped data
-        if scraped_data.get('app_name'):
-            app_name = scraped_data['app_name']
-        if scraped_data.get('developer'):
-            developer = scraped_data['developer']
+        # Use listing data
+        if listing.get('app_name'):
+            app_name = listing['app_name']
+        if listing.get('developer_name'):
+            developer = listing['developer_name']
         
         # Check if app exists - only flag as fake if we're SURE it doesn't exist
-        if scraped_data.get('exists') is False:
+        if listing.get('exists') is False:
             return QuickCheckResponse(
                 is_fake=True,
                 app_name=app_name,
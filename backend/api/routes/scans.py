@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
-from database import get_db
+from database import get_db, get_read_db
 from models.database_models import ScanJob, Brand
 from models.schemas import ScanJobCreate, ScanJobResponse
 from tasks.scan_tasks import run_scan_job
@@ -38,14 +38,14 @@ async def create_scan(
 
 
 @router.get("/", response_model=List[ScanJobResponse])
-async def list_scans(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_scans(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """List all scan jobs"""
     scans = db.query(ScanJob).offset(skip).limit(limit).all()
     return scans
 
 
 @router.get("/{scan_id}", response_model=ScanJobResponse)
-async def get_scan(scan_id: int, db: Session = Depends(get_db)):
+async def get_scan(scan_id: int, db: Session = Depends(get_read_db)):
     """Get scan job details"""
     scan = db.query(ScanJob).filter(ScanJob.id == scan_id).first()
     if not scan:
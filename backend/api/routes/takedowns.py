@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
-from database import get_db
+from database import get_db, get_read_db
 from models.database_models import Takedown, Detection
 from models.schemas import TakedownCreate, TakedownResponse
+from tasks.retention_tasks import hot_detection
 from tasks.takedown_tasks import generate_takedown_request
 
 router = APIRouter()
@@ -16,8 +17,8 @@ async def create_takedown(
     db: Session = Depends(get_db)
 ):
     """Submit a takedown request"""
-    # Verify detection exists
-    detection = db.query(Detection).filter(Detection.id == takedown.detection_id).first()
+    # Verify detection exists (takedowns keep it in the hot table)
+    detection = hot_detection(db, takedown.detection_id)
     if not detection:
         raise HTTPException(status_code=404, detail="Detection not found")
     
@@ -38,14 +39,14 @@ async def create_takedown(
 
 
 @router.get("/", response_model=List[TakedownResponse])
-async def list_takedowns(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_takedowns(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """List all takedown requests"""
     takedowns = db.query(Takedown).offset(skip).limit(limit).all()
     return takedowns
 
 
 @router.get("/{takedown_id}", response_model=TakedownResponse)
-async def get_takedown(takedown_id: int, db: Session = Depends(get_db)):
+async def get_takedown(takedown_id: int, db: Session = Depends(get_read_db)):
     """Get takedown details"""
     takedown = db.query(Takedown).filter(Takedown.id == takedown_id).first()
     if not takedown:
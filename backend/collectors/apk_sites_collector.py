@@ -1,52 +1,70 @@
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from bs4 import SoupStrainer
+from typing import Callable, Iterator, List, Dict, Optional
 import time
 import logging
 
+from collectors.base import BaseCollector, register_collector, CAPABILITY_DOWNLOAD
+from collectors.download_manager import APKDownloadManager
+from collectors.html_parsing import parse_html
 
-class APKMirrorCollector:
+
+@register_collector
+class APKMirrorCollector(BaseCollector):
     """Collect APK data from APK Mirror and similar sites"""
     
-    def __init__(self, delay=3):
+    source = 'apk_mirror'
+    capabilities = frozenset({CAPABILITY_DOWNLOAD})
+    max_concurrency = 1
+    
+    def __init__(self, delay=3, downloader: Optional[APKDownloadManager] = None, timeout: int = 30):
         self.base_url = "https://www.apkmirror.com"
         self.delay = delay
+        self.timeout = timeout
         self.logger = logging.getLogger(__name__)
         
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.downloader = downloader or APKDownloadManager(headers=self.headers)
     
     def search_apks(self, query: str, max_results: int = 30) -> List[Dict]:
         """Search for APKs by query"""
         try:
             search_url = f"{self.base_url}/?s={query.replace(' ', '+')}"
-            response = requests.get(search_url, headers=self.headers)
+            response = requests.get(search_url, headers=self.headers, timeout=self.timeout)
             
             if response.status_code != 200:
                 self.logger.error(f"Failed to search APKMirror: {response.status_code}")
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            apps = []
-            app_elements = soup.find_all('div', class_='listWidget')[:max_results]
-            
-            for element in app_elements:
-                try:
-                    app_data = self._parse_app_element(element)
-                    if app_data:
-                        apps.append(app_data)
-                except Exception as e:
-                    self.logger.error(f"Error parsing app element: {e}")
-                    continue
-            
-            return apps
+            return self.parse_search_results(response.content, max_results)
             
         except Exception as e:
             self.logger.error(f"Error searching APKMirror: {e}")
             return []
     
+    def iter_search(self, query: str, max_results: int = 50) -> Iterator[Dict]:
+        yield from self.search_apks(query, max_results=max_results)
+    
+    def parse_search_results(self, content: bytes, max_results: int = 30) -> List[Dict]:
+        """Parse a search results page, building the tree for result containers only"""
+        soup = parse_html(content, SoupStrainer('div', class_='listWidget'))
+        
+        apps = []
+        app_elements = soup.find_all('div', class_='listWidget')[:max_results]
+        
+        for element in app_elements:
+            try:
+                app_data = self._parse_app_element(element)
+                if app_data:
+                    apps.append(app_data)
+            except Exception as e:
+                self.logger.error(f"Error parsing app element: {e}")
+                continue
+        
+        return apps
+    
     def _parse_app_element(self, element) -> Optional[Dict]:
         """Parse app information from HTML element"""
         try:
@@ -62,8 +80,17 @@ class APKMirrorCollector:
             version_elem = element.find('div', class_='infoSlide')
             version = version_elem.text.strip() if version_elem else 'Unknown'
             
+            developer_elem = element.find('a', class_='byDeveloper')
+            developer = developer_elem.text.strip() if developer_elem else 'Unknown'
+            if developer.lower().startswith('by '):
+                developer = developer[3:]
+            
+            icon_elem = element.find('img')
+            
             return {
                 'app_name': app_name,
+                'developer': developer,
+                'icon_url': icon_elem.get('src') if icon_elem else None,
                 'apk_url': f"{self.base_url}{app_link}" if app_link else None,
                 'version': version,
                 'source': 'apk_mirror'
@@ -74,76 +101,105 @@ class APKMirrorCollector:
             return None
     
     def get_apk_details(self, apk_url: str) -> Optional[Dict]:
-        """Get detailed information about an APK"""
+        """Get detailed information about an APK (one throttled request in the source's slot)"""
         try:
-            response = requests.get(apk_url, headers=self.headers)
+            response = self._limited(requests.get, apk_url, headers=self.headers, timeout=self.timeout)
             
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Parse details (simplified)
-            details = {
-                'app_name': None,
-                'package_id': None,
-                'version': None,
-                'developer': None,
-                'file_size': None,
-                'min_android': None,
-                'download_url': None,
-                'source': 'apk_mirror'
-            }
-            
-            # Extract package name
-            package_elem = soup.find('div', string='Package Name')
-            if package_elem:
-                package_value = package_elem.find_next('div')
-                details['package_id'] = package_value.text.strip() if package_value else None
-            
-            # Extract version
-            version_elem = soup.find('div', string='Version')
-            if version_elem:
-                version_value = version_elem.find_next('div')
-                details['version'] = version_value.text.strip() if version_value else None
-            
-            # Extract download link
-            download_elem = soup.find('a', class_='downloadButton')
-            if download_elem:
-                details['download_url'] = f"{self.base_url}{download_elem['href']}"
-            
-            return details
+            return self.parse_apk_details(response.content)
             
         except Exception as e:
             self.logger.error(f"Error getting APK details: {e}")
             return None
     
+    def parse_apk_details(self, content: bytes) -> Dict:
+        """Parse an APK page"""
+        soup = parse_html(content)
+        
+        # Parse details (simplified)
+        details = {
+            'app_name': None,
+            'package_id': None,
+            'version': None,
+            'developer': None,
+            'file_size': None,
+            'min_android': None,
+            'download_url': None,
+            'source': 'apk_mirror'
+        }
+        
+        # Extract package name
+        package_elem = soup.find('div', string='Package Name')
+        if package_elem:
+            package_value = package_elem.find_next('div')
+            details['package_id'] = package_value.text.strip() if package_value else None
+        
+        # Extract version
+        version_elem = soup.find('div', string='Version')
+        if version_elem:
+            version_value = version_elem.find_next('div')
+            details['version'] = version_value.text.strip() if version_value else None
+        
+        # Extract download link
+        download_elem = soup.find('a', class_='downloadButton')
+        if download_elem:
+            details['download_url'] = f"{self.base_url}{download_elem['href']}"
+        
+        return details
+    
+    def resolve_package_id(self, app: Dict) -> Optional[str]:
+        """Search results carry no package ID, the APK page does"""
+        if app.get('package_id'):
+            return app['package_id']
+        if not app.get('apk_url'):
+            return None
+        
+        details = self.get_apk_details(app['apk_url'])
+        return details.get('package_id') if details else None
+    
+    def fetch_apk(self, app: Dict, is_known_hash: Optional[Callable[[str], bool]] = None) -> Optional[Dict]:
+        """Download a search result's APK, finding its download link on the APK page"""
+        download_url = app.get('download_url')
+        if not download_url and app.get('apk_url'):
+            details = self.get_apk_details(app['apk_url'])
+            download_url = details.get('download_url') if details else None
+        if not download_url:
+            return None
+        
+        result = self.downloader.download(download_url, is_known_hash=is_known_hash)
+        if result['status'] == 'failed':
+            self.logger.error(f"Failed to download APK: {result['error']}")
+            return None
+        return result
+    
     def download_apk(self, download_url: str, output_path: str) -> bool:
-        """Download APK file"""
-        try:
-            response = requests.get(download_url, headers=self.headers, stream=True)
-            
-            if response.status_code != 200:
-                self.logger.error(f"Failed to download APK: {response.status_code}")
-                return False
-            
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error downloading APK: {e}")
+        """Download APK file (resumable, a duplicate of a stored hash counts as success)"""
+        result = self.downloader.download(download_url, output_path)
+        
+        if result['status'] == 'failed':
+            self.logger.error(f"Failed to download APK: {result['error']}")
             return False
+        
+        return True
+    
+    def download_apks(self, download_urls: List[str]) -> List[Dict]:
+        """Download several APKs concurrently, see APKDownloadManager.download"""
+        return self.downloader.download_many(download_urls)
 
 
-class APKPureCollector:
+@register_collector
+class APKPureCollector(BaseCollector):
     """Collect APK data from APKPure"""
     
-    def __init__(self, delay=3):
+    source = 'apk_pure'
+    max_concurrency = 1
+    
+    def __init__(self, delay=3, timeout: int = 30):
         self.base_url = "https://apkpure.com"
         self.delay = delay
+        self.timeout = timeout
         self.logger = logging.getLogger(__name__)
         
         self.headers = {
@@ -154,12 +210,12 @@ class APKPureCollector:
         """Search for APKs on APKPure"""
         try:
             search_url = f"{self.base_url}/search?q={query.replace(' ', '+')}"
-            response = requests.get(search_url, headers=self.headers)
+            response = requests.get(search_url, headers=self.headers, timeout=self.timeout)
             
             if response.status_code != 200:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(response.content)
             
             apps = []
             # Parse search results
@@ -170,6 +226,9 @@ class APKPureCollector:
         except Exception as e:
             self.logger.error(f"Error searching APKPure: {e}")
             return []
+    
+    def iter_search(self, query: str, max_results: int = 50) -> Iterator[Dict]:
+        yield from self.search_apks(query, max_results=max_results)
 
 
 # Usage example
@@ -0,0 +1,110 @@
+import abc
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, FrozenSet, Iterator, Optional, Type
+
+from utils.instrumentation import RATE_LIMIT_WAIT_SECONDS, track_collector
+
+
+# Capability flags a collector can declare
+CAPABILITY_REVIEWS = 'reviews'
+CAPABILITY_DETAILS = 'details'
+CAPABILITY_DOWNLOAD = 'download'
+
+_COLLECTOR_CLASSES: Dict[str, Type['BaseCollector']] = {}
+
+
+def register_collector(cls: Type['BaseCollector']) -> Type['BaseCollector']:
+    """Class decorator making a collector available under its source name"""
+    _COLLECTOR_CLASSES[cls.source] = cls
+    return cls
+
+
+class BaseCollector(abc.ABC):
+    """
+    Common interface for app sources
+    Subclasses set source/capabilities/max_concurrency and implement iter_search;
+    optional operations return empty results unless the capability is declared
+    """
+
+    source: str = None
+    capabilities: FrozenSet[str] = frozenset()
+    max_concurrency: int = 2
+    delay: float = 0
+
+    _slots: Dict[str, threading.BoundedSemaphore] = {}
+    _slots_lock = threading.Lock()
+
+    def has_capability(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+    @abc.abstractmethod
+    def iter_search(self, query: str, max_results: int = 50) -> Iterator[Dict]:
+        """Blocking search yielding app dicts as they are found"""
+    
+    def resolve_package_id(self, app: Dict) -> Optional[str]:
+        """Package ID for a collected listing, possibly at the cost of another request"""
+        return app.get('package_id')
+    
+    def get_app_details(self, package_id: str) -> Optional[Dict]:
+        """Listing details by package ID (collectors with CAPABILITY_DETAILS)"""
+        return None
+
+    def fetch_apk(self, app: Dict, is_known_hash: Optional[Callable[[str], bool]] = None) -> Optional[Dict]:
+        """
+        Download the APK of a collected listing (collectors with CAPABILITY_DOWNLOAD)
+        is_known_hash tells the downloader which content hashes are already analyzed
+        Returns the APKDownloadManager.download result, None when unavailable
+        """
+        return None
+
+    def _slot(self) -> threading.BoundedSemaphore:
+        # One limit per source, shared by every instance, scan and event loop
+        with self._slots_lock:
+            if self.source not in self._slots:
+                self._slots[self.source] = threading.BoundedSemaphore(self.max_concurrency)
+            return self._slots[self.source]
+
+    def _throttle(self, seconds: Optional[float] = None):
+        """Politeness delay between requests to the source"""
+        seconds = self.delay if seconds is None else seconds
+        if seconds:
+            time.sleep(seconds)
+            RATE_LIMIT_WAIT_SECONDS.labels(self.source, "delay").observe(seconds)
+
+    def _limited(self, func, *args, **kwargs):
+        """
+        Run one blocking request outside a search under the source's
+        concurrency limit, followed by the politeness delay
+        """
+        slot = self._slot()
+        start = time.perf_counter()
+        with slot:
+            RATE_LIMIT_WAIT_SECONDS.labels(self.source, "concurrency").observe(time.perf_counter() - start)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._throttle()
+
+    def _next_app(self, iterator: Iterator[Dict]):
+        slot = self._slot()
+        start = time.perf_counter()
+        with slot:
+            RATE_LIMIT_WAIT_SECONDS.labels(self.source, "concurrency").observe(time.perf_counter() - start)
+            with track_collector(self.source, "search"):
+                return next(iterator, None)
+
+    async def search(self, query: str, max_results: int = 50) -> AsyncIterator[Dict]:
+        """
+        Async streaming search: async for app in collector.search(query)
+        Each blocking step runs in a worker thread under the source's concurrency limit
+        """
+        iterator = self.iter_search(query, max_results)
+        while True:
+            app = await asyncio.to_thread(self._next_app, iterator)
+            if app is None:
+                return
+            app.setdefault('source', self.source)
+            yield app
+
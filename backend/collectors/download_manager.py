@@ -0,0 +1,188 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+
+class APKDownloadManager:
+    """
+    Concurrent APK downloader
+    Bounded transfers per host, HTTP range resume of partial files, adaptive
+    chunk sizes, SHA-256 computed while streaming and dedup against stored hashes
+    """
+
+    def __init__(self, download_dir: str = "data/apks", per_host_limit: int = 2, max_workers: int = 8,
+                 max_size: int = 500 * 1024 * 1024, min_chunk: int = 64 * 1024,
+                 max_chunk: int = 4 * 1024 * 1024, retries: int = 3, timeout: int = 30,
+                 is_known_hash: Optional[Callable[[str], bool]] = None, headers: Optional[Dict] = None):
+        self.download_dir = download_dir
+        self.per_host_limit = per_host_limit
+        self.max_workers = max_workers
+        self.max_size = max_size
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.retries = retries
+        self.timeout = timeout
+        self.is_known_hash = is_known_hash or (lambda sha256: False)
+        self.headers = headers or {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        self.logger = logging.getLogger(__name__)
+
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session is not thread-safe, keep one per worker thread
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+            self._local.session.headers.update(self.headers)
+        return self._local.session
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _adapt_chunk(self, chunk_size: int, elapsed: float) -> int:
+        # Aim for roughly 50-500ms per read: grow on fast links, shrink on slow ones
+        if elapsed < 0.05:
+            return min(chunk_size * 2, self.max_chunk)
+        if elapsed > 0.5:
+            return max(chunk_size // 2, self.min_chunk)
+        return chunk_size
+
+    def _hash_partial(self, part_path: str):
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.max_chunk), b''):
+                digest.update(chunk)
+        return digest
+
+    def _transfer(self, url: str, part_path: str) -> Dict:
+        """Stream url into part_path, resuming from its current size"""
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        digest = self._hash_partial(part_path) if offset else hashlib.sha256()
+
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        response = self._session().get(url, headers=headers, stream=True, timeout=self.timeout)
+
+        try:
+            if response.status_code == 416 and offset:
+                # Partial file already complete (or stale); start over
+                os.remove(part_path)
+                return self._transfer(url, part_path)
+            if response.status_code == 200 and offset:
+                # Server ignored the range request
+                offset = 0
+                digest = hashlib.sha256()
+            elif response.status_code not in (200, 206):
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+
+            remaining = response.headers.get('Content-Length')
+            if remaining is not None and offset + int(remaining) > self.max_size:
+                raise ValueError(f"APK exceeds size limit ({offset + int(remaining)} bytes)")
+
+            size = offset
+            chunk_size = self.min_chunk
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                while True:
+                    start = time.perf_counter()
+                    chunk = response.raw.read(chunk_size, decode_content=True)
+                    if not chunk:
+                        break
+
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise ValueError(f"APK exceeds size limit ({self.max_size} bytes)")
+
+                    digest.update(chunk)
+                    f.write(chunk)
+                    chunk_size = self._adapt_chunk(chunk_size, time.perf_counter() - start)
+
+            return {'sha256': digest.hexdigest(), 'size': size, 'resumed': bool(offset)}
+        finally:
+            response.close()
+
+    def download(self, url: str, output_path: Optional[str] = None,
+                 is_known_hash: Optional[Callable[[str], bool]] = None) -> Dict:
+        """
+        Download one APK, stored content-addressed as <sha256>.apk and copied
+        to output_path when given
+        is_known_hash overrides the manager's check for this call, e.g. with
+        a lookup in the caller's database session
+        Returns {'url', 'path', 'sha256', 'size', 'status', 'resumed', 'error'}
+        status is downloaded, duplicate (hash already stored or analyzed, path
+        may then be None) or failed
+        """
+        os.makedirs(self.download_dir, exist_ok=True)
+        part_path = os.path.join(self.download_dir, hashlib.sha1(url.encode()).hexdigest()) + '.part'
+        is_known_hash = is_known_hash or self.is_known_hash
+
+        result = {'url': url, 'path': None, 'sha256': None, 'size': 0,
+                  'status': 'failed', 'resumed': False, 'error': None}
+
+        with self._host_slot(url):
+            for attempt in range(self.retries):
+                try:
+                    result.update(self._transfer(url, part_path))
+                    result['error'] = None
+                    break
+                except (requests.ConnectionError, requests.Timeout, ProtocolError, ReadTimeoutError) as e:
+                    # Keep the partial file, the next attempt resumes from it
+                    result['error'] = str(e)
+                    self.logger.warning(f"Download interrupted ({attempt + 1}/{self.retries}) {url}: {e}")
+                except (requests.HTTPError, ValueError, OSError) as e:
+                    result['error'] = str(e)
+                    self.logger.error(f"Error downloading APK {url}: {e}")
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    return result
+
+        if result['error'] or not result['sha256']:
+            return result
+
+        stored_path = os.path.join(self.download_dir, f"{result['sha256']}.apk")
+        if is_known_hash(result['sha256']) or os.path.exists(stored_path):
+            os.remove(part_path)
+            result['status'] = 'duplicate'
+        else:
+            os.replace(part_path, stored_path)
+            result['status'] = 'downloaded'
+
+        result['path'] = stored_path if os.path.exists(stored_path) else None
+        if output_path and result['path']:
+            shutil.copyfile(result['path'], output_path)
+            result['path'] = output_path
+        return result
+
+    def download_many(self, urls: List[str]) -> List[Dict]:
+        """Download many APKs concurrently, each URL once, results in input order"""
+        unique_urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = dict(zip(unique_urls, pool.map(self.download, unique_urls)))
+        return [results[url] for url in urls]
+
+
+# Usage example
+if __name__ == "__main__":
+    manager = APKDownloadManager(download_dir="data/apks", per_host_limit=2)
+
+    results = manager.download_many([
+        "https://example.com/app1.apk",
+        "https://example.com/app2.apk",
+    ])
+
+    for result in results:
+        print(f"{result['status']}: {result['url']} -> {result['path']} ({result['size']} bytes)")
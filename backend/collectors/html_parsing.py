@@ -0,0 +1,29 @@
+from typing import Optional, Union
+import logging
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+
+logger = logging.getLogger(__name__)
+
+
+def _detect_parser() -> str:
+    # lxml's C parser is several times faster; html.parser needs no extra dependency
+    try:
+        BeautifulSoup('<p></p>', 'lxml')
+        return 'lxml'
+    except FeatureNotFound:
+        logger.warning("lxml not installed, falling back to html.parser for scraping")
+        return 'html.parser'
+
+
+HTML_PARSER = _detect_parser()
+
+
+def parse_html(content: Union[bytes, str], parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parse a scraped page with the fastest available parser
+    parse_only builds the tree for the matching elements only, skipping the
+    page chrome (navigation, scripts, footers) that dominates parse time
+    """
+    return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
@@ -1,16 +1,26 @@
 import requests
-from typing import List, Dict, Optional
-import time
-from google_play_scraper import app, search, reviews_all
+from typing import Iterator, List, Dict, Optional, Tuple
+from datetime import datetime
+from google_play_scraper import app, search, Sort
+from google_play_scraper import reviews as google_reviews
 import logging
 
+from collectors.base import BaseCollector, register_collector, CAPABILITY_REVIEWS, CAPABILITY_DETAILS
+from collectors.query_planner import QueryPlanner, QUERY_PLANNER_PATH
 
-class PlayStoreCollector:
+
+@register_collector
+class PlayStoreCollector(BaseCollector):
     """Collect app data from Google Play Store"""
     
-    def __init__(self, delay=2):
+    source = 'play_store'
+    capabilities = frozenset({CAPABILITY_REVIEWS, CAPABILITY_DETAILS})
+    max_concurrency = 2
+    
+    def __init__(self, delay=2, planner: Optional[QueryPlanner] = None):
         self.delay = delay
         self.logger = logging.getLogger(__name__)
+        self.planner = planner or QueryPlanner(path=QUERY_PLANNER_PATH)
     
     def search_apps(self, query: str, max_results: int = 50) -> List[Dict]:
         """Search for apps by query"""
@@ -33,7 +43,7 @@ class PlayStoreCollector:
                     'installs': result.get('installs'),
                     'source': 'play_store'
                 })
-                time.sleep(self.delay)
+                self._throttle()
             
             return apps
             
@@ -72,62 +82,98 @@ class PlayStoreCollector:
             self.logger.error(f"Error getting app details for {package_id}: {e}")
             return None
     
-    def get_app_reviews(self, package_id: str, max_reviews: int = 100) -> List[Dict]:
-        """Get reviews for an app"""
+    def get_app_reviews(self, package_id: str, max_reviews: int = 100,
+                        since: Optional[datetime] = None,
+                        page_size: int = 100, cursor: Optional[Dict] = None) -> Tuple[List[Dict], bool]:
+        """
+        Get reviews for an app, newest first
+        
+        When `since` is given, paging stops at the first review older than it,
+        so a rescan only downloads reviews posted after the app's watermark.
+        Reviews posted exactly at `since` are returned again; callers dedupe
+        them by review_id.
+        
+        Returns (reviews, complete). complete is False when paging stopped at
+        max_reviews or on an error before reaching `since` (or the last
+        review), so there may be unfetched reviews between the oldest one
+        returned and `since`. Passing the same `cursor` dict to the next call
+        continues from there with the next max_reviews older reviews
+        """
+        reviews = []
+        continuation_token = cursor.get('token') if cursor else None
+        
         try:
-            result = reviews_all(
-                package_id,
-                sleep_milliseconds=self.delay * 1000,
-                lang='en',
-                country='us',
-                sort=1,  # Most recent
-                count=max_reviews
-            )
-            
-            reviews = []
-            for review in result:
-                reviews.append({
-                    'text': review.get('content'),
-                    'rating': review.get('score'),
-                    'date': review.get('at').strftime('%Y-%m-%d') if review.get('at') else None,
-                    'author': review.get('userName'),
-                    'helpful_count': review.get('thumbsUpCount', 0)
-                })
+            while len(reviews) < max_reviews:
+                result, continuation_token = google_reviews(
+                    package_id,
+                    lang='en',
+                    country='us',
+                    sort=Sort.NEWEST,
+                    count=min(page_size, max_reviews - len(reviews)),
+                    continuation_token=continuation_token
+                )
+                
+                reached_watermark = False
+                for review in result:
+                    reviewed_at = review.get('at')
+                    if since and reviewed_at and reviewed_at < since:
+                        reached_watermark = True
+                        break
+                    
+                    reviews.append({
+                        'review_id': review.get('reviewId'),
+                        'text': review.get('content'),
+                        'rating': review.get('score'),
+                        'date': reviewed_at.strftime('%Y-%m-%d') if reviewed_at else None,
+                        'at': reviewed_at,
+                        'author': review.get('userName'),
+                        'helpful_count': review.get('thumbsUpCount', 0)
+                    })
+                
+                if reached_watermark or not result or continuation_token is None:
+                    return reviews[:max_reviews], True
+                
+                self._throttle()
             
-            return reviews
+            return reviews[:max_reviews], False
             
         except Exception as e:
             self.logger.error(f"Error getting reviews for {package_id}: {e}")
-            return []
+            return reviews, False
+        finally:
+            # Pages not returned yet start at the last token received
+            if cursor is not None:
+                cursor['token'] = continuation_token
     
     def scan_for_clones(self, legitimate_app_name: str, max_results: int = 50) -> List[Dict]:
         """
         Search for potential clones of a legitimate app
         """
-        # Search with various query variations
-        queries = [
-            legitimate_app_name,
-            f"{legitimate_app_name} app",
-            f"{legitimate_app_name} official",
-            f"{legitimate_app_name} pro",
-            f"{legitimate_app_name} plus",
-        ]
+        return list(self.iter_search(legitimate_app_name, max_results))
+    
+    def iter_search(self, legitimate_app_name: str, max_results: int = 50) -> Iterator[Dict]:
+        """Yield unique potential clones as each query variation returns"""
+        # Query variations chosen by past yield for this brand
+        queries = self.planner.plan(legitimate_app_name)
         
-        all_apps = []
         seen_packages = set()
         
         for query in queries:
             apps = self.search_apps(query, max_results=max_results)
             
+            new_apps = []
             for app in apps:
                 package_id = app.get('package_id')
                 if package_id and package_id not in seen_packages:
                     seen_packages.add(package_id)
-                    all_apps.append(app)
+                    new_apps.append(app)
+            
+            self.planner.record(legitimate_app_name, query, len(apps), len(new_apps))
+            yield from new_apps
             
-            time.sleep(self.delay)
+            self._throttle()
         
-        return all_apps
+        self.planner.save()
     
     def _parse_installs(self, installs_str: str) -> int:
         """Parse install count string (e.g., '1,000,000+') to integer"""
@@ -0,0 +1,155 @@
+import json
+import os
+import sys
+import threading
+import logging
+from typing import Dict, List, Optional
+
+from utils.keywords import SUSPICIOUS_KEYWORDS
+
+# ml_models lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from ml_models.text_similarity.detector import TextSimilarityDetector
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_PLANNER_PATH = os.getenv(
+    "QUERY_PLANNER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "data", "query_planner.json")
+)
+
+
+class QueryPlanner:
+    """
+    Adaptive query variants for clone search
+    Variants come from the suspicious keyword list and the typosquat
+    substitution table; each variant's yield (new unique packages per
+    request) is tracked per brand so low-yield variants are dropped and
+    productive ones are issued first
+    """
+
+    def __init__(self, max_queries: int = 5, explore: int = 1, min_yield: float = 0.5,
+                 min_runs: int = 2, decay: float = 0.7, path: Optional[str] = None):
+        self.max_queries = max_queries
+        self.explore = explore
+        self.min_yield = min_yield
+        self.min_runs = min_runs
+        self.decay = decay
+        self.path = path
+
+        self.substitutions = TextSimilarityDetector().char_substitutions
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading query planner stats, starting empty: {e}")
+
+    def candidate_variants(self, brand_name: str) -> List[str]:
+        """Every query variant for a brand, base name first"""
+        name = brand_name.strip()
+        variants = [name, f"{name} app"]
+        variants.extend(f"{name} {keyword}" for keyword in SUSPICIOUS_KEYWORDS)
+
+        # One typosquat per substitution, applied to the first matching character
+        lowered = name.lower()
+        for char, substitutes in self.substitutions.items():
+            position = lowered.find(char)
+            if position < 0:
+                continue
+            for substitute in substitutes:
+                variants.append(name[:position] + substitute + name[position + 1:])
+
+        return list(dict.fromkeys(variants))
+
+    def _brand_stats(self, brand_name: str) -> Dict:
+        return self._stats.setdefault(brand_name.strip().lower(), {'plans': 0, 'variants': {}})
+
+    def plan(self, brand_name: str, max_queries: Optional[int] = None) -> List[str]:
+        """
+        Pick the queries to issue for a brand within the request budget
+        Best-yielding variants first, plus `explore` slots for untried variants
+        (or, once all were tried, the dropped variant tried longest ago)
+        """
+        budget = max_queries or self.max_queries
+        candidates = self.candidate_variants(brand_name)
+
+        with self._lock:
+            stats = self._brand_stats(brand_name)
+            stats['plans'] += 1
+            variant_stats = stats['variants']
+
+            untried = [v for v in candidates if v not in variant_stats]
+            tried = [v for v in candidates if v in variant_stats]
+            productive = sorted(
+                (v for v in tried
+                 if variant_stats[v]['runs'] < self.min_runs or variant_stats[v]['yield'] >= self.min_yield),
+                key=lambda v: variant_stats[v]['yield'], reverse=True
+            )
+            dropped = sorted((v for v in tried if v not in productive),
+                             key=lambda v: variant_stats[v]['last_plan'])
+
+            exploit_slots = max(budget - self.explore, 1)
+            queries = productive[:exploit_slots]
+            for variant in untried + dropped + productive[exploit_slots:]:
+                if len(queries) >= budget:
+                    break
+                if variant not in queries:
+                    queries.append(variant)
+
+            for variant in queries:
+                variant_stats.setdefault(variant, {'runs': 0, 'yield': 0.0, 'total_new': 0, 'last_plan': 0})
+                variant_stats[variant]['last_plan'] = stats['plans']
+
+        return queries
+
+    def record(self, brand_name: str, query: str, returned: int, new_unique: int):
+        """Record how many new unique packages a query contributed"""
+        with self._lock:
+            variant = self._brand_stats(brand_name)['variants'].setdefault(
+                query, {'runs': 0, 'yield': 0.0, 'total_new': 0, 'last_plan': 0}
+            )
+            # Exponentially weighted so clone waves that dry up are noticed
+            if variant['runs']:
+                variant['yield'] = self.decay * variant['yield'] + (1 - self.decay) * new_unique
+            else:
+                variant['yield'] = float(new_unique)
+            variant['runs'] += 1
+            variant['total_new'] += new_unique
+
+        logger.debug(f"Query '{query}' returned {returned}, {new_unique} new")
+
+    def variant_stats(self, brand_name: str) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps(self._brand_stats(brand_name)['variants']))
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            return
+
+        with self._lock:
+            data = json.dumps(self._stats)
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+# Usage example
+if __name__ == "__main__":
+    planner = QueryPlanner()
+
+    print(f"Candidates: {planner.candidate_variants('PayPal')}")
+    for round_number in range(3):
+        queries = planner.plan("PayPal")
+        print(f"Round {round_number + 1}: {queries}")
+        for query in queries:
+            planner.record("PayPal", query, returned=30, new_unique=10 if 'official' in query else 0)
@@ -0,0 +1,148 @@
+import asyncio
+import queue
+import threading
+import logging
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from collectors.base import BaseCollector, _COLLECTOR_CLASSES
+from utils.instrumentation import QUEUE_DEPTH
+
+# Importing the collector modules registers their sources
+import collectors.play_store_collector  # noqa: F401
+import collectors.apk_sites_collector  # noqa: F401
+
+
+logger = logging.getLogger(__name__)
+
+# Apps buffered between the search thread and a scan; a slow consumer pauses the search
+STREAM_QUEUE_SIZE = 256
+
+_instances: Dict[str, BaseCollector] = {}
+_instances_lock = threading.Lock()
+
+
+def available_sources() -> List[str]:
+    return sorted(_COLLECTOR_CLASSES)
+
+
+def get_collector(source: str) -> Optional[BaseCollector]:
+    """Shared collector instance for a source, None if the source is unknown"""
+    if source not in _COLLECTOR_CLASSES:
+        return None
+
+    with _instances_lock:
+        if source not in _instances:
+            _instances[source] = _COLLECTOR_CLASSES[source]()
+        return _instances[source]
+
+
+def collectors_with(capability: str) -> List[BaseCollector]:
+    return [get_collector(source) for source in available_sources()
+            if capability in _COLLECTOR_CLASSES[source].capabilities]
+
+
+async def search_sources(sources: List[str], query: str,
+                         max_results: int = 50) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Search all sources in parallel, yielding (source, app) in arrival order
+    A slow or failing source does not hold back the others
+    """
+    results = asyncio.Queue()
+    done = object()
+
+    depth = QUEUE_DEPTH.labels("search_results")
+
+    async def drain(source, collector):
+        try:
+            async for app in collector.search(query, max_results):
+                depth.inc()
+                await results.put((source, app))
+        except Exception as e:
+            logger.error(f"Error searching {source}: {e}")
+        finally:
+            await results.put(done)
+
+    tasks = []
+    for source in dict.fromkeys(sources):
+        collector = get_collector(source)
+        if collector is None:
+            logger.warning(f"Unknown source: {source}")
+            continue
+        tasks.append(asyncio.create_task(drain(source, collector)))
+
+    pending = len(tasks)
+    try:
+        while pending:
+            item = await results.get()
+            if item is done:
+                pending -= 1
+            else:
+                depth.dec()
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Apps never consumed leave the gauge with the queue
+        while not results.empty():
+            if results.get_nowait() is not done:
+                depth.dec()
+
+
+def stream_apps(sources: List[str], query: str, max_results: int = 50) -> Iterator[Tuple[str, Dict]]:
+    """
+    Blocking view of search_sources for synchronous callers such as scan tasks
+    Apps are yielded while the remaining sources are still being searched.
+    Closing the generator early stops the search
+    """
+    items = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    stop = threading.Event()
+    done = object()
+    depth = QUEUE_DEPTH.labels("stream_apps")
+
+    def put(item) -> bool:
+        # Wait for room in the queue, giving up once the consumer has gone
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                if item is not done:
+                    depth.inc()
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def produce():
+        async for item in search_sources(sources, query, max_results):
+            if not await asyncio.to_thread(put, item):
+                return
+
+    def run():
+        try:
+            asyncio.run(produce())
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=run, name="stream_apps")
+    producer.start()
+
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            depth.dec()
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+        while not items.empty():
+            if items.get_nowait() is not done:
+                depth.dec()
+
+
+# Usage example
+if __name__ == "__main__":
+    print(f"Sources: {', '.join(available_sources())}")
+
+    for source, app in stream_apps(['play_store', 'apk_mirror'], "PayPal", max_results=10):
+        print(f"  [{source}] {app['app_name']} ({app.get('package_id', 'N/A')})")
@@ -1,4 +1,12 @@
-from sqlalchemy import create_engine
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -6,15 +14,173 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Use absolute path for SQLite database
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fakeapp.db")
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
-engine = create_engine(DATABASE_URL)
+# Read-only endpoints go to these (comma-separated), primary when none is usable
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+
+# Connection pool (QueuePool for Postgres and file-backed SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Compiled SQL cache per engine; on psycopg 3 also the server-side prepare threshold
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1000"))
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+
+# SQLite: WAL lets API reads proceed while a scan is writing; writers wait on
+# the busy timeout instead of failing with "database is locked"
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
+
+def engine_options(url) -> dict:
+    """create_engine() keyword arguments for the database backend"""
+    url = make_url(url)
+    options = {"query_cache_size": DB_STATEMENT_CACHE_SIZE}
+
+    if url.get_backend_name() == "sqlite":
+        if url.database and url.database != ":memory:":
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                           pool_timeout=DB_POOL_TIMEOUT)
+        return options
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    if url.get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": DB_PREPARE_THRESHOLD}
+    return options
+
+
+def sqlite_pragmas() -> list:
+    """PRAGMA statements run on every new SQLite connection"""
+    return [
+        f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def configured_engine(url):
+    """Engine with the pool options and, on SQLite, the connection pragmas"""
+    configured = create_engine(url, **engine_options(url))
+    if configured.dialect.name == "sqlite":
+        event.listen(configured, "connect", _set_sqlite_pragmas)
+    return configured
+
+
+engine = configured_engine(DATABASE_URL)
+replica_engines = [configured_engine(url) for url in REPLICA_DATABASE_URLS]
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
+# Seconds the replica is behind the primary; 0 on a primary. SQLite has no
+# replication, so a SQLite replica only has to be reachable
+_REPLICA_LAG_SQL = {
+    "postgresql": """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+    """,
+}
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only sessions: replicas in turn, skipping any
+    that is unreachable or lagging more than max_lag seconds, else the primary
+    Health checks are cached for check_interval seconds per replica
+    """
+
+    def __init__(self, primary, replicas: List, max_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 check_interval: float = REPLICA_CHECK_INTERVAL):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._health: Dict[int, Dict] = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def replica_lag(self, replica) -> Optional[float]:
+        """Replication lag in seconds, None when the replica can't be queried"""
+        sql = _REPLICA_LAG_SQL.get(replica.dialect.name, "SELECT 0")
+        try:
+            with replica.connect() as conn:
+                return float(conn.execute(text(sql)).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Replica {replica.url!r} unavailable: {e}")
+            return None
+
+    def _healthy(self, replica) -> bool:
+        health = self._health.get(id(replica))
+        now = time.monotonic()
+        if health is None or now - health['checked_at'] >= self.check_interval:
+            lag = self.replica_lag(replica)
+            health = {'lag': lag, 'checked_at': now,
+                      'healthy': lag is not None and lag <= self.max_lag}
+            if lag is not None and not health['healthy']:
+                logger.warning(f"Replica {replica.url!r} is {lag:.1f}s behind, reading from the primary")
+            self._health[id(replica)] = health
+        return health['healthy']
+
+    def mark_unhealthy(self, replica):
+        """Take a replica out of rotation until its next health check"""
+        self._health[id(replica)] = {'lag': None, 'checked_at': time.monotonic(), 'healthy': False}
+
+    def read_engine(self):
+        if not self.replicas:
+            return self.primary
+        with self._lock:
+            start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._healthy(replica):
+                return replica
+        return self.primary
+
+    def status(self) -> List[Dict]:
+        return [
+            {'url': replica.url.render_as_string(hide_password=True),
+             **{key: value for key, value in self._health.get(id(replica), {}).items() if key != 'checked_at'}}
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter(engine, replica_engines)
+
 
 def get_db():
     db = SessionLocal()
@@ -22,3 +188,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for read-only endpoints, on a replica when one is healthy"""
+    bind = replica_router.read_engine()
+    db = ReadSessionLocal(bind=bind)
+    try:
+        yield db
+    except OperationalError:
+        if bind is not replica_router.primary:
+            replica_router.mark_unhealthy(bind)
+        raise
+    finally:
+        db.close()
@@ -7,8 +7,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from database import Base, engine
 from models.database_models import (
-    Brand, SuspiciousApp, Detection, ScanJob, Takedown, Metrics
+    Brand, SuspiciousApp, Detection, ScanJob, Takedown, Metrics,
+    AppReview, ReviewWatermark, ExportWatermark, APKAnalysis, AppListing
 )
+from utils.partitioning import ensure_time_indexes
 
 def init_database():
     """Create all database tables"""
@@ -16,6 +18,7 @@ def init_database():
     
     try:
         Base.metadata.create_all(bind=engine)
+        ensure_time_indexes(engine)
         print("✅ Database tables created successfully!")
         print("\nTables created:")
         print("  - brands")
@@ -24,6 +27,11 @@ def init_database():
         print("  - scan_jobs")
         print("  - takedowns")
         print("  - metrics")
+        print("  - app_reviews")
+        print("  - review_watermarks")
+        print("  - export_watermarks")
+        print("  - apk_analyses")
+        print("  - app_listings")
         print("\nNext step: Run 'python data/create_demo_data.py' to populate with demo data")
         
     except Exception as e:
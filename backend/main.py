@@ -1,14 +1,20 @@
-from fastapi import FastAPI, HTTPException, Depends
+import time
+
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 import uvicorn
 
-from api.routes import brands, detections, scans, takedowns, metrics, quick_check, evidence_kit
-from database import engine, Base
+from api.routes import brands, detections, scans, takedowns, metrics, quick_check, evidence_kit, profiling, exports
+from database import engine, Base, replica_router
+from utils.partitioning import ensure_time_indexes
+from utils.instrumentation import HTTP_REQUEST_SECONDS, metrics_payload, route_label
+from utils.profiler import background_profile
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_time_indexes(engine)
 
 app = FastAPI(
     title="Fake App Detection API",
@@ -25,6 +31,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, route_label(request.scope), str(status)
+        ).observe(time.perf_counter() - start)
+
+
 # Include routers
 app.include_router(brands.router, prefix="/api/brands", tags=["Brands"])
 app.include_router(scans.router, prefix="/api/scans", tags=["Scans"])
@@ -33,6 +53,14 @@ app.include_router(takedowns.router, prefix="/api/takedowns", tags=["Takedowns"]
 app.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
 app.include_router(quick_check.router, tags=["Quick Check"])
 app.include_router(evidence_kit.router, tags=["Evidence Kit"])
+app.include_router(profiling.router, prefix="/api/profiling", tags=["Profiling"])
+app.include_router(exports.router, prefix="/api/exports", tags=["Exports"])
+
+
+@app.on_event("startup")
+async def start_background_profiler():
+    # Continuous low-rate profile when PROFILING_BACKGROUND_HZ is set
+    background_profile()
 
 
 @app.get("/")
@@ -44,9 +72,15 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "fake-app-detection"}
+    return {"status": "healthy", "service": "fake-app-detection", "replicas": replica_router.status()}
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -21,6 +21,8 @@ class Brand(Base):
 
 class SuspiciousApp(Base):
     __tablename__ = "suspicious_apps"
+    # Retention moves old rows out; SQLite would otherwise reuse their IDs
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True, index=True)
     package_id = Column(String, unique=True, index=True)
@@ -36,13 +38,14 @@ class SuspiciousApp(Base):
     certificate_fingerprint = Column(String)
     sdk_list = Column(JSON)
     first_seen = Column(DateTime, default=datetime.utcnow)
-    last_checked = Column(DateTime, default=datetime.utcnow)
+    last_checked = Column(DateTime, default=datetime.utcnow, index=True)  # Partition key (see utils.partitioning)
 
     detections = relationship("Detection", back_populates="suspicious_app")
 
 
 class Detection(Base):
     __tablename__ = "detections"
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True, index=True)
     brand_id = Column(Integer, ForeignKey("brands.id"))
@@ -65,7 +68,7 @@ class Detection(Base):
     
     # Status
     status = Column(String, default="pending")  # pending, confirmed, false_positive, reported
-    detected_at = Column(DateTime, default=datetime.utcnow)
+    detected_at = Column(DateTime, default=datetime.utcnow, index=True)  # Partition key (see utils.partitioning)
     confirmed_at = Column(DateTime, nullable=True)
     
     brand = relationship("Brand", back_populates="detections")
@@ -127,3 +130,85 @@ class Metrics(Base):
     avg_time_to_takedown = Column(Float, default=0.0)  # hours
     
     user_exposure_prevented = Column(Integer, default=0)  # estimated downloads prevented
+
+
+class AppReview(Base):
+    __tablename__ = "app_reviews"
+
+    id = Column(Integer, primary_key=True, index=True)
+    package_id = Column(String, index=True)
+    review_id = Column(String, unique=True, index=True)  # Store-side review ID
+    author = Column(String)
+    text = Column(Text)
+    rating = Column(Integer)
+    helpful_count = Column(Integer, default=0)
+    reviewed_at = Column(DateTime, index=True)
+    collected_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ReviewWatermark(Base):
+    __tablename__ = "review_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    package_id = Column(String, unique=True, index=True)
+    
+    # Newest review already ingested for this app
+    last_review_at = Column(DateTime, nullable=True)
+    last_review_id = Column(String, nullable=True)
+    
+    # Running fraud indicator aggregates (see ReviewFraudDetector.update_aggregates)
+    aggregates = Column(JSON)
+    fraud_score = Column(Float, default=0.0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ExportWatermark(Base):
+    __tablename__ = "export_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)  # Export stream, e.g. "detections"
+    
+    # Last exported row, as (detected_at, detection id) in export order
+    last_detected_at = Column(DateTime, nullable=True)
+    last_detection_id = Column(Integer, nullable=True)
+    
+    last_export_path = Column(String, nullable=True)
+    rows_exported = Column(Integer, default=0)  # Total over all runs
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class APKAnalysis(Base):
+    __tablename__ = "apk_analyses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String, unique=True, index=True)  # SHA-256 of the APK file
+    file_size = Column(Integer)
+    package_id = Column(String, index=True)
+    
+    certificate = Column(JSON)  # CertificateAnalyzer.extract_certificate_info format
+    certificate_fingerprint = Column(String, index=True)
+    permissions = Column(JSON)  # Permissions declared in the manifest
+    permission_bitmap = Column(LargeBinary)  # permissions_analyzer.encode_permissions, little-endian
+    sdk_list = Column(JSON)
+    icon_hashes = Column(JSON)  # {'sha256': ..., 'phash': ...}
+    
+    analyzed_at = Column(DateTime, default=datetime.utcnow)
+    last_seen = Column(DateTime, default=datetime.utcnow)
+    times_seen = Column(Integer, default=1)
+
+
+class AppListing(Base):
+    __tablename__ = "app_listings"
+    __table_args__ = (UniqueConstraint('source', 'package_id'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    package_id = Column(String, index=True)
+    source = Column(String)  # play_store, app_store, apk_mirror, etc.
+    
+    # Listing fields and when each was last fetched (see utils.listing_store.FIELD_TTLS)
+    fields = Column(JSON)
+    fetched_at = Column(JSON)  # {field: ISO timestamp}
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,200 @@
+import os
+import re
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import and_, func, or_, select
+
+from database import SessionLocal, engine, replica_router
+from models.database_models import Brand, Detection, ExportWatermark, SuspiciousApp, Takedown
+from utils.columnar import arrow_schema, write_arrow, write_parquet
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv(
+    "EXPORT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "data", "exports")
+)
+
+# Rows per Arrow record batch / Parquet row group; bounds export memory
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "10000"))
+
+# Incremental exports stop this far behind now, so detections still being
+# committed with an earlier detected_at are not skipped by the watermark
+EXPORT_SAFETY_LAG_SECONDS = int(os.getenv("EXPORT_SAFETY_LAG_SECONDS", "60"))
+
+# One incremental export per stream at a time, so two runs can't export the same rows
+_stream_locks: Dict[str, threading.Lock] = {}
+_stream_locks_lock = threading.Lock()
+
+# Stream names become directory and file names under EXPORT_DIR
+EXPORT_NAME_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+WRITERS = {
+    'parquet': (write_parquet, 'parquet'),
+    'arrow': (write_arrow, 'arrow'),
+}
+
+
+def detection_export_query(since: Optional[datetime] = None, since_id: Optional[int] = None,
+                           until: Optional[datetime] = None):
+    """
+    One row per detection with its app, brand and latest takedown, in
+    (detected_at, id) order; rows after (since, since_id) and up to until
+    """
+    takedowns = select(
+        Takedown.detection_id,
+        func.max(Takedown.id).label('takedown_id'),
+        func.count(Takedown.id).label('takedown_count'),
+    ).group_by(Takedown.detection_id).subquery()
+
+    query = select(
+        Detection.id.label('detection_id'),
+        Detection.detected_at,
+        Detection.status,
+        Detection.risk_level,
+        Detection.confidence_score,
+        Detection.icon_similarity_score,
+        Detection.text_similarity_score,
+        Detection.certificate_match,
+        Detection.review_fraud_score,
+        Detection.sdk_anomaly_score,
+        Detection.detection_reasons,
+        Detection.confirmed_at,
+        Brand.id.label('brand_id'),
+        Brand.name.label('brand_name'),
+        SuspiciousApp.id.label('suspicious_app_id'),
+        SuspiciousApp.package_id,
+        SuspiciousApp.app_name,
+        SuspiciousApp.developer_name,
+        SuspiciousApp.source,
+        SuspiciousApp.store_url,
+        SuspiciousApp.download_count,
+        SuspiciousApp.rating,
+        SuspiciousApp.first_seen,
+        Takedown.id.label('takedown_id'),
+        Takedown.store.label('takedown_store'),
+        Takedown.status.label('takedown_status'),
+        Takedown.submitted_at.label('takedown_submitted_at'),
+        Takedown.resolved_at.label('takedown_resolved_at'),
+        Takedown.time_to_takedown,
+        func.coalesce(takedowns.c.takedown_count, 0).label('takedown_count'),
+    ).select_from(Detection).outerjoin(
+        Brand, Brand.id == Detection.brand_id
+    ).outerjoin(
+        SuspiciousApp, SuspiciousApp.id == Detection.suspicious_app_id
+    ).outerjoin(
+        takedowns, takedowns.c.detection_id == Detection.id
+    ).outerjoin(
+        Takedown, Takedown.id == takedowns.c.takedown_id
+    )
+
+    if since is not None:
+        # Keyset on (detected_at, id): rows sharing the watermark's timestamp aren't lost
+        query = query.where(or_(
+            Detection.detected_at > since,
+            and_(Detection.detected_at == since, Detection.id > (since_id or 0)),
+        ))
+    if until is not None:
+        query = query.where(Detection.detected_at <= until)
+    return query.order_by(Detection.detected_at, Detection.id)
+
+
+def _export_path(name: str, extension: str, since: Optional[datetime], until: datetime) -> str:
+    start = since.strftime('%Y%m%dT%H%M%S') if since else 'start'
+    return os.path.join(EXPORT_DIR, name, f"{name}_{start}_{until.strftime('%Y%m%dT%H%M%S')}.{extension}")
+
+
+def export_detections(path: str, since: Optional[datetime] = None, since_id: Optional[int] = None,
+                      until: Optional[datetime] = None, format: str = 'parquet',
+                      chunk_size: int = EXPORT_CHUNK_SIZE, bind=None) -> Dict:
+    """
+    Stream the export query into an Arrow or Parquet file, chunk_size rows at
+    a time, straight from the cursor (no ORM objects). Reads go to bind, else
+    to a replica when one is healthy
+    Returns {'path', 'rows', 'bytes', 'last_detected_at', 'last_detection_id'}
+    """
+    writer, _ = WRITERS[format]
+    query = detection_export_query(since, since_id, until)
+    schema = arrow_schema(query.selected_columns)
+    last: Dict = {'last_detected_at': None, 'last_detection_id': None}
+
+    def chunks(result) -> Iterator[List]:
+        for chunk in result.partitions():
+            last['last_detected_at'], last['last_detection_id'] = chunk[-1].detected_at, chunk[-1].detection_id
+            yield chunk
+
+    bind = bind or replica_router.read_engine()
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        exported = writer(path, schema, chunks(result))
+    return {**exported, **last}
+
+
+def _stream_lock(name: str) -> threading.Lock:
+    with _stream_locks_lock:
+        return _stream_locks.setdefault(name, threading.Lock())
+
+
+def run_incremental_export(name: str = 'detections', format: str = 'parquet',
+                           until: Optional[datetime] = None) -> Dict:
+    """
+    Export detections newer than the stream's watermark to a new file under
+    EXPORT_DIR and advance the watermark. Nothing is written when there are
+    no new detections. Reads the primary: rows a lagging replica hasn't
+    received yet would fall behind the watermark and never be exported
+    """
+    if not EXPORT_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid export name {name!r}: use letters, digits, '_' and '-'")
+    with _stream_lock(name):
+        return _run_incremental_export(name, format, until)
+
+
+def _run_incremental_export(name: str, format: str, until: Optional[datetime]) -> Dict:
+    until = until or datetime.utcnow() - timedelta(seconds=EXPORT_SAFETY_LAG_SECONDS)
+    db = SessionLocal()
+
+    try:
+        watermark = db.query(ExportWatermark).filter(ExportWatermark.name == name).first()
+        if watermark is None:
+            watermark = ExportWatermark(name=name, rows_exported=0)
+            db.add(watermark)
+            db.commit()
+
+        since, since_id = watermark.last_detected_at, watermark.last_detection_id
+        db.rollback()  # don't hold a transaction open while exporting
+
+        _, extension = WRITERS[format]
+        exported = export_detections(_export_path(name, extension, since, until), since, since_id, until, format,
+                                     bind=engine)
+
+        if exported['rows'] == 0:
+            os.remove(exported['path'])
+            logger.info(f"Export '{name}': no detections since {since}")
+            return {**exported, 'path': None, 'since': since}
+
+        watermark.last_detected_at = exported['last_detected_at']
+        watermark.last_detection_id = exported['last_detection_id']
+        watermark.last_export_path = exported['path']
+        watermark.rows_exported = (watermark.rows_exported or 0) + exported['rows']
+        db.commit()
+
+        logger.info(f"Export '{name}': {exported['rows']} detections to {exported['path']}")
+        return {**exported, 'since': since}
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Export '{name}' failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+# Usage example
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(run_incremental_export())
@@ -0,0 +1,226 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, exists, func, select, text
+from sqlalchemy.orm import selectinload
+
+from database import SessionLocal, engine
+from models.database_models import Detection, SuspiciousApp, Takedown
+from utils.columnar import arrow_schema, write_parquet
+from utils.partitioning import (
+    PARTITIONED_TABLES, ensure_partition, drop_partition, history_row, list_partitions,
+    month_bounds, month_of, partition_name, partition_table,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Rows newer than this stay in the hot tables
+RETENTION_HOT_DAYS = int(os.getenv("RETENTION_HOT_DAYS", "90"))
+
+# Monthly partitions that ended longer ago than this go to Parquet and are dropped
+RETENTION_ARCHIVE_DAYS = int(os.getenv("RETENTION_ARCHIVE_DAYS", "365"))
+
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+
+ARCHIVE_DIR = os.getenv(
+    "ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "data", "archive")
+)
+
+
+def _months_between(start: datetime, end: datetime) -> List:
+    months, month = [], month_of(start)
+    while month <= month_of(end):
+        months.append(month)
+        month = (month[0] + 1, 1) if month[1] == 12 else (month[0], month[1] + 1)
+    return months
+
+
+def _move_rows(db, table: str, rows: List[Dict]):
+    """Copy rows into their monthly partitions; the caller deletes them and commits"""
+    column = PARTITIONED_TABLES[table]
+    by_month: Dict = {}
+    for row in rows:
+        by_month.setdefault(month_of(row[column]), []).append(row)
+
+    for month, month_rows in by_month.items():
+        db.execute(partition_table(table, partition_name(table, month)).insert(), month_rows)
+
+
+def _prepare_partitions(db, table: str, time_column, cutoff: datetime, *criteria) -> bool:
+    """Create every partition cold rows can land in; False when there is nothing to move"""
+    oldest = db.query(func.min(time_column)).filter(time_column < cutoff, *criteria).scalar()
+    db.rollback()  # end the read before DDL on another connection
+    if oldest is None:
+        return False
+    for month in _months_between(oldest, cutoff):
+        ensure_partition(engine, table, month)
+    return True
+
+
+def _keep_newest_id(db, table) -> tuple:
+    """
+    Extra criteria keeping a table's highest ID hot when SQLite would reuse it:
+    tables created before sqlite_autoincrement hand out max(id) + 1
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return ()
+    sql = db.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                     {'name': table.name}).scalar()
+    if sql and 'AUTOINCREMENT' in sql.upper():
+        return ()
+    return (table.c.id < select(func.max(table.c.id)).scalar_subquery(),)
+
+
+def move_cold_detections(db, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """
+    Detections older than cutoff; those with takedowns stay hot (takedowns
+    reference them). Reviewing a moved one brings it back (hot_detection)
+    """
+    table = Detection.__table__
+    has_takedown = exists().where(Takedown.detection_id == Detection.id)
+    movable = (~has_takedown, *_keep_newest_id(db, table))
+    if not _prepare_partitions(db, table.name, Detection.detected_at, cutoff, *movable):
+        return 0
+
+    moved = 0
+    while True:
+        rows = db.execute(
+            select(table).where(Detection.detected_at < cutoff, *movable)
+            .order_by(Detection.id).limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            break
+        ids = [row['id'] for row in rows]
+        _move_rows(db, table.name, [dict(row) for row in rows])
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+        db.commit()
+        moved += len(rows)
+    return moved
+
+
+def move_cold_suspicious_apps(db, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """Apps not checked since cutoff that no hot detection points to"""
+    table = SuspiciousApp.__table__
+    has_detection = exists().where(Detection.suspicious_app_id == SuspiciousApp.id)
+    movable = (~has_detection, *_keep_newest_id(db, table))
+    if not _prepare_partitions(db, table.name, SuspiciousApp.last_checked, cutoff, *movable):
+        return 0
+
+    moved = 0
+    while True:
+        apps = db.query(SuspiciousApp).options(selectinload(SuspiciousApp.detections)).filter(
+            SuspiciousApp.last_checked < cutoff, *movable
+        ).order_by(SuspiciousApp.id).limit(batch_size).all()
+        if not apps:
+            break
+        rows = [{column.name: getattr(app, column.name) for column in table.columns} for app in apps]
+        _move_rows(db, table.name, rows)
+        # ORM deletes, so the in-process package and homoglyph indexes drop them too
+        for app in apps:
+            db.delete(app)
+        db.commit()
+        moved += len(apps)
+    return moved
+
+
+def _restore_row(db, model, row_id: int):
+    """Move a history row back into its hot table as a new ORM object; the caller commits"""
+    table = model.__tablename__
+    row = history_row(db, table, row_id)
+    if row is None:
+        return None
+    partition = partition_table(table, partition_name(table, month_of(row[PARTITIONED_TABLES[table]])))
+    db.execute(delete(partition).where(partition.c.id == row_id))
+    instance = model(**row)
+    db.add(instance)
+    return instance
+
+
+def hot_detection(db, detection_id: int) -> Optional[Detection]:
+    """
+    A detection to act on (review, takedown), moved back from history with
+    its app when retention moved it; the caller commits
+    """
+    detection = db.query(Detection).filter(Detection.id == detection_id).first()
+    if detection is not None:
+        return detection
+
+    detection = _restore_row(db, Detection, detection_id)
+    if detection is None:
+        return None
+    if db.query(SuspiciousApp.id).filter(SuspiciousApp.id == detection.suspicious_app_id).first() is None:
+        _restore_row(db, SuspiciousApp, detection.suspicious_app_id)
+    db.flush()
+    return detection
+
+
+def _archive_path(table: str, month) -> str:
+    base = os.path.join(ARCHIVE_DIR, table, f"{month[0]:04d}-{month[1]:02d}")
+    path, part = f"{base}.parquet", 1
+    while os.path.exists(path):
+        path = f"{base}.{part}.parquet"
+        part += 1
+    return path
+
+
+def archive_partition(table: str, month, batch_size: int = RETENTION_BATCH_SIZE) -> Optional[Dict]:
+    """Stream a monthly partition into a compressed Parquet file, then drop it"""
+    partition = partition_table(table, partition_name(table, month))
+    schema = arrow_schema(partition.columns)
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(select(partition))
+        archived = write_parquet(_archive_path(table, month), schema,
+                                 (list(batch) for batch in result.partitions()))
+
+    if archived['rows'] == 0:
+        os.remove(archived['path'])
+        archived = None
+    drop_partition(engine, table, month)
+    return archived
+
+
+def run_retention(now: Optional[datetime] = None, hot_days: int = RETENTION_HOT_DAYS,
+                  archive_days: int = RETENTION_ARCHIVE_DAYS) -> Dict:
+    """
+    Move cold rows out of the hot tables into monthly partitions, then archive
+    partitions older than archive_days to Parquet
+    """
+    now = now or datetime.utcnow()
+    hot_cutoff = now - timedelta(days=hot_days)
+    archive_cutoff = now - timedelta(days=archive_days)
+    summary = {'moved': {}, 'archived': []}
+
+    db = SessionLocal()
+    try:
+        # Detections first: apps only go cold once no hot detection references them
+        summary['moved']['detections'] = move_cold_detections(db, hot_cutoff)
+        summary['moved']['suspicious_apps'] = move_cold_suspicious_apps(db, hot_cutoff)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Retention failed moving cold rows: {e}")
+        raise
+    finally:
+        db.close()
+
+    for table in PARTITIONED_TABLES:
+        for month in list_partitions(engine, table):
+            if month_bounds(month)[1] > archive_cutoff:
+                break
+            archived = archive_partition(table, month)
+            if archived:
+                summary['archived'].append({'table': table, 'month': f"{month[0]:04d}-{month[1]:02d}", **archived})
+
+    logger.info(f"Retention moved {summary['moved']} and archived {len(summary['archived'])} partitions")
+    return summary
+
+
+# Usage example
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(run_retention())
@@ -0,0 +1,231 @@
+import os
+import sys
+import logging
+from typing import Dict, List
+
+from models.database_models import AppReview, ReviewWatermark
+from utils.instrumentation import track_collector
+
+# ml_models lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from ml_models.review_fraud.detector import ReviewFraudDetector
+from ml_models.review_fraud.minhash import ReviewMinHashIndex
+from ml_models.review_fraud.reviewer_graph import ReviewerGraph
+
+
+logger = logging.getLogger(__name__)
+
+REVIEW_INDEX_PATH = os.getenv(
+    "REVIEW_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "data", "review_minhash.pkl")
+)
+
+REVIEWER_GRAPH_PATH = os.getenv(
+    "REVIEWER_GRAPH_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "data", "reviewer_graph.pkl")
+)
+
+# Reviews fetched per app on a rescan; the first scan of an app backfills max_reviews
+REVIEW_CATCHUP_LIMIT = int(os.getenv("REVIEW_CATCHUP_LIMIT", "2000"))
+
+_review_detector = None
+_reviewer_graph = None
+
+# Whether reviews were ingested since the last save
+_unsaved = False
+
+
+def get_review_detector() -> ReviewFraudDetector:
+    """Get the shared review detector, loading the near-duplicate index from disk"""
+    global _review_detector
+
+    if _review_detector is None:
+        index = None
+        if os.path.exists(REVIEW_INDEX_PATH):
+            try:
+                index = ReviewMinHashIndex.load(REVIEW_INDEX_PATH)
+            except Exception as e:
+                logger.error(f"Error loading review index, starting empty: {e}")
+        _review_detector = ReviewFraudDetector(index)
+
+    return _review_detector
+
+
+def get_reviewer_graph(db) -> ReviewerGraph:
+    """
+    Get the shared reviewer-app graph, loading it from disk or, when there is
+    no saved graph, building it from every stored review
+    """
+    global _reviewer_graph
+
+    if _reviewer_graph is None:
+        graph = None
+        if os.path.exists(REVIEWER_GRAPH_PATH):
+            try:
+                graph = ReviewerGraph.load(REVIEWER_GRAPH_PATH)
+            except Exception as e:
+                logger.error(f"Error loading reviewer graph, rebuilding: {e}")
+        if graph is None:
+            graph = ReviewerGraph()
+            for author, package_id in db.query(AppReview.author, AppReview.package_id):
+                if author:
+                    graph.add_edge(author, package_id)
+            logger.info(f"Reviewer graph built with {graph.edge_count} edges")
+        _reviewer_graph = graph
+
+    return _reviewer_graph
+
+
+def save_review_index():
+    """
+    Persist the shared near-duplicate index and reviewer graph, when reviews
+    were ingested since the last save. Called once per scan: each save
+    rewrites the whole index
+    """
+    global _unsaved
+    if not _unsaved:
+        return
+    _unsaved = False
+
+    if _review_detector is not None:
+        try:
+            os.makedirs(os.path.dirname(REVIEW_INDEX_PATH), exist_ok=True)
+            _review_detector.minhash_index.save(REVIEW_INDEX_PATH)
+        except Exception as e:
+            logger.error(f"Error saving review index: {e}")
+
+    if _reviewer_graph is not None:
+        try:
+            os.makedirs(os.path.dirname(REVIEWER_GRAPH_PATH), exist_ok=True)
+            _reviewer_graph.save(REVIEWER_GRAPH_PATH)
+        except Exception as e:
+            logger.error(f"Error saving reviewer graph: {e}")
+
+
+def _discard_review_state():
+    """Drop the in-memory index and graph so they reload from the last save"""
+    global _review_detector, _reviewer_graph, _unsaved
+    _review_detector = None
+    _reviewer_graph = None
+    _unsaved = False
+
+
+def find_review_farms(db, package_ids: List[str], min_apps: int = 2, min_reviewers: int = 3) -> List[Dict]:
+    """
+    Clusters of reviewers that review the same suspicious apps together
+    Returns [{'reviewers', 'apps', 'density'}], largest first
+    """
+    return get_reviewer_graph(db).find_review_farms(
+        package_ids, min_apps=min_apps, min_reviewers=min_reviewers
+    )
+
+
+def _store_new_reviews(db, detector, watermark, package_id: str, fetched: List[Dict]) -> List[Dict]:
+    """Add fetched reviews not stored yet and fold them into the aggregates; returns them oldest first"""
+    # Reviews posted at the watermark timestamp come back again; skip stored ones
+    review_ids = [r['review_id'] for r in fetched if r.get('review_id')]
+    existing = set()
+    if review_ids:
+        existing = {
+            row[0] for row in db.query(AppReview.review_id).filter(
+                AppReview.review_id.in_(review_ids)
+            )
+        }
+    new_reviews = [r for r in fetched if r.get('review_id') not in existing]
+    if not new_reviews:
+        return []
+
+    # Oldest first, matching the order reviews were posted in
+    new_reviews.reverse()
+
+    for review in new_reviews:
+        db.add(AppReview(
+            package_id=package_id,
+            review_id=review.get('review_id'),
+            author=review.get('author'),
+            text=review.get('text'),
+            rating=review.get('rating'),
+            helpful_count=review.get('helpful_count', 0),
+            reviewed_at=review.get('at'),
+        ))
+
+    watermark.aggregates = detector.update_aggregates(
+        watermark.aggregates, new_reviews, app_id=package_id
+    )
+    return new_reviews
+
+
+def _commit_reviews(db, package_id: str, new_reviews: List[Dict]):
+    global _unsaved
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        # The index already holds the uncommitted reviews; reload the last save
+        _discard_review_state()
+        raise
+
+    if new_reviews:
+        # Only committed reviews reach the shared graph; the scan saves both once
+        get_reviewer_graph(db).add_reviews(package_id, new_reviews)
+        _unsaved = True
+
+
+def ingest_app_reviews(db, collector, package_id: str, max_reviews: int = 100) -> Dict:
+    """
+    Fetch only reviews newer than the app's watermark, store them and update
+    the running fraud aggregates. The first scan of an app backfills the
+    newest max_reviews; rescans page back to the watermark in chunks of
+    REVIEW_CATCHUP_LIMIT, committing each, so a backlog drains in one scan
+    Returns the review fraud analysis for the app
+    """
+    watermark = db.query(ReviewWatermark).filter(
+        ReviewWatermark.package_id == package_id
+    ).first()
+
+    if not watermark:
+        watermark = ReviewWatermark(package_id=package_id)
+        db.add(watermark)
+
+    backfill = watermark.last_review_at is None
+    detector = get_review_detector()
+    cursor: Dict = {}
+    newest, last_id, ingested = None, None, 0
+
+    while True:
+        with track_collector(collector.source, "reviews"):
+            fetched, complete = collector.get_app_reviews(
+                package_id, max_reviews=max_reviews if backfill else REVIEW_CATCHUP_LIMIT,
+                since=watermark.last_review_at, cursor=cursor
+            )
+
+        new_reviews = _store_new_reviews(db, detector, watermark, package_id, fetched)
+        if newest is None and new_reviews:
+            newest = new_reviews[-1]
+        ingested += len(new_reviews)
+
+        # Older history than the backfill is never fetched; stop too when
+        # paging made no progress (an error, or a source without cursors)
+        if complete or backfill or not fetched or fetched[-1].get('review_id') == last_id:
+            break
+        last_id = fetched[-1].get('review_id')
+        _commit_reviews(db, package_id, new_reviews)
+
+    # An unfinished rescan leaves a gap between the old watermark and the
+    # oldest review fetched; keep the watermark so the next scan pages back
+    # to it again (stored reviews are skipped). A partial backfill advances
+    if newest and newest.get('at') and (complete or backfill):
+        watermark.last_review_at = newest['at']
+        watermark.last_review_id = newest.get('review_id')
+    elif not complete:
+        logger.warning(f"Partial review fetch for {package_id}, keeping watermark at {watermark.last_review_at}")
+
+    analysis = detector.analyze_aggregates(watermark.aggregates)
+    watermark.fraud_score = analysis['fraud_score']
+    _commit_reviews(db, package_id, new_reviews)
+
+    logger.info(f"Ingested {ingested} new reviews for {package_id}")
+
+    return analysis
@@ -1,8 +1,19 @@
 from datetime import datetime
 from database import SessionLocal
 from models.database_models import ScanJob, Brand, SuspiciousApp, Detection
-from collectors.play_store_collector import PlayStoreCollector
-from collectors.apk_sites_collector import APKMirrorCollector
+from collectors.base import CAPABILITY_REVIEWS, CAPABILITY_DETAILS, CAPABILITY_DOWNLOAD
+from collectors.registry import get_collector, stream_apps
+from tasks.review_tasks import ingest_app_reviews, save_review_index
+from utils.certificate_index import get_certificate_index
+from utils.homoglyph_index import get_homoglyph_index
+from utils.package_index import get_package_index
+from utils.apk_cache import get_apk_analysis, apply_to_suspicious_app, is_known_apk
+from utils.listing_store import get_listing, apply_listing
+from utils.entity_resolution import CandidateResolver
+from utils.permissions_analyzer import bitmap_from_bytes, compare_permission_bitmaps, official_permission_bitmap
+from utils.scoring import DETECTION_THRESHOLD, ScoringEngine, brand_weights
+from utils.instrumentation import SCANS_IN_PROGRESS, instrumented_call, timed_stage, track_collector, track_stage
+from utils.profiler import clear_profile_tags, set_profile_tags
 import logging
 
 # Simple similarity function instead of ML imports
@@ -18,10 +29,18 @@ def simple_similarity(str1, str2):
 
 logger = logging.getLogger(__name__)
 
+# Listing fields a scan needs from the details fetch. Hot counters (installs,
+# rating) arrive with every search result, so their 6h TTL is not checked and
+# a listing is refetched only when these slower fields go stale
+SCAN_LISTING_FIELDS = ('app_name', 'developer_name', 'icon_url', 'screenshot_urls', 'store_url')
 
+
+@SCANS_IN_PROGRESS.track_inprogress()
+@timed_stage("scan_job")
 def run_scan_job(scan_job_id: int):
     """Run a scan job to detect fake apps"""
     db = SessionLocal()
+    set_profile_tags(scan_job=scan_job_id)
     
     try:
         # Get scan job
@@ -48,84 +67,42 @@ def run_scan_job(scan_job_id: int):
         # Use simple similarity instead of complex ML
         # Detectors removed to avoid import errors
         
-        # Initialize collectors
-        collectors = {
-            'play_store': PlayStoreCollector(),
-            'apk_mirror': APKMirrorCollector(),
-        }
-        
         total_apps_scanned = 0
         total_detections = 0
         
-        # Scan each source
-        for source in scan_job.sources:
-            if source not in collectors:
-                logger.warning(f"Unknown source: {source}")
-                continue
-            
-            logger.info(f"Scanning {source}...")
-            
-            collector = collectors[source]
+        # Scan all sources in parallel, merging listings of the same app across sources
+        logger.info(f"Scanning {', '.join(scan_job.sources)}...")
+        resolver = CandidateResolver(brand.package_ids)
+        
+        for source, app in stream_apps(scan_job.sources, brand.name, max_results=50):
+            candidate, _ = resolver.add(source, app)
             
-            # Collect apps
-            if source == 'play_store':
-                apps = collector.scan_for_clones(brand.name, max_results=50)
-            else:
-                apps = collector.search_apks(brand.name, max_results=50)
+            # Score each distinct app once, as soon as its package ID is known
+            if candidate.package_id and not candidate.scored:
+                candidate.scored = True
+                total_apps_scanned += 1
+                total_detections += score_candidate(db, brand, candidate)
+        
+        # Listings still without a package ID: ask their source (e.g. the APK page)
+        for candidate in resolver.unresolved():
+            package_id = None
+            for source, app in candidate.listings:
+                with track_collector(source, "resolve_package_id"):
+                    package_id = get_collector(source).resolve_package_id(app)
+                if package_id:
+                    break
             
-            logger.info(f"Found {len(apps)} apps on {source}")
+            if not package_id:
+                logger.debug(f"No package ID for {candidate.fields.get('app_name')} ({', '.join(candidate.sources)})")
+                continue
             
-            # Analyze each app
-            for app in apps:
+            candidate = resolver.set_package_id(candidate, package_id)
+            if not candidate.scored:
+                candidate.scored = True
                 total_apps_scanned += 1
-                
-                # Skip if it's a legitimate package
-                if app.get('package_id') in brand.package_ids:
-                    continue
-                
-                # Create or update suspicious app record
-                suspicious_app = db.query(SuspiciousApp).filter(
-                    SuspiciousApp.package_id == app['package_id']
-                ).first()
-                
-                if not suspicious_app:
-                    suspicious_app = SuspiciousApp(
-                        package_id=app['package_id'],
-                        app_name=app['app_name'],
-                        developer_name=app.get('developer', 'Unknown'),
-                        icon_url=app.get('icon_url'),
-                        store_url=app.get('store_url', ''),
-                        source=source,
-                        download_count=app.get('download_count', 0),
-                        rating=app.get('rating'),
-                    )
-                    db.add(suspicious_app)
-                    db.commit()
-                    db.refresh(suspicious_app)
-                
-                # Run detection algorithms
-                detection_result = run_detection(
-                    brand, suspicious_app, app,
-                    icon_detector, text_detector, cert_analyzer, review_detector,
-                    collector
-                )
-                
-                # Save detection if confidence is high enough
-                if detection_result['confidence_score'] >= 0.70:
-                    detection = Detection(
-                        brand_id=brand.id,
-                        suspicious_app_id=suspicious_app.id,
-                        icon_similarity_score=detection_result['icon_similarity'],
-                        text_similarity_score=detection_result['text_similarity'],
-                        certificate_match=detection_result['certificate_match'],
-                        review_fraud_score=detection_result['review_fraud_score'],
-                        confidence_score=detection_result['confidence_score'],
-                        risk_level=detection_result['risk_level'],
-                        detection_reasons=detection_result['reasons'],
-                        status='pending'
-                    )
-                    db.add(detection)
-                    total_detections += 1
+                total_detections += score_candidate(db, brand, candidate)
+        
+        logger.info(f"{len(resolver)} distinct apps from {sum(len(c.listings) for c in resolver.entities())} listings")
         
         # Update scan job
         scan_job.status = "completed"
@@ -143,87 +120,236 @@ def run_scan_job(scan_job_id: int):
         db.commit()
     
     finally:
+        # One save per scan; the index and graph only hold committed reviews
+        save_review_index()
+        clear_profile_tags("scan_job")
         db.close()
 
 
-def run_detection(brand, suspicious_app, app_data, icon_detector, text_detector, 
-                  cert_analyzer, review_detector, collector):
-    """Run all detection algorithms on a suspicious app"""
+@timed_stage("score_candidate")
+def score_candidate(db, brand, candidate) -> bool:
+    """Record and score one distinct app, returns whether a detection was saved"""
+    app = candidate.fields
+    
+    # Skip if it's a legitimate package
+    if candidate.package_id in brand.package_ids:
+        return False
+    
+    # Reviews and details come from the first source that offers them
+    collectors = [get_collector(source) for source in candidate.sources]
+    collector = next((c for c in collectors if c.has_capability(CAPABILITY_REVIEWS)), collectors[0])
+    
+    # Create or update suspicious app record
+    suspicious_app = db.query(SuspiciousApp).filter(
+        SuspiciousApp.package_id == candidate.package_id
+    ).first()
+    
+    if not suspicious_app:
+        suspicious_app = SuspiciousApp(
+            package_id=candidate.package_id,
+            app_name=app['app_name'],
+            developer_name=app.get('developer', 'Unknown'),
+            icon_url=app.get('icon_url'),
+            store_url=app.get('store_url', ''),
+            source=candidate.source,
+            download_count=app.get('download_count', 0),
+            rating=app.get('rating'),
+        )
+        db.add(suspicious_app)
+        with track_stage("db_write"):
+            db.commit()
+        db.refresh(suspicious_app)
+    
+    # Listing metadata, re-fetched only when stored fields are stale
+    for source, details_collector in zip(candidate.sources, collectors):
+        if details_collector.has_capability(CAPABILITY_DETAILS):
+            fetch = instrumented_call(source, "details", details_collector.get_app_details)
+            with track_stage("listing_refresh"):
+                listing = get_listing(db, suspicious_app.package_id, fetch, source=source,
+                                      fields=SCAN_LISTING_FIELDS)
+            if listing:
+                apply_listing(suspicious_app, listing)
+                with track_stage("db_write"):
+                    db.commit()
+            break
+    
+    # The APK is downloaded only if the certificate signal is reached
+    fetch_apk = None
+    for source, listing in candidate.listings:
+        apk_collector = get_collector(source)
+        if apk_collector.has_capability(CAPABILITY_DOWNLOAD):
+            download = instrumented_call(source, "download", apk_collector.fetch_apk)
+            fetch_apk = lambda: download(listing, is_known_hash=lambda sha256: is_known_apk(db, sha256))
+            break
+    
+    # Run detection algorithms
+    with track_stage("detection"):
+        detection_result = run_detection(
+            db, brand, suspicious_app, app, collector, fetch_apk=fetch_apk
+        )
+    
+    # Save detection if confidence is high enough
+    if detection_result['confidence_score'] < DETECTION_THRESHOLD:
+        return False
+    
+    detection = Detection(
+        brand_id=brand.id,
+        suspicious_app_id=suspicious_app.id,
+        icon_similarity_score=detection_result['icon_similarity'],
+        text_similarity_score=detection_result['text_similarity'],
+        certificate_match=detection_result['certificate_match'],
+        review_fraud_score=detection_result['review_fraud_score'],
+        confidence_score=detection_result['confidence_score'],
+        risk_level=detection_result['risk_level'],
+        detection_reasons=detection_result['reasons'],
+        status='pending'
+    )
+    db.add(detection)
+    return True
+
+
+def run_detection(db, brand, suspicious_app, app_data, collector, fetch_apk=None):
+    """
+    Run detection algorithms on a suspicious app, cheapest first
+    Expensive ones are skipped when they can no longer change the risk level
+    fetch_apk downloads the app's APK (see BaseCollector.fetch_apk) when
+    the certificate is needed and not known yet
+    """
     
     reasons = []
+    state = {'cert_info': app_data.get('certificate'), 'certificate_match': False,
+             'certificate_checked': False, 'apk_path': app_data.get('apk_path'), 'apk_sha256': None}
+    engine = ScoringEngine(brand_weights(brand.name))
     
-    # 1. Icon similarity (skipped to avoid ML dependencies)
-    icon_similarity = 0.0
+    # 1. Icon similarity is not computed (no ML dependencies in the backend),
+    # so no icon signal is registered and its weight is left out
     
     # 2. Text similarity
-    text_similarity = simple_similarity(brand.name, suspicious_app.app_name)
-    if text_similarity > 0.80:
-        reasons.append(f"Name similarity: {text_similarity:.2%}")
+    def text_signal():
+        text_similarity = simple_similarity(brand.name, suspicious_app.app_name)
+        name_match = get_homoglyph_index(db).name_match(brand.id, suspicious_app.app_name)
+        if name_match == 'homoglyph':
+            text_similarity = max(text_similarity, 0.95)
+            reasons.append("Homoglyph name: looks identical to the brand name")
+        elif name_match == 'spacing':
+            text_similarity = max(text_similarity, 0.95)
+            reasons.append("Name is the brand name with different spacing or punctuation")
+        elif name_match == 'affix':
+            text_similarity = max(text_similarity, 0.90)
+            reasons.append(f"Name is the brand name with added words: {suspicious_app.app_name}")
+        elif text_similarity > 0.80:
+            reasons.append(f"Name similarity: {text_similarity:.2%}")
+        return text_similarity
     
-    # 3. Certificate analysis
-    certificate_match = False
-    try:
-        # In production, would analyze actual APK certificate
-        # For demo, we'll skip this or use mock data
-        pass
-    except Exception as e:
-        logger.error(f"Error in certificate analysis: {e}")
+    # Package ID lookalike check is cheap and always run for its reason,
+    # it only counts towards the score when a brand gives it a weight
+    package_imitation = 0.0
+    official_packages = [pkg for pkg in (brand.package_ids or []) if pkg != suspicious_app.package_id]
+    package_index = get_package_index(db)
+    package_index.add(suspicious_app.package_id)  # may not be flushed yet
+    for official_package in official_packages:
+        matches = package_index.find_similar(official_package, max_distance=1) + \
+            package_index.find_similar(official_package, max_distance=1, namespace_depth=2)
+        match = next((m for m in matches if m['package_id'] == suspicious_app.package_id), None)
+        if match:
+            if match['distance'] == 0:
+                reasons.append(f"Package ID uses the official {match['namespace']} namespace of {official_package}")
+            else:
+                reasons.append(f"Package ID imitates {official_package}")
+            package_imitation = 1.0
+            break
     
-    # 4. Review fraud detection (skipped to avoid ML dependencies)
-    review_fraud_score = 0.0
-    try:
-        if hasattr(collector, 'get_app_reviews'):
-            reviews = collector.get_app_reviews(suspicious_app.package_id, max_reviews=100)
-            if reviews:
-                review_analysis = {'is_suspicious': False, 'score': 0.0}
+    # 3. Certificate analysis (fingerprint index lookup), reading the APK
+    # first, downloading it when needed (analysis cached by content hash)
+    def certificate_signal():
+        if not state['apk_path'] and not state['cert_info'] and fetch_apk:
+            with track_stage("apk_download"):
+                download = fetch_apk()
+            if download:
+                state['apk_path'], state['apk_sha256'] = download['path'], download['sha256']
+        if state['apk_path'] or state['apk_sha256']:
+            analyze_apk()
+        
+        cert_info = state['cert_info']
+        try:
+            if cert_info:
+                cert_index = get_certificate_index(db)
+                brand_ids, cert_reasons = cert_index.verify(cert_info)
+                state['certificate_match'] = brand.id in brand_ids
+                state['certificate_checked'] = True
+                
+                if brand_ids and not state['certificate_match']:
+                    # Genuinely signed by another protected brand, not by this one
+                    reasons.append(f"Certificate belongs to another protected brand, not {brand.name}")
+                elif not state['certificate_match'] and cert_info.get('sha256'):
+                    reasons.extend(cert_reasons)
+                    shared = cert_index.record_signer(cert_info['sha256'], suspicious_app.package_id)
+                    if shared >= cert_index.shared_signer_threshold:
+                        reasons.append(f"Signer shared across {shared} suspicious packages")
+        except Exception as e:
+            logger.error(f"Error in certificate analysis: {e}")
+        
+        # Certificate mismatch increases score; no certificate is no evidence either way
+        if not state['certificate_checked']:
+            return None
+        return 0.0 if state['certificate_match'] else 1.0
+    
+    def analyze_apk():
+        try:
+            apk_analysis = get_apk_analysis(db, state['apk_path'], sha256=state['apk_sha256'])
+            if apk_analysis:
+                apply_to_suspicious_app(suspicious_app, apk_analysis)
+                state['cert_info'] = state['cert_info'] or apk_analysis.certificate
+                
+                official_bitmap = official_permission_bitmap(db, brand)
+                if official_bitmap is not None:
+                    comparison = compare_permission_bitmaps(
+                        bitmap_from_bytes(apk_analysis.permission_bitmap), official_bitmap
+                    )
+                    if comparison['extra_high_risk']:
+                        reasons.append(
+                            f"Requests {comparison['extra_high_risk']} high-risk permissions "
+                            f"the official app does not"
+                        )
+        except Exception as e:
+            logger.error(f"Error in APK analysis: {e}")
+    
+    # 4. Review fraud detection (incremental, only reviews newer than the watermark)
+    def review_signal():
+        try:
+            with track_stage("reviews"):
+                review_analysis = ingest_app_reviews(db, collector, suspicious_app.package_id, max_reviews=100)
+            if review_analysis['total_reviews']:
                 review_fraud_score = review_analysis['fraud_score']
                 
                 if review_fraud_score > 0.60:
                     reasons.append(f"Review fraud detected: {review_fraud_score:.2%}")
                     reasons.extend(review_analysis['flags'])
-    except Exception as e:
-        logger.error(f"Error in review analysis: {e}")
+                return review_fraud_score
+        except Exception as e:
+            logger.error(f"Error in review analysis: {e}")
+        # No reviews yet (or none fetched) is no evidence either way
+        return None
     
-    # Calculate combined confidence score
-    confidence_score = calculate_confidence_score(
-        icon_similarity, text_similarity, certificate_match, review_fraud_score
-    )
+    engine.add_signal('text', text_signal, cost=1)
+    engine.add_signal('package_imitation', lambda: package_imitation, cost=0)
+    certificate_cost = 5 if state['apk_path'] else 20 if fetch_apk and not state['cert_info'] else 2
+    engine.add_signal('certificate_mismatch', certificate_signal, cost=certificate_cost)
+    if collector.has_capability(CAPABILITY_REVIEWS):
+        engine.add_signal('review_fraud', review_signal, cost=10)
     
-    # Determine risk level
-    risk_level = get_risk_level(confidence_score)
+    result = engine.evaluate()
+    signals = result['signals']
+    if result['skipped']:
+        logger.debug(f"{suspicious_app.package_id}: skipped {', '.join(result['skipped'])} at {result['risk_level']}")
     
     return {
-        'icon_similarity': icon_similarity,
-        'text_similarity': text_similarity,
-        'certificate_match': certificate_match,
-        'review_fraud_score': review_fraud_score,
-        'confidence_score': confidence_score,
-        'risk_level': risk_level,
-        'reasons': reasons
+        'icon_similarity': 0.0,
+        'text_similarity': signals.get('text') or 0.0,
+        'certificate_match': state['certificate_match'],
+        'review_fraud_score': signals.get('review_fraud') or 0.0,
+        'confidence_score': result['confidence_score'],
+        'risk_level': result['risk_level'],
+        'reasons': reasons,
+        'skipped_signals': result['skipped'],
     }
-
-
-def calculate_confidence_score(icon_sim, text_sim, cert_match, review_fraud):
-    """Calculate overall confidence score"""
-    
-    # Weighted combination
-    score = (
-        0.35 * icon_sim +
-        0.35 * text_sim +
-        0.15 * review_fraud +
-        0.15 * (1.0 if not cert_match else 0.0)  # Certificate mismatch increases score
-    )
-    
-    return round(score, 4)
-
-
-def get_risk_level(confidence_score):
-    """Convert confidence score to risk level"""
-    if confidence_score >= 0.90:
-        return "CRITICAL"
-    elif confidence_score >= 0.80:
-        return "HIGH"
-    elif confidence_score >= 0.70:
-        return "MEDIUM"
-    else:
-        return "LOW"
@@ -0,0 +1,100 @@
+# APK analysis result cache keyed by the SHA-256 of the APK file
+# The same binary mirrored across sites and versions is analyzed only once
+
+import hashlib
+import io
+import os
+import sys
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from models.database_models import APKAnalysis
+from utils.permissions_analyzer import encode_permissions, bitmap_to_bytes
+from utils.instrumentation import record_cache
+
+# ml_models lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from ml_models.certificate_analyzer.apk_reader import StreamingAPKAnalyzer
+
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_apk(apk_path: str) -> str:
+    """SHA-256 of an APK file, read in 1MB chunks"""
+    digest = hashlib.sha256()
+    with open(apk_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _icon_hashes(icon: Optional[Dict]) -> Optional[Dict]:
+    if not icon:
+        return None
+
+    hashes = {'sha256': icon['sha256'], 'path': icon['path'], 'phash': None}
+    try:
+        from PIL import Image
+        import imagehash
+
+        hashes['phash'] = str(imagehash.phash(Image.open(io.BytesIO(icon['data']))))
+    except Exception:
+        # Pillow/imagehash missing or icon not decodable; exact hash still usable
+        pass
+
+    return hashes
+
+
+def is_known_apk(db, sha256: str) -> bool:
+    """Whether an APK with this content hash was already analyzed"""
+    return db.query(APKAnalysis.id).filter(APKAnalysis.sha256 == sha256).first() is not None
+
+
+def get_apk_analysis(db, apk_path: str, sha256: Optional[str] = None) -> Optional[APKAnalysis]:
+    """
+    Get the analysis for an APK, running it only for binaries never seen before
+    A re-seen binary costs one file hash plus one indexed lookup
+    """
+    sha256 = sha256 or hash_apk(apk_path)
+
+    cached = db.query(APKAnalysis).filter(APKAnalysis.sha256 == sha256).first()
+    record_cache("apk_analysis", cached is not None)
+    if cached:
+        cached.last_seen = datetime.utcnow()
+        cached.times_seen = (cached.times_seen or 0) + 1
+        db.commit()
+        return cached
+
+    try:
+        result = StreamingAPKAnalyzer().analyze_file(apk_path)
+    except Exception as e:
+        logger.error(f"Error analyzing APK {apk_path}: {e}")
+        return None
+
+    certificate = result['certificate']
+    analysis = APKAnalysis(
+        sha256=sha256,
+        file_size=result['size'],
+        package_id=result['package_id'],
+        certificate=certificate,
+        certificate_fingerprint=certificate['sha256'] if certificate else None,
+        permissions=result['permissions'],
+        permission_bitmap=bitmap_to_bytes(encode_permissions(result['permissions'])),
+        sdk_list=result['sdks'],
+        icon_hashes=_icon_hashes(result['icon']),
+    )
+    db.add(analysis)
+    db.commit()
+    db.refresh(analysis)
+
+    return analysis
+
+
+def apply_to_suspicious_app(suspicious_app, analysis: APKAnalysis):
+    """Fill SuspiciousApp APK-derived columns from a cached analysis"""
+    suspicious_app.certificate_fingerprint = analysis.certificate_fingerprint
+    suspicious_app.sdk_list = analysis.sdk_list
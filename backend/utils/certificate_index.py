@@ -0,0 +1,69 @@
+# Process-wide certificate fingerprint index built from Brand.certificates
+# Kept fresh through session events: brand changes are collected on flush and
+# applied once their transaction commits, so a rollback leaves the index as is
+
+import os
+import sys
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.database_models import Brand
+
+# ml_models lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from ml_models.certificate_analyzer.fingerprint_index import CertificateFingerprintIndex
+
+
+logger = logging.getLogger(__name__)
+
+_index = None
+
+
+def get_certificate_index(db) -> CertificateFingerprintIndex:
+    """Get the shared index, building it from every brand on first use"""
+    global _index
+
+    if _index is None:
+        index = CertificateFingerprintIndex()
+        for brand in db.query(Brand).all():
+            index.add_brand(brand.id, brand.certificates or [], name=brand.name)
+        _index = index
+        logger.info(f"Certificate index built with {len(index)} fingerprints")
+
+    return _index
+
+
+_PENDING_KEY = "certificate_index_changes"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_brand_changes(session, flush_context):
+    if _index is None:
+        return
+
+    changes = session.info.setdefault(_PENDING_KEY, [])
+    for target in list(session.new) + list(session.dirty):
+        if isinstance(target, Brand):
+            changes.append(('add', target.id, list(target.certificates or []), target.name))
+    for target in session.deleted:
+        if isinstance(target, Brand):
+            changes.append(('remove', target.id, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_brand_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if _index is None or not changes:
+        return
+
+    for action, brand_id, certificates, name in changes:
+        if action == 'add':
+            _index.add_brand(brand_id, certificates, name=name)
+        else:
+            _index.remove_brand(brand_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_brand_changes(session):
+    session.info.pop(_PENDING_KEY, None)
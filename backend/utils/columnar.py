@@ -0,0 +1,102 @@
+# Arrow/Parquet conversion of SQLAlchemy result rows
+# Rows are converted in batches straight from Core results (no ORM objects);
+# JSON columns are stored as JSON text so the Parquet schema stays fixed
+
+import json
+import os
+from typing import Dict, Iterable, List, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, LargeBinary
+
+
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+
+
+def arrow_type(sql_type) -> pa.DataType:
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(sql_type, LargeBinary):
+        return pa.binary()
+    return pa.string()  # String, Text and JSON (as JSON text)
+
+
+def arrow_schema(columns: Iterable) -> pa.Schema:
+    """Schema for Core columns or labelled select() columns, in order"""
+    fields = []
+    for column in columns:
+        metadata = {"sql_type": "json"} if isinstance(column.type, JSON) else None
+        fields.append(pa.field(column.name, arrow_type(column.type), metadata=metadata))
+    return pa.schema(fields)
+
+
+def record_batch(rows: Sequence[Sequence], schema: pa.Schema) -> pa.RecordBatch:
+    """Build a batch from row tuples in schema column order"""
+    arrays = []
+    for field, values in zip(schema, zip(*rows)):
+        if field.metadata and field.metadata.get(b"sql_type") == b"json":
+            values = [None if value is None else json.dumps(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(path: str, schema: pa.Schema, batches: Iterable[List[Sequence]],
+                  compression: str = PARQUET_COMPRESSION) -> Dict:
+    """
+    Write row batches to a Parquet file, one row group per batch, so memory is
+    bounded by the batch size. The file appears at `path` only once complete
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+            for batch in batches:
+                if batch:
+                    writer.write_batch(record_batch(batch, schema))
+                    rows += len(batch)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {'path': path, 'rows': rows, 'bytes': os.path.getsize(path)}
+
+
+def write_arrow(path: str, schema: pa.Schema, batches: Iterable[List[Sequence]],
+                compression: str = PARQUET_COMPRESSION) -> Dict:
+    """Same as write_parquet, as an Arrow IPC (Feather v2) file"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    options = pa.ipc.IpcWriteOptions(compression=compression if compression in ("zstd", "lz4") else None)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for batch in batches:
+                if batch:
+                    writer.write_batch(record_batch(batch, schema))
+                    rows += len(batch)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {'path': path, 'rows': rows, 'bytes': os.path.getsize(path)}
+
+
+# Usage example
+if __name__ == "__main__":
+    import tempfile
+    from datetime import datetime
+    from sqlalchemy import Column, String
+
+    columns = [Column("id", Integer), Column("name", String), Column("reasons", JSON), Column("at", DateTime)]
+    schema = arrow_schema(columns)
+    path = os.path.join(tempfile.mkdtemp(), "example.parquet")
+    print(write_parquet(path, schema, [[(1, "PayPa1", ["Name imitates PayPal"], datetime(2024, 5, 1))]]))
+    print(pq.read_table(path).to_pylist())
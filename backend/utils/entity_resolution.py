@@ -0,0 +1,161 @@
+# Cross-source entity resolution for scan candidates
+# The same app listed on several sources is merged before scoring: by package ID
+# when known, otherwise by normalized name + developer + icon hash
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+_VERSION = re.compile(r'\bv?\d+(?:\.\d+)+(?:\s*\(\d+\))?')
+_DEVELOPER_PREFIX = re.compile(r'^by\s+')
+_DEVELOPER_SUFFIX = re.compile(r'\b(inc|llc|ltd|limited|corp|corporation|co|gmbh|pvt)\b\.?')
+_NON_ALNUM = re.compile(r'[^0-9a-z]')
+
+# Placeholder values collectors use for unknown fields
+_EMPTY_VALUES = (None, '', 'Unknown', [])
+
+
+def normalize_app_name(name: Optional[str]) -> str:
+    """Lowercase alphanumerics with version strings removed ('PayPal 8.1.0' -> 'paypal')"""
+    if not name:
+        return ''
+    return _NON_ALNUM.sub('', _VERSION.sub('', name.lower()))
+
+
+def normalize_developer(developer: Optional[str]) -> str:
+    if not developer or developer == 'Unknown':
+        return ''
+    developer = _DEVELOPER_PREFIX.sub('', developer.lower().strip())
+    return _NON_ALNUM.sub('', _DEVELOPER_SUFFIX.sub('', developer))
+
+
+class CandidateEntity:
+    """One distinct app seen on one or more sources during a scan"""
+
+    def __init__(self, entity_id: int):
+        self.id = entity_id
+        self.package_id = None
+        self.fields = {}
+        self.listings: List[Tuple[str, Dict]] = []  # (source, app) as collected
+        self.sources: List[str] = []
+        self.scored = False
+
+    def add_listing(self, source: str, app: Dict):
+        self.listings.append((source, app))
+        if source not in self.sources:
+            self.sources.append(source)
+        for field, value in app.items():
+            if self.fields.get(field) in _EMPTY_VALUES and value not in _EMPTY_VALUES:
+                self.fields[field] = value
+        if not self.package_id and app.get('package_id'):
+            self.package_id = app['package_id']
+
+    @property
+    def source(self) -> Optional[str]:
+        return self.sources[0] if self.sources else None
+
+
+class CandidateResolver:
+    """
+    Merge candidate listings from all sources into distinct apps
+    Listings with different known package IDs are never merged, and a listing
+    without one never joins an app with a protected (official) package ID
+    """
+
+    def __init__(self, protected_package_ids: Iterable[str] = ()):
+        self.protected_package_ids = set(protected_package_ids or ())
+        self._entities: Dict[int, CandidateEntity] = {}
+        self._by_key: Dict[str, List[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def entities(self) -> List[CandidateEntity]:
+        return list(self._entities.values())
+
+    @staticmethod
+    def keys(app: Dict) -> List[str]:
+        keys = []
+        if app.get('package_id'):
+            keys.append(f"pkg:{app['package_id']}")
+
+        # One composite key: a shared icon or name alone is what a fake copies
+        name = normalize_app_name(app.get('app_name'))
+        developer = normalize_developer(app.get('developer') or app.get('developer_name'))
+        if name and developer:
+            keys.append(f"app:{name}|{developer}|{app.get('icon_hash') or ''}")
+        return keys
+
+    def _compatible(self, entity: CandidateEntity, package_id: Optional[str]) -> bool:
+        if package_id and entity.package_id:
+            return entity.package_id == package_id
+        # Only a listing naming the official package may join the official app
+        return (package_id or entity.package_id) not in self.protected_package_ids
+
+    def _index(self, entity: CandidateEntity, keys: List[str]):
+        for key in keys:
+            ids = self._by_key.setdefault(key, [])
+            if entity.id not in ids:
+                ids.append(entity.id)
+
+    def _merge(self, target: CandidateEntity, other: CandidateEntity) -> CandidateEntity:
+        for source, app in other.listings:
+            target.add_listing(source, app)
+        target.scored = target.scored or other.scored
+        del self._entities[other.id]
+        for ids in self._by_key.values():
+            if other.id in ids:
+                ids.remove(other.id)
+                if target.id not in ids:
+                    ids.append(target.id)
+        return target
+
+    def add(self, source: str, app: Dict) -> Tuple[CandidateEntity, bool]:
+        """
+        Add one collected listing
+        Returns (entity, merged) where merged means the app was already known
+        """
+        keys = self.keys(app)
+        package_id = app.get('package_id')
+
+        matches = []
+        for key in keys:
+            for entity_id in self._by_key.get(key, []):
+                entity = self._entities[entity_id]
+                if entity not in matches and self._compatible(entity, package_id):
+                    matches.append(entity)
+
+        # Bridge entities that this listing shows to be the same app
+        entity = None
+        for match in matches:
+            if entity is None:
+                entity = match
+            elif self._compatible(entity, match.package_id):
+                entity = self._merge(entity, match)
+
+        merged = entity is not None
+        if entity is None:
+            entity = CandidateEntity(self._next_id)
+            self._next_id += 1
+            self._entities[entity.id] = entity
+
+        entity.add_listing(source, app)
+        self._index(entity, keys)
+        return entity, merged
+
+    def unresolved(self) -> List[CandidateEntity]:
+        """Entities no source has given a package ID for yet"""
+        return [entity for entity in self._entities.values() if not entity.package_id]
+
+    def set_package_id(self, entity: CandidateEntity, package_id: str) -> CandidateEntity:
+        """Attach a package ID found later, merging into an entity that already has it"""
+        for entity_id in list(self._by_key.get(f"pkg:{package_id}", [])):
+            existing = self._entities[entity_id]
+            if existing is not entity:
+                return self._merge(existing, entity)
+
+        entity.package_id = package_id
+        entity.fields['package_id'] = package_id
+        self._index(entity, [f"pkg:{package_id}"])
+        return entity
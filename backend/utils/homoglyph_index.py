@@ -0,0 +1,81 @@
+# Process-wide homoglyph skeleton index of brand names and suspicious app names
+# Kept fresh through session events: brand and app changes are collected on
+# flush and applied once their transaction commits, so a rollback leaves the
+# index as is
+
+import os
+import sys
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.database_models import Brand, SuspiciousApp
+
+# ml_models lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from ml_models.text_similarity.homoglyph_index import HomoglyphIndex
+
+
+logger = logging.getLogger(__name__)
+
+_index = None
+
+
+def get_homoglyph_index(db) -> HomoglyphIndex:
+    """Get the shared index, building it from every brand and suspicious app on first use"""
+    global _index
+
+    if _index is None:
+        index = HomoglyphIndex()
+        for brand_id, name in db.query(Brand.id, Brand.name):
+            index.add_brand(brand_id, [name])
+        for package_id, app_name in db.query(SuspiciousApp.package_id, SuspiciousApp.app_name):
+            if app_name:
+                index.add_listing(package_id, app_name)
+        _index = index
+        logger.info(f"Homoglyph index built with {len(index)} listings")
+
+    return _index
+
+
+_PENDING_KEY = "homoglyph_index_changes"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    if _index is None:
+        return
+
+    changes = session.info.setdefault(_PENDING_KEY, [])
+    for target in list(session.new) + list(session.dirty):
+        if isinstance(target, Brand):
+            changes.append(('add_brand', target.id, target.name))
+        elif isinstance(target, SuspiciousApp) and target.app_name:
+            changes.append(('add_listing', target.package_id, target.app_name))
+    for target in session.deleted:
+        if isinstance(target, Brand):
+            changes.append(('remove_brand', target.id, None))
+        elif isinstance(target, SuspiciousApp):
+            changes.append(('remove_listing', target.package_id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if _index is None or not changes:
+        return
+
+    for action, key, name in changes:
+        if action == 'add_brand':
+            _index.add_brand(key, [name])
+        elif action == 'remove_brand':
+            _index.remove_brand(key)
+        elif action == 'add_listing':
+            _index.add_listing(key, name)
+        else:
+            _index.remove_listing(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,153 @@
+# Prometheus metrics for scans, collectors, caches and the HTTP API
+# Exposed at /metrics; every metric lives in the default registry
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+
+from database import engine, replica_engines
+from utils.profiler import profile_tags
+
+
+# Network calls take up to tens of seconds, in-process stages microseconds
+_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=_BUCKETS,
+)
+SCAN_STAGE_SECONDS = Histogram(
+    "scan_stage_duration_seconds", "Time spent in each stage of a scan job",
+    ["stage"], buckets=_BUCKETS,
+)
+SCANS_IN_PROGRESS = Gauge("scans_in_progress", "Scan jobs currently running")
+COLLECTOR_REQUEST_SECONDS = Histogram(
+    "collector_request_duration_seconds", "Collector call latency by source and operation",
+    ["source", "operation"], buckets=_BUCKETS,
+)
+COLLECTOR_ERRORS = Counter("collector_errors_total", "Collector calls that raised", ["source", "operation"])
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "collector_rate_limit_wait_seconds", "Time collectors spent throttled or waiting for a concurrency slot",
+    ["source", "reason"], buckets=_BUCKETS,
+)
+DETECTOR_SECONDS = Histogram(
+    "detector_duration_seconds", "Detection signal latency", ["signal"], buckets=_BUCKETS,
+)
+DETECTOR_SKIPPED = Counter("detector_skipped_total", "Detection signals skipped by short-circuiting", ["signal"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit/miss)", ["cache", "result"])
+# Summed over every live queue of a kind (one per scan): inc on put, dec on get
+QUEUE_DEPTH = Gauge("queue_depth", "Items waiting in internal queues", ["queue"])
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "Database statement latency by operation",
+    ["operation"], buckets=_BUCKETS,
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """with track_stage('detection'): ... records the block's duration and tags profile samples"""
+    start = time.perf_counter()
+    try:
+        with profile_tags(stage=stage):
+            yield
+    finally:
+        SCAN_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_collector(source: str, operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        COLLECTOR_ERRORS.labels(source, operation).inc()
+        raise
+    finally:
+        COLLECTOR_REQUEST_SECONDS.labels(source, operation).observe(time.perf_counter() - start)
+
+
+def instrumented_call(source: str, operation: str, func):
+    """Wrap a collector method so every call is timed, e.g. as a listing fetcher"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with track_collector(source, operation):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def timed_stage(stage: str):
+    """Decorator form of track_stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hit: bool, count: int = 1):
+    if count:
+        CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc(count)
+
+
+def route_label(scope) -> str:
+    """
+    Route template of a request (/api/brands/{brand_id}) to keep label
+    cardinality bounded. The matched route knows its template relative to
+    its router; the router prefix is the part of the path before it
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+
+    template = getattr(route, "path_format", None) or route.path
+    path_regex = getattr(route, "path_regex", None)
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    if path_regex is None or path_regex.match(path):
+        return template
+
+    # Shortest prefix whose remainder the route matches; prefixes are literal
+    for position, char in enumerate(path):
+        if char == "/" and position and path_regex.match(path[position:]):
+            return path[:position] + template
+    return template
+
+
+def metrics_payload():
+    """(body, content type) for the /metrics endpoint"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+_DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _statement_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+def _statement_end(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("statement_start")
+    if starts:
+        operation = statement.lstrip()[:6].upper()
+        if operation not in _DB_OPERATIONS:
+            operation = "OTHER"
+        DB_STATEMENT_SECONDS.labels(operation).observe(time.perf_counter() - starts.pop())
+
+
+def _statement_failed(context):
+    starts = context.connection.info.get("statement_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+for _engine in (engine, *replica_engines):
+    event.listen(_engine, "before_cursor_execute", _statement_start)
+    event.listen(_engine, "after_cursor_execute", _statement_end)
+    event.listen(_engine, "handle_error", _statement_failed)
@@ -0,0 +1,8 @@
+# Suspicious keywords commonly used in fake apps
+# Shared by the quick check, evidence kit and clone-search query planner
+
+SUSPICIOUS_KEYWORDS = [
+    'update', 'official', 'pro', 'premium', 'secure', 'verified', 
+    'original', 'real', 'authentic', 'new', 'latest', 'free', 
+    'unlock', 'mod', 'hack', 'cracked', 'plus', 'gold'
+]
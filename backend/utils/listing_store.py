@@ -0,0 +1,151 @@
+# Listing metadata store with per-field freshness TTLs
+# Hot fields like installs refresh often, stable ones like developer ID rarely;
+# a listing is only re-fetched when a field the caller needs has gone stale
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from models.database_models import AppListing
+from utils.instrumentation import record_cache
+
+
+logger = logging.getLogger(__name__)
+
+FIELD_TTLS = {
+    'exists': timedelta(hours=6),
+    'download_count': timedelta(hours=6),
+    'installs': timedelta(hours=6),
+    'rating': timedelta(hours=6),
+    'reviews_count': timedelta(hours=6),
+    'version': timedelta(days=1),
+    'last_updated': timedelta(days=1),
+    'app_name': timedelta(days=3),
+    'icon_url': timedelta(days=3),
+    'screenshot_urls': timedelta(days=3),
+    'description': timedelta(days=3),
+    'content_rating': timedelta(days=7),
+    'developer_name': timedelta(days=7),
+    'developer_id': timedelta(days=30),
+    'store_url': timedelta(days=30),
+}
+DEFAULT_TTL = timedelta(days=1)
+
+# Keys of fetch results that identify the listing rather than describe it
+_KEY_FIELDS = ('package_id', 'source')
+
+Fetcher = Callable[[str], Optional[Dict]]
+
+
+def stale_fields(listing: Optional[AppListing], fields: Optional[Iterable[str]] = None,
+                 now: Optional[datetime] = None) -> List[str]:
+    """
+    Fields that need a refresh: missing or older than their TTL
+    Without `fields`, every field already stored is checked
+    """
+    now = now or datetime.utcnow()
+    if listing is None:
+        return list(fields or FIELD_TTLS)
+
+    fetched_at = listing.fetched_at or {}
+    stale = []
+    for field in (fields or fetched_at):
+        fetched = fetched_at.get(field)
+        if fetched is None or now - datetime.fromisoformat(fetched) > FIELD_TTLS.get(field, DEFAULT_TTL):
+            stale.append(field)
+    return stale
+
+
+def _merge(db, listing: Optional[AppListing], source: str, package_id: str, data: Dict,
+           now: datetime, requested: Optional[Iterable[str]] = None) -> AppListing:
+    if listing is None:
+        listing = AppListing(package_id=package_id, source=source, fields={}, fetched_at={})
+        db.add(listing)
+
+    # Reassign the JSON columns so the change is tracked
+    fields = dict(listing.fields or {})
+    fetched_at = dict(listing.fetched_at or {})
+    stamp = now.isoformat()
+    for field, value in data.items():
+        if field in _KEY_FIELDS:
+            continue
+        fields[field] = value
+        fetched_at[field] = stamp
+
+    # Requested fields the source doesn't provide are fresh too, so they
+    # don't force a refetch on every call
+    for field in requested or ():
+        if field not in data:
+            fetched_at[field] = stamp
+
+    listing.fields = fields
+    listing.fetched_at = fetched_at
+    return listing
+
+
+def get_listing(db, package_id: str, fetch: Fetcher, source: str = 'play_store',
+                fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+    """
+    Listing fields for one package, fetched only if a requested field is stale
+    If the fetch fails the stored (possibly stale) fields are returned, or None
+    """
+    listing = db.query(AppListing).filter(
+        AppListing.source == source, AppListing.package_id == package_id
+    ).first()
+
+    fresh = listing is not None and not stale_fields(listing, fields)
+    record_cache("listing", fresh)
+    if fresh:
+        return dict(listing.fields or {})
+
+    data = fetch(package_id)
+    if data is None:
+        return dict(listing.fields or {}) if listing is not None else None
+
+    listing = _merge(db, listing, source, package_id, data, datetime.utcnow(), requested=fields)
+    db.commit()
+    return dict(listing.fields)
+
+
+def enrich_listings(db, package_ids: Iterable[str], fetch: Fetcher, source: str = 'play_store',
+                    fields: Optional[Iterable[str]] = None, max_workers: int = 4) -> Dict[str, Dict]:
+    """
+    Batch enrichment: fetch only the packages with stale fields, concurrently
+    Returns {package_id: fields} for every package with any known data
+    """
+    package_ids = list(dict.fromkeys(package_ids))
+    fields = list(fields) if fields else None
+
+    listings = {
+        listing.package_id: listing
+        for listing in db.query(AppListing).filter(
+            AppListing.source == source, AppListing.package_id.in_(package_ids)
+        )
+    }
+    stale = [pkg for pkg in package_ids if stale_fields(listings.get(pkg), fields)]
+    record_cache("listing", True, len(package_ids) - len(stale))
+    record_cache("listing", False, len(stale))
+    logger.info(f"Enriching {len(stale)} of {len(package_ids)} {source} listings")
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            fetched = dict(zip(stale, pool.map(fetch, stale)))
+
+        now = datetime.utcnow()
+        for package_id, data in fetched.items():
+            if data is not None:
+                listings[package_id] = _merge(db, listings.get(package_id), source, package_id, data, now,
+                                              requested=fields)
+        db.commit()
+
+    return {pkg: dict(listings[pkg].fields or {}) for pkg in package_ids if pkg in listings}
+
+
+def apply_listing(suspicious_app, listing: Dict):
+    """Fill SuspiciousApp listing columns from stored listing fields"""
+    for column in ('app_name', 'developer_name', 'icon_url', 'screenshot_urls', 'store_url',
+                   'download_count', 'rating', 'reviews_count'):
+        if listing.get(column) is not None:
+            setattr(suspicious_app, column, listing[column])
+    suspicious_app.last_checked = datetime.utcnow()
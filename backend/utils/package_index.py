@@ -0,0 +1,94 @@
+# Process-wide package namespace index of suspicious app package IDs
+# Kept fresh through session events: suspicious app changes are collected on
+# flush and applied once their transaction commits, so a rollback leaves the
+# index as is
+
+import os
+import sys
+import logging
+from typing import Dict, List
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.database_models import SuspiciousApp
+
+# ml_models lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from ml_models.text_similarity.package_index import PackageNamespaceIndex
+
+
+logger = logging.getLogger(__name__)
+
+_index = None
+
+
+def get_package_index(db) -> PackageNamespaceIndex:
+    """Get the shared index, building it from every suspicious app on first use"""
+    global _index
+
+    if _index is None:
+        index = PackageNamespaceIndex()
+        for (package_id,) in db.query(SuspiciousApp.package_id):
+            index.add(package_id)
+        _index = index
+        logger.info(f"Package index built with {len(index)} packages")
+
+    return _index
+
+
+def find_package_lookalikes(db, brand, max_distance: int = 1, namespace_depth: int = 2) -> List[Dict]:
+    """
+    Suspicious packages whose namespace is within max_distance edits of one of
+    the brand's official package IDs (com.paypa1.* for com.paypal.android), or
+    whose full package ID is (com.paypal.andr0id)
+    """
+    index = get_package_index(db)
+    official = set(brand.package_ids or [])
+
+    lookalikes = {}
+    for package_id in official:
+        matches = index.find_similar(package_id, max_distance=max_distance) + \
+            index.find_similar(package_id, max_distance=max_distance, namespace_depth=namespace_depth)
+        for match in matches:
+            if match['package_id'] in official:
+                continue
+            known = lookalikes.get(match['package_id'])
+            if known is None or match['distance'] < known['distance']:
+                lookalikes[match['package_id']] = {**match, 'official_package_id': package_id}
+
+    return sorted(lookalikes.values(), key=lambda m: (m['distance'], m['package_id']))
+
+
+_PENDING_KEY = "package_index_changes"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_package_changes(session, flush_context):
+    if _index is None:
+        return
+
+    changes = session.info.setdefault(_PENDING_KEY, [])
+    for target in list(session.new) + list(session.dirty):
+        if isinstance(target, SuspiciousApp) and target.package_id:
+            changes.append(('add', target.package_id))
+    for target in session.deleted:
+        if isinstance(target, SuspiciousApp):
+            changes.append(('remove', target.package_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_package_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if _index is None or not changes:
+        return
+
+    for action, package_id in changes:
+        if action == 'add':
+            _index.add(package_id)
+        else:
+            _index.remove(package_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_package_changes(session):
+    session.info.pop(_PENDING_KEY, None)
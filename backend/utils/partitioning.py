@@ -0,0 +1,176 @@
+# Monthly history partitions for detections and suspicious apps
+# The ORM tables hold the hot window only; cold rows live in <table>_history,
+# partitioned by month on the table's time column. On Postgres that is a native
+# RANGE-partitioned table, on SQLite one <table>_history_YYYY_MM table per month
+# behind a UNION ALL view of the same name
+
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+
+from models.database_models import Detection, SuspiciousApp
+
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> time column rows are partitioned (and expire) by
+PARTITIONED_TABLES = {
+    Detection.__tablename__: 'detected_at',
+    SuspiciousApp.__tablename__: 'last_checked',
+}
+
+Month = Tuple[int, int]
+
+
+def history_table(table: str) -> str:
+    return f"{table}_history"
+
+
+def partition_name(table: str, month: Month) -> str:
+    year, number = month
+    return f"{history_table(table)}_{year:04d}_{number:02d}"
+
+
+def month_of(value: datetime) -> Month:
+    return value.year, value.month
+
+
+def month_bounds(month: Month) -> Tuple[datetime, datetime]:
+    """[start, end) of a month"""
+    year, number = month
+    end = (year + 1, 1) if number == 12 else (year, number + 1)
+    return datetime(year, number, 1), datetime(end[0], end[1], 1)
+
+
+def _source_table(table: str) -> Table:
+    return {Detection.__tablename__: Detection.__table__,
+            SuspiciousApp.__tablename__: SuspiciousApp.__table__}[table]
+
+
+def partition_table(table: str, name: Optional[str] = None, metadata: Optional[MetaData] = None) -> Table:
+    """Core table with the source table's columns (no keys or foreign keys)"""
+    source = _source_table(table)
+    return Table(name or history_table(table), metadata or MetaData(),
+                 *[Column(c.name, c.type) for c in source.columns])
+
+
+def ensure_time_indexes(engine):
+    """Create the time-column indexes on existing hot tables (create_all skips tables that exist)"""
+    for table in PARTITIONED_TABLES:
+        for index in _source_table(table).indexes:
+            index.create(engine, checkfirst=True)
+
+
+def ensure_history_table(engine, table: str):
+    """Postgres: the partitioned parent table; SQLite partitions are created per month"""
+    if engine.dialect.name != "postgresql":
+        return
+    column = PARTITIONED_TABLES[table]
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {history_table(table)} "
+            f"(LIKE {table} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})"
+        ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{history_table(table)}_{column} ON {history_table(table)} ({column})"
+        ))
+
+
+def ensure_partition(engine, table: str, month: Month) -> str:
+    """Create the month's partition if missing and return its name"""
+    name = partition_name(table, month)
+    column = PARTITIONED_TABLES[table]
+
+    if engine.dialect.name == "postgresql":
+        ensure_history_table(engine, table)
+        start, end = month_bounds(month)
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {history_table(table)} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+        return name
+
+    if not inspect(engine).has_table(name):
+        metadata = MetaData()
+        partition = partition_table(table, name, metadata)
+        Index(f"ix_{name}_{column}", partition.c[column])
+        metadata.create_all(engine)
+        refresh_history_view(engine, table)
+    return name
+
+
+def list_partitions(engine, table: str) -> List[Month]:
+    """Months that have a partition, oldest first"""
+    pattern = re.compile(rf"^{re.escape(history_table(table))}_(\d{{4}})_(\d{{2}})$")
+    months = []
+    for name in inspect(engine).get_table_names():
+        match = pattern.match(name)
+        if match:
+            months.append((int(match.group(1)), int(match.group(2))))
+    return sorted(months)
+
+
+def refresh_history_view(engine, table: str):
+    """SQLite: rebuild the <table>_history view over the monthly tables"""
+    if engine.dialect.name == "postgresql":
+        return
+    view = history_table(table)
+    partitions = [partition_name(table, month) for month in list_partitions(engine, table)]
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP VIEW IF EXISTS {view}"))
+        if partitions:
+            conn.execute(text(
+                f"CREATE VIEW {view} AS " + " UNION ALL ".join(f"SELECT * FROM {name}" for name in partitions)
+            ))
+
+
+def history_source(bind, table: str) -> Optional[Table]:
+    """The <table>_history table or view for queries, None before the first partition exists"""
+    name = history_table(table)
+    inspector = inspect(bind)
+    if name not in inspector.get_table_names() and name not in inspector.get_view_names():
+        return None
+    return partition_table(table)
+
+
+def history_row(db, table: str, row_id: int) -> Optional[Dict]:
+    """A row moved out of the hot table, by ID (not archived ones)"""
+    history = history_source(db.get_bind(), table)
+    if history is None:
+        return None
+    row = db.execute(history.select().where(history.c.id == row_id)).mappings().first()
+    return dict(row) if row else None
+
+
+def drop_partition(engine, table: str, month: Month):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(table, month)}"))
+    refresh_history_view(engine, table)
+
+
+def partition_sizes(engine) -> Dict[str, Dict[str, int]]:
+    """Row counts of the hot tables and every partition"""
+    sizes = {}
+    with engine.connect() as conn:
+        for table in PARTITIONED_TABLES:
+            sizes[table] = {
+                'hot': conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar(),
+                **{partition_name(table, month): conn.execute(
+                    text(f"SELECT COUNT(*) FROM {partition_name(table, month)}")).scalar()
+                   for month in list_partitions(engine, table)},
+            }
+    return sizes
+
+
+# Usage example
+if __name__ == "__main__":
+    from database import engine
+
+    ensure_time_indexes(engine)
+    for table in PARTITIONED_TABLES:
+        print(f"{table}: partitions {list_partitions(engine, table)}")
+    print(partition_sizes(engine))
@@ -1,5 +1,12 @@
-# Mock Permissions Analysis Utility
-# Simulates APK permission analysis without actual APK decompilation
+# Permissions Analysis Utility
+# Classifies manifest permissions with precompiled bitmask rule tables
+# Permission sets are encoded as fixed-width bitmaps so comparing a suspect
+# against the brand's official app is an AND plus a popcount
+
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
 
 # Common malicious permissions that fake apps often request
 MALICIOUS_PERMISSIONS = {
@@ -51,45 +58,229 @@ MALICIOUS_PERMISSIONS = {
     ]
 }
 
+# Fixed bitmap layout: known permissions get dedicated bits, anything else
+# is hashed into the overflow bits so unknown permissions still compare
+PERMISSION_BITMAP_BITS = 128
+PERMISSION_BITMAP_BYTES = PERMISSION_BITMAP_BITS // 8
+_OVERFLOW_BITS = 32
+
+_COMMON_PERMISSIONS = [
+    'android.permission.POST_NOTIFICATIONS',
+    'android.permission.USE_BIOMETRIC',
+    'android.permission.USE_FINGERPRINT',
+    'android.permission.ACCESS_BACKGROUND_LOCATION',
+    'android.permission.READ_MEDIA_IMAGES',
+    'android.permission.QUERY_ALL_PACKAGES',
+    'android.permission.MANAGE_EXTERNAL_STORAGE',
+    'com.google.android.c2dm.permission.RECEIVE',
+]
+
+PERMISSION_BITS = {}
+for _permission in (MALICIOUS_PERMISSIONS['HIGH_RISK'] + MALICIOUS_PERMISSIONS['MEDIUM_RISK'] +
+                    MALICIOUS_PERMISSIONS['SUSPICIOUS'] + _COMMON_PERMISSIONS):
+    PERMISSION_BITS.setdefault(_permission, len(PERMISSION_BITS))
+assert len(PERMISSION_BITS) <= PERMISSION_BITMAP_BITS - _OVERFLOW_BITS
+
+_BIT_NAMES = {bit: permission for permission, bit in PERMISSION_BITS.items()}
+
+# Per-category permissions that are unusual for a legitimate app of that type
+CATEGORY_SUSPICIOUS_PERMISSIONS = {
+    'banking': (
+        'android.permission.SEND_SMS',  # Banking apps shouldn't send SMS
+        'android.permission.READ_SMS',  # Suspicious for OTP theft
+        'android.permission.SYSTEM_ALERT_WINDOW',  # Overlay attacks
+        'android.permission.BIND_ACCESSIBILITY_SERVICE',  # Accessibility abuse
+        'android.permission.READ_CALL_LOG',  # Unnecessary
+    ),
+    'ecommerce': (
+        'android.permission.SEND_SMS',
+        'android.permission.CALL_PHONE',
+        'android.permission.READ_CONTACTS',
+        'android.permission.ACCESS_FINE_LOCATION',  # Excessive tracking
+    ),
+    'social': (
+        'android.permission.READ_SMS',
+        'android.permission.SEND_SMS',
+        'android.permission.READ_CALL_LOG',
+        'android.permission.SYSTEM_ALERT_WINDOW',
+    ),
+    'default': (
+        'android.permission.SEND_SMS',
+        'android.permission.READ_SMS',
+        'android.permission.SYSTEM_ALERT_WINDOW',
+    ),
+}
+
+
+def _permission_bit(permission: str) -> int:
+    bit = PERMISSION_BITS.get(permission)
+    if bit is None:
+        bit = PERMISSION_BITMAP_BITS - _OVERFLOW_BITS + zlib.crc32(permission.encode()) % _OVERFLOW_BITS
+    return bit
+
+
+def encode_permissions(permissions: Iterable[str]) -> int:
+    """Encode a permission set as a PERMISSION_BITMAP_BITS-wide bitmap"""
+    bitmap = 0
+    for permission in permissions:
+        bitmap |= 1 << _permission_bit(permission)
+    return bitmap
+
+
+def decode_permissions(bitmap: int) -> List[str]:
+    """Known permissions set in a bitmap (overflow bits cannot be decoded)"""
+    return [_BIT_NAMES[bit] for bit in sorted(_BIT_NAMES) if bitmap >> bit & 1]
+
+
+def bitmap_to_bytes(bitmap: int) -> bytes:
+    return bitmap.to_bytes(PERMISSION_BITMAP_BYTES, 'little')
+
+
+def bitmap_from_bytes(data: Optional[bytes]) -> int:
+    return int.from_bytes(data, 'little') if data else 0
+
+
+def popcount(bitmap: int) -> int:
+    return bin(bitmap).count('1')
+
+
+# Compiled rule masks
+HIGH_RISK_MASK = encode_permissions(MALICIOUS_PERMISSIONS['HIGH_RISK'])
+MEDIUM_RISK_MASK = encode_permissions(MALICIOUS_PERMISSIONS['MEDIUM_RISK'])
+SUSPICIOUS_MASK = encode_permissions(MALICIOUS_PERMISSIONS['SUSPICIOUS'])
+CATEGORY_MASKS = {
+    category: encode_permissions(permissions)
+    for category, permissions in CATEGORY_SUSPICIOUS_PERMISSIONS.items()
+}
+SMS_MASK = encode_permissions(p for p in PERMISSION_BITS if 'SMS' in p)
+LOCATION_MASK = encode_permissions(p for p in PERMISSION_BITS if 'LOCATION' in p)
+CONTACTS_MASK = encode_permissions(p for p in PERMISSION_BITS if 'CONTACTS' in p)
+OVERLAY_MASK = encode_permissions(['android.permission.SYSTEM_ALERT_WINDOW'])
+ACCESSIBILITY_MASK = encode_permissions(['android.permission.BIND_ACCESSIBILITY_SERVICE'])
+
+
+def compare_permission_bitmaps(suspect: int, official: int) -> Dict:
+    """
+    Compare a suspect's permission bitmap with the official app's
+    Extra permissions are what clones add on top of the real app
+    """
+    extra = suspect & ~official
+    union = suspect | official
+    return {
+        'extra_count': popcount(extra),
+        'missing_count': popcount(official & ~suspect),
+        'extra_high_risk': popcount(extra & (HIGH_RISK_MASK | SUSPICIOUS_MASK)),
+        'jaccard': popcount(suspect & official) / popcount(union) if union else 1.0,
+        'extra_permissions': decode_permissions(extra),
+    }
+
+
+def pack_bitmaps(bitmaps: Iterable[int]) -> np.ndarray:
+    """Pack bitmaps into an (n, PERMISSION_BITMAP_BYTES) uint8 array for bulk comparison"""
+    data = b''.join(bitmap_to_bytes(bitmap) for bitmap in bitmaps)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, PERMISSION_BITMAP_BYTES)
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def bulk_extra_permission_counts(packed: np.ndarray, official: int, mask: Optional[int] = None) -> np.ndarray:
+    """
+    Extra-permission popcount of every packed bitmap against one official bitmap
+    Optionally restricted to a rule mask (e.g. HIGH_RISK_MASK)
+    """
+    reference = np.frombuffer(bitmap_to_bytes(official), dtype=np.uint8)
+    extra = packed & ~reference
+    if mask is not None:
+        extra &= np.frombuffer(bitmap_to_bytes(mask), dtype=np.uint8)
+    return _BYTE_POPCOUNT[extra].sum(axis=1, dtype=np.uint32)
+
+
+def analyze_permissions(permissions: List[str], app_category: str = 'default',
+                        official_bitmap: Optional[int] = None) -> dict:
+    """
+    Analyze the permissions declared in an APK manifest
+    official_bitmap is the brand's official app permission bitmap, if known
+    """
+    bitmap = encode_permissions(permissions)
+    category_mask = CATEGORY_MASKS.get((app_category or 'default').lower(), CATEGORY_MASKS['default'])
+
+    high_risk_count = popcount(bitmap & HIGH_RISK_MASK)
+    suspicious_count = popcount(bitmap & SUSPICIOUS_MASK)
+    suspicious_perms = decode_permissions(bitmap & (category_mask | SUSPICIOUS_MASK))
+
+    risk_score = min(100, (popcount(bitmap & category_mask & HIGH_RISK_MASK) * 20) + (suspicious_count * 30))
+
+    warnings = [f"⚠️ {p.split('.')[-1]}: Unusual for this app type" for p in suspicious_perms[:3]]
+
+    comparison = None
+    if official_bitmap is not None:
+        comparison = compare_permission_bitmaps(bitmap, official_bitmap)
+        if comparison['extra_high_risk']:
+            risk_score = min(100, risk_score + comparison['extra_high_risk'] * 10)
+            warnings.append(
+                f"⚠️ {comparison['extra_high_risk']} high-risk permissions not requested by the official app"
+            )
+
+    return {
+        'total_permissions': len(set(permissions)),
+        'permission_bitmap': bitmap,
+        'suspicious_permissions': suspicious_perms,
+        'high_risk_count': high_risk_count,
+        'suspicious_count': suspicious_count,
+        'permission_risk_score': risk_score,
+        'official_comparison': comparison,
+        'analysis': {
+            'sms_access': bool(bitmap & SMS_MASK),
+            'overlay_capability': bool(bitmap & OVERLAY_MASK),
+            'accessibility_abuse': bool(bitmap & ACCESSIBILITY_MASK),
+            'location_tracking': bool(bitmap & LOCATION_MASK),
+            'contact_access': bool(bitmap & CONTACTS_MASK),
+        },
+        'warnings': warnings,
+    }
+
+
+def official_permission_bitmap(db, brand) -> Optional[int]:
+    """
+    Union of the permission bitmaps of the brand's analyzed official APKs:
+    an official package ID signed with one of the brand's certificates, so a
+    repackaged fake reusing the package name doesn't widen the baseline
+    None when no official APK has been analyzed yet
+    """
+    from models.database_models import APKAnalysis
+    from utils.certificate_index import get_certificate_index
+
+    cert_index = get_certificate_index(db)
+    rows = db.query(APKAnalysis.permission_bitmap, APKAnalysis.certificate_fingerprint).filter(
+        APKAnalysis.package_id.in_(brand.package_ids or [])
+    ).all()
+    rows = [data for data, fingerprint in rows if brand.id in cert_index.lookup(fingerprint)]
+    if not rows:
+        return None
+
+    bitmap = 0
+    for data in rows:
+        bitmap |= bitmap_from_bytes(data)
+    return bitmap
+
+
 def analyze_permissions_mock(app_category: str = 'banking') -> dict:
     """
     Mock permission analysis based on app category
-    Simulates what permissions would be flagged as suspicious
+    Used when no APK has been analyzed for the app
     """
     
     # Simulated suspicious permissions based on app type
-    category_suspicious = {
-        'banking': [
-            'android.permission.SEND_SMS',  # Banking apps shouldn't send SMS
-            'android.permission.READ_SMS',  # Suspicious for OTP theft
-            'android.permission.SYSTEM_ALERT_WINDOW',  # Overlay attacks
-            'android.permission.BIND_ACCESSIBILITY_SERVICE',  # Accessibility abuse
-            'android.permission.READ_CALL_LOG',  # Unnecessary
-        ],
-        'ecommerce': [
-            'android.permission.SEND_SMS',
-            'android.permission.CALL_PHONE',
-            'android.permission.READ_CONTACTS',
-            'android.permission.ACCESS_FINE_LOCATION',  # Excessive tracking
-        ],
-        'social': [
-            'android.permission.READ_SMS',
-            'android.permission.SEND_SMS',
-            'android.permission.READ_CALL_LOG',
-            'android.permission.SYSTEM_ALERT_WINDOW',
-        ],
-        'default': [
-            'android.permission.SEND_SMS',
-            'android.permission.READ_SMS',
-            'android.permission.SYSTEM_ALERT_WINDOW',
-        ]
-    }
-    
-    suspicious_perms = category_suspicious.get(app_category.lower(), category_suspicious['default'])
+    category_perms = CATEGORY_SUSPICIOUS_PERMISSIONS.get(
+        app_category.lower(), CATEGORY_SUSPICIOUS_PERMISSIONS['default']
+    )
+    suspicious_perms = list(category_perms)
     
     # Calculate risk score
-    high_risk_count = sum(1 for p in suspicious_perms if p in MALICIOUS_PERMISSIONS['HIGH_RISK'])
-    suspicious_count = sum(1 for p in suspicious_perms if p in MALICIOUS_PERMISSIONS['SUSPICIOUS'])
+    bitmap = encode_permissions(suspicious_perms)
+    high_risk_count = popcount(bitmap & HIGH_RISK_MASK)
+    suspicious_count = popcount(bitmap & SUSPICIOUS_MASK)
     
     risk_score = min(100, (high_risk_count * 20) + (suspicious_count * 30))
     
@@ -0,0 +1,226 @@
+# Sampling profiler for diagnosing slow scans in production
+# A background thread snapshots every thread's stack at a fixed rate and counts
+# collapsed stacks (flamegraph.pl / speedscope "collapsed" format). Stacks are
+# prefixed with the thread's tags, e.g. scan_job:12;stage:reviews;...
+
+import os
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Profiling endpoints are disabled unless this is set
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+
+# Continuous profiling rate when enabled, low enough to leave on (0 = off)
+PROFILING_BACKGROUND_HZ = float(os.getenv("PROFILING_BACKGROUND_HZ", "0"))
+
+# The continuous profile keeps the samples of the current and previous window only
+PROFILING_BACKGROUND_WINDOW_SECONDS = float(os.getenv("PROFILING_BACKGROUND_WINDOW_SECONDS", "600"))
+
+# Per-job tags left out of continuous profile stacks, so their count stays bounded
+BACKGROUND_EXCLUDED_TAGS = ("scan_job",)
+
+MAX_HZ = 250
+MAX_SECONDS = 600
+MAX_STACK_DEPTH = 128
+
+# Tags of each thread, by thread ident
+_thread_tags: Dict[int, Dict[str, str]] = {}
+
+
+def set_profile_tags(**tags):
+    """Tag samples of the current thread (scan_job=12, stage='reviews')"""
+    current = _thread_tags.setdefault(threading.get_ident(), {})
+    current.update({key: str(value) for key, value in tags.items()})
+
+
+def clear_profile_tags(*keys):
+    """Remove the given tags of the current thread, or all of them"""
+    ident = threading.get_ident()
+    if not keys:
+        _thread_tags.pop(ident, None)
+        return
+    current = _thread_tags.get(ident, {})
+    for key in keys:
+        current.pop(key, None)
+    if not current:
+        _thread_tags.pop(ident, None)
+
+
+@contextmanager
+def profile_tags(**tags):
+    """Tag the current thread's samples for the duration of the block"""
+    ident = threading.get_ident()
+    previous = dict(_thread_tags.get(ident, {}))
+    set_profile_tags(**tags)
+    try:
+        yield
+    finally:
+        if previous:
+            _thread_tags[ident] = previous
+        else:
+            _thread_tags.pop(ident, None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Stack sampler over all Python threads
+    Sampling costs one sys._current_frames() walk per tick in a separate
+    thread; at 10-100 Hz the overhead is well under a few percent
+    With a window, samples older than the previous window are dropped
+    """
+
+    def __init__(self, hz: float = 100, window_seconds: Optional[float] = None,
+                 excluded_tags: tuple = ()):
+        self.hz = min(max(hz, 1), MAX_HZ)
+        self.window_seconds = window_seconds
+        self.excluded_tags = set(excluded_tags)
+        self.samples = Counter()
+        self.previous_samples = Counter()
+        self.window_started = None
+        self.sample_count = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._samples_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: Optional[float] = None):
+        if self.running:
+            raise RuntimeError("Profiler already running")
+        self._stop.clear()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._thread = threading.Thread(target=self._run, args=(seconds,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self, seconds: Optional[float]):
+        interval = 1.0 / self.hz
+        deadline = time.monotonic() + seconds if seconds else None
+        own_ident = threading.get_ident()
+        self.window_started = time.monotonic()
+
+        while not self._stop.wait(interval):
+            if self.window_seconds and time.monotonic() - self.window_started >= self.window_seconds:
+                self._rotate()
+            self._sample(own_ident)
+            if deadline and time.monotonic() >= deadline:
+                break
+        self.stopped_at = time.time()
+
+    def _rotate(self):
+        with self._samples_lock:
+            self.previous_samples, self.samples = self.samples, Counter()
+        self.window_started = time.monotonic()
+
+    def _sample(self, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+
+            tags = _thread_tags.get(ident, {})
+            prefix = [f"{key}:{value}" for key, value in sorted(tags.items()) if key not in self.excluded_tags]
+            prefix.insert(0, f"thread:{names.get(ident, ident)}")
+            with self._samples_lock:
+                self.samples[";".join(prefix + stack)] += 1
+        self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one 'frame;frame;frame count' per line"""
+        with self._samples_lock:
+            samples = self.previous_samples + self.samples
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def status(self) -> Dict:
+        return {
+            'running': self.running,
+            'hz': self.hz,
+            'started_at': self.started_at,
+            'stopped_at': self.stopped_at,
+            'ticks': self.sample_count,
+            'window_seconds': self.window_seconds,
+            'distinct_stacks': len(self.previous_samples) + len(self.samples),
+        }
+
+
+_session: Optional[SamplingProfiler] = None
+_background: Optional[SamplingProfiler] = None
+_lock = threading.Lock()
+
+
+def start_profile(seconds: float, hz: float = 100) -> SamplingProfiler:
+    """Start an on-demand profile that stops by itself after `seconds`"""
+    global _session
+    with _lock:
+        if _session is not None and _session.running:
+            raise RuntimeError("A profile is already running")
+        _session = SamplingProfiler(hz)
+        _session.start(min(seconds, MAX_SECONDS))
+        logger.info(f"Profiling for {seconds}s at {_session.hz} Hz")
+        return _session
+
+
+def stop_profile() -> Optional[SamplingProfiler]:
+    with _lock:
+        if _session is not None:
+            _session.stop()
+        return _session
+
+
+def current_profile() -> Optional[SamplingProfiler]:
+    return _session
+
+
+def background_profile() -> Optional[SamplingProfiler]:
+    """Continuous low-rate profile, started on first use when PROFILING_BACKGROUND_HZ is set"""
+    global _background
+    with _lock:
+        if _background is None and PROFILING_ENABLED and PROFILING_BACKGROUND_HZ > 0:
+            _background = SamplingProfiler(PROFILING_BACKGROUND_HZ, PROFILING_BACKGROUND_WINDOW_SECONDS,
+                                           BACKGROUND_EXCLUDED_TAGS)
+            _background.start()
+        return _background
+
+
+# Usage example
+if __name__ == "__main__":
+    def busy(n):
+        return sum(i * i for i in range(n))
+
+    profiler = SamplingProfiler(hz=200)
+    profiler.start()
+    with profile_tags(scan_job=1, stage="text"):
+        for _ in range(50):
+            busy(20000)
+    profiler.stop()
+
+    print(profiler.status())
+    print(profiler.collapsed()[:500])
@@ -0,0 +1,158 @@
+# Unified confidence scoring for detections
+# Signals are evaluated lazily, cheapest first, and an expensive signal is skipped
+# once the weight still outstanding cannot move the score into another risk level
+
+import os
+import json
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.instrumentation import DETECTOR_SECONDS, DETECTOR_SKIPPED
+from utils.profiler import profile_tags
+
+
+logger = logging.getLogger(__name__)
+
+SCORING_CONFIG_PATH = os.getenv(
+    "SCORING_CONFIG_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "scoring_weights.json")
+)
+
+# Lowest score of each risk level, highest first
+RISK_LEVELS = [(0.90, "CRITICAL"), (0.80, "HIGH"), (0.70, "MEDIUM")]
+
+# Detections below this confidence are not saved
+DETECTION_THRESHOLD = 0.70
+
+# Signal weights; a brand may override any of them in the scoring config
+DEFAULT_WEIGHTS = {
+    'icon': 0.35,
+    'text': 0.35,
+    'review_fraud': 0.15,
+    'certificate_mismatch': 0.15,
+    'package_imitation': 0.0,
+}
+
+_config = None
+_config_mtime = None
+
+
+def get_risk_level(confidence_score: float) -> str:
+    """Convert confidence score to risk level"""
+    for threshold, level in RISK_LEVELS:
+        if confidence_score >= threshold:
+            return level
+    return "LOW"
+
+
+def _load_config() -> Dict:
+    # Re-read only when the file changed
+    global _config, _config_mtime
+
+    try:
+        mtime = os.path.getmtime(SCORING_CONFIG_PATH)
+    except OSError:
+        return {}
+
+    if mtime != _config_mtime:
+        try:
+            with open(SCORING_CONFIG_PATH) as f:
+                _config = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load scoring config {SCORING_CONFIG_PATH}: {e}")
+            _config = {}
+        _config_mtime = mtime
+    return _config
+
+
+def brand_weights(brand_name: Optional[str] = None) -> Dict[str, float]:
+    """
+    Signal weights for a brand: defaults, then the config's "default" section,
+    then its "brands" entry for the brand, e.g.
+    {"default": {"icon": 0.4}, "brands": {"PayPal": {"package_imitation": 0.2}}}
+    """
+    config = _load_config()
+    weights = dict(DEFAULT_WEIGHTS)
+    weights.update(config.get('default', {}))
+    if brand_name:
+        weights.update(config.get('brands', {}).get(brand_name, {}))
+    return weights
+
+
+class ScoringEngine:
+    """
+    Weighted combination of lazily computed signals in [0, 1]
+    Only registered signals that return a value count: the score is normalized
+    by their total weight, so a signal the pipeline cannot compute (or that
+    returns None) neither caps nor inflates the score
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self._signals: List[Tuple[int, int, str, Callable[[], Optional[float]]]] = []
+
+    def add_signal(self, name: str, compute: Callable[[], Optional[float]], cost: int = 1):
+        """Register a signal; compute() runs at most once and may return None when unavailable"""
+        if self.weights.get(name, 0.0) > 0:
+            self._signals.append((cost, len(self._signals), name, compute))
+
+    def evaluate(self) -> Dict:
+        """
+        Returns {'confidence_score', 'risk_level', 'signals', 'skipped'}
+        Skipped signals could not have changed the risk level, the score is
+        then a lower bound of the full score
+        """
+        signals = sorted(self._signals)
+        total_weight = sum(self.weights[name] for _, _, name, _ in signals)
+        if not total_weight:
+            return {'confidence_score': 0.0, 'risk_level': get_risk_level(0.0), 'signals': {}, 'skipped': []}
+
+        weighted = 0.0
+        remaining = total_weight
+        values = {}
+        skipped = []
+
+        for position, (_, _, name, compute) in enumerate(signals):
+            lowest = round(weighted / total_weight, 4)
+            highest = round((weighted + remaining) / total_weight, 4)
+            if get_risk_level(lowest) == get_risk_level(highest):
+                skipped = [name for _, _, name, _ in signals[position:]]
+                for name in skipped:
+                    DETECTOR_SKIPPED.labels(name).inc()
+                break
+
+            start = time.perf_counter()
+            with profile_tags(signal=name):
+                value = compute()
+            DETECTOR_SECONDS.labels(name).observe(time.perf_counter() - start)
+            values[name] = value
+            weight = self.weights[name]
+            remaining -= weight
+            if value is None:
+                # Unavailable (e.g. no certificate): its weight leaves the normalization
+                total_weight -= weight
+            else:
+                weighted += weight * min(max(value, 0.0), 1.0)
+
+        confidence_score = round(weighted / total_weight, 4) if total_weight else 0.0
+        return {
+            'confidence_score': confidence_score,
+            'risk_level': get_risk_level(confidence_score),
+            'signals': values,
+            'skipped': skipped,
+        }
+
+
+# Usage example
+if __name__ == "__main__":
+    def expensive_reviews():
+        print("  (fetching reviews)")
+        return 0.9
+
+    for name_score in (1.0, 0.2):
+        engine = ScoringEngine()
+        engine.add_signal('text', lambda: name_score, cost=1)
+        engine.add_signal('certificate_mismatch', lambda: 0.0, cost=2)
+        engine.add_signal('review_fraud', expensive_reviews, cost=10)
+        print(f"text={name_score}: {engine.evaluate()}")
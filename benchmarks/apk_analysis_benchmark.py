@@ -0,0 +1,94 @@
+"""
+Benchmark streaming APK analysis against the androguard path
+
+Usage:
+    python benchmarks/apk_analysis_benchmark.py --size-mb 100 --runs 5 --output results.json
+
+Builds a synthetic APK of the requested size, then times:
+  - streaming: StreamingAPKAnalyzer.analyze_file (mmap, signing block, manifest, icon)
+  - full_read: reading and hashing the whole file (lower bound of any
+    download-then-extract path)
+  - androguard: APK() + certificate calls as done before streaming analysis
+    (skipped when androguard is not installed)
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_apk import build_apk
+from ml_models.certificate_analyzer.apk_reader import StreamingAPKAnalyzer
+
+
+def _time_runs(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'median_s': round(statistics.median(timings), 6),
+        'min_s': round(min(timings), 6),
+        'max_s': round(max(timings), 6),
+    }
+
+
+def _full_read(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _androguard(path):
+    from androguard.core.bytecodes.apk import APK
+
+    apk = APK(path)
+    cert = apk.get_certificate_der(apk.get_signature_names()[0])
+    hashlib.sha256(cert).hexdigest()
+    apk.get_certificate(apk.get_signature_names()[0])
+    apk.get_permissions()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_apk(os.path.join(tmp, 'synthetic.apk'), payload_mb=args.size_mb)
+        analyzer = StreamingAPKAnalyzer()
+
+        analysis = analyzer.analyze_file(path)
+        assert analysis['certificate'] and analysis['permissions'] and analysis['icon']
+
+        results = {
+            'apk_size_mb': round(os.path.getsize(path) / (1024 * 1024), 2),
+            'runs': args.runs,
+            'streaming': _time_runs(lambda: analyzer.analyze_file(path), args.runs),
+            'full_read': _time_runs(lambda: _full_read(path), args.runs),
+        }
+
+        try:
+            import androguard  # noqa: F401
+            results['androguard'] = _time_runs(lambda: _androguard(path), args.runs)
+        except ImportError:
+            results['androguard'] = None
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmark API read latency while a heavy scan is writing to the database
+
+Usage:
+    python benchmarks/db_concurrency_benchmark.py --readers 8 --brands 10 --clones 40 --output results.json
+    python benchmarks/db_concurrency_benchmark.py --configs default,tuned --latency-ms 0
+
+Each engine configuration runs in its own process against a fresh SQLite
+database (the engine is configured when database.py is imported):
+  - default: what create_engine(DATABASE_URL) gave before pooling/WAL tuning
+    (rollback journal, synchronous=FULL, 5s busy timeout, no mmap, pool 5+10)
+  - tuned:   database.py's defaults (WAL, synchronous=NORMAL, busy timeout, mmap)
+A scan thread runs run_scan_job for every brand of a synthetic marketplace
+(commits per app) while reader threads call list/detail endpoints through
+the FastAPI app. Reports read latency percentiles and errors per endpoint,
+"database is locked" failures, and scan throughput.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = {
+    'default': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE_KB': '2000',
+        'DB_POOL_SIZE': '5',
+        'DB_MAX_OVERFLOW': '10',
+    },
+    'tuned': {},
+}
+
+SOURCES = ['synthetic_store', 'synthetic_mirror']
+
+
+def _percentile(ordered, percent):
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method='inclusive')[percent - 1]
+
+
+def _latency_summary(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(_percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def run_config(args):
+    """Runs in the child process, with the configuration's environment already set"""
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+    from fastapi.testclient import TestClient
+
+    from database import Base, SessionLocal, engine
+    from models.database_models import Brand, ScanJob
+    from tasks import scan_tasks
+    from benchmarks.synthetic_marketplace import MarketplaceCollector, generate_marketplace
+    from main import app
+
+    marketplace = generate_marketplace(
+        brands=args.brands, clones_per_brand=args.clones, noise_apps=args.noise,
+        reviews_per_app=args.reviews, seed=args.seed,
+    )
+    MarketplaceCollector.marketplace = marketplace
+    MarketplaceCollector.latency = args.latency_ms / 1000
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    jobs = []
+    for brand in marketplace['brands']:
+        row = Brand(name=brand['name'], package_ids=brand['package_ids'],
+                    icon_urls=brand['icon_urls'], developer_name=brand['developer_name'])
+        db.add(row)
+        db.flush()
+        job = ScanJob(brand_id=row.id, sources=SOURCES, status='pending')
+        db.add(job)
+        db.flush()
+        jobs.append(job.id)
+    db.commit()
+    db.close()
+
+    endpoints = [
+        ('detections', '/api/detections/?limit=50'),
+        ('scans', '/api/scans/'),
+        ('brands', '/api/brands/'),
+        ('scan', '/api/scans/{job}'),
+    ]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    locked = [0]
+    lock = threading.Lock()
+    scanning = threading.Event()
+    scanning.set()
+
+    def reader(index):
+        client = TestClient(app)
+        i = index
+        while scanning.is_set():
+            name, path = endpoints[i % len(endpoints)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = client.get(path.format(job=jobs[i % len(jobs)]))
+                failed = response.status_code >= 500
+            except Exception as e:
+                failed = True
+                if 'locked' in str(e):
+                    with lock:
+                        locked[0] += 1
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+                if failed:
+                    errors[name] += 1
+
+    scan_errors = []
+
+    def scanner():
+        try:
+            for job_id in jobs:
+                scan_tasks.run_scan_job(job_id)
+        except Exception as e:
+            scan_errors.append(repr(e))
+        finally:
+            scanning.clear()
+
+    readers = [threading.Thread(target=reader, args=(i,), name=f"reader-{i}") for i in range(args.readers)]
+    started = time.perf_counter()
+    scan_thread = threading.Thread(target=scanner, name="scan")
+    scan_thread.start()
+    for thread in readers:
+        thread.start()
+    scan_thread.join()
+    scan_elapsed = time.perf_counter() - started
+    for thread in readers:
+        thread.join()
+
+    db = SessionLocal()
+    scans = db.query(ScanJob).filter(ScanJob.id.in_(jobs)).all()
+    failed_scans = [scan.error_message for scan in scans if scan.status != 'completed']
+    apps_scanned = sum(scan.apps_scanned or 0 for scan in scans)
+    journal_mode = db.connection().exec_driver_sql("PRAGMA journal_mode").scalar()
+    db.close()
+
+    all_reads = [sample for samples in latencies.values() for sample in samples]
+    return {
+        'journal_mode': journal_mode,
+        'scan': {
+            'scans': len(scans),
+            'failed_scans': failed_scans + scan_errors,
+            'apps_scanned': apps_scanned,
+            'elapsed_s': round(scan_elapsed, 3),
+            'apps_per_s': round(apps_scanned / scan_elapsed, 2) if scan_elapsed else None,
+        },
+        'reads': {
+            'total': _latency_summary(all_reads),
+            'reads_per_s': round(len(all_reads) / scan_elapsed, 2) if scan_elapsed else None,
+            'errors': sum(errors.values()),
+            'database_locked': locked[0],
+            'endpoints': {name: {**_latency_summary(samples), 'errors': errors[name]}
+                          for name, samples in sorted(latencies.items())},
+        },
+    }
+
+
+def _spawn(config, args):
+    workdir = tempfile.mkdtemp(prefix=f'db_concurrency_{config}_')
+    env = dict(os.environ, **CONFIGS[config])
+    env.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        'REVIEW_INDEX_PATH': os.path.join(workdir, 'review_minhash.pkl'),
+        'REVIEWER_GRAPH_PATH': os.path.join(workdir, 'reviewer_graph.pkl'),
+        'QUERY_PLANNER_PATH': os.path.join(workdir, 'query_planner.json'),
+        'SCORING_CONFIG_PATH': os.path.join(workdir, 'scoring_weights.json'),
+    })
+    command = [sys.executable, os.path.abspath(__file__), '--child',
+               '--readers', str(args.readers), '--brands', str(args.brands),
+               '--clones', str(args.clones), '--noise', str(args.noise),
+               '--reviews', str(args.reviews), '--latency-ms', str(args.latency_ms),
+               '--seed', str(args.seed)]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline):
+    """Ratios of one run to a baseline run (<1 latency means faster reads)"""
+    return {
+        'read_p95': round(results['reads']['total']['p95_ms'] / baseline['reads']['total']['p95_ms'], 3),
+        'read_p99': round(results['reads']['total']['p99_ms'] / baseline['reads']['total']['p99_ms'], 3),
+        'apps_per_s': round(results['scan']['apps_per_s'] / baseline['scan']['apps_per_s'], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', default='default,tuned',
+                        help=f"Comma-separated engine configurations ({', '.join(CONFIGS)})")
+    parser.add_argument('--readers', type=int, default=8, help="Concurrent API reader threads")
+    parser.add_argument('--brands', type=int, default=5)
+    parser.add_argument('--clones', type=int, default=40, help="Clones per brand")
+    parser.add_argument('--noise', type=int, default=200, help="Unrelated apps in the marketplace")
+    parser.add_argument('--reviews', type=int, default=30, help="Reviews per app")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated latency per collector request")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results JSON to this file")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_config(args)))
+        return
+
+    configs = [config.strip() for config in args.configs.split(',') if config.strip()]
+    unknown = set(configs) - set(CONFIGS)
+    if unknown:
+        parser.error(f"Unknown configurations: {', '.join(sorted(unknown))}")
+
+    results = {
+        'config': {
+            'readers': args.readers, 'brands': args.brands, 'clones_per_brand': args.clones,
+            'noise_apps': args.noise, 'reviews_per_app': args.reviews,
+            'latency_ms': args.latency_ms, 'seed': args.seed,
+        },
+        'runs': {config: _spawn(config, args) for config in configs},
+    }
+    if 'default' in results['runs'] and 'tuned' in results['runs']:
+        results['tuned_vs_default'] = compare(results['runs']['tuned'], results['runs']['default'])
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Evaluate detector configurations against labelled data
+
+Usage:
+    python benchmarks/evaluate_detectors.py --output evaluation.json
+    python benchmarks/evaluate_detectors.py --synthetic --brands 20 --clones 30 --noise 500 \\
+        --workers 4 --cache eval_cache.json --target-precision 0.95 --target-recall 0.9
+
+Replays every case of the dataset (benchmarks/ground_truth.py) through the
+text, package, certificate, review and icon detectors in worker processes,
+recording each signal's value and CPU time per app. Signal outputs are cached
+(--cache), so sweeps over new weights or thresholds do not rerun detectors.
+
+The sweep covers every subset of signals (text is always computed, since it
+picks the brand a case is checked against), a grid of weight multipliers
+around the scoring engine's weights and a grid of thresholds. It reports:
+  - production: the scoring engine's default weights and detection threshold
+  - curve: the best configuration by F1 for each signal subset, by CPU cost
+  - cheapest: the cheapest configuration meeting the precision/recall target
+The icon signal is Hamming similarity of the cases' perceptual hashes, a
+stand-in for the ml_models/icon_similarity model (the dataset has no images).
+Scores combine like utils.scoring.ScoringEngine: a weighted mean over the
+signals available for the case; apps with an official package ID are genuine.
+CPU cost assumes every signal of a configuration runs (no short-circuiting),
+so it is an upper bound of what a scan spends.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+import numpy as np
+
+from benchmarks.ground_truth import load_labelled, load_synthetic
+from ml_models.certificate_analyzer.fingerprint_index import CertificateFingerprintIndex
+from ml_models.review_fraud.detector import ReviewFraudDetector
+from ml_models.text_similarity.detector import BrandProfile, TextSimilarityDetector
+from ml_models.text_similarity.package_index import PackageNamespaceIndex
+from utils.scoring import DEFAULT_WEIGHTS, DETECTION_THRESHOLD
+
+SIGNALS = ('text', 'package_imitation', 'certificate_mismatch', 'review_fraud', 'icon')
+
+# Signals the engine gives no weight by default still get one to sweep around
+SWEEP_BASE_WEIGHT = 0.15
+
+_worker = {}
+
+
+def _init_worker(brands, package_ids):
+    index = PackageNamespaceIndex()
+    for package_id in package_ids:
+        index.add(package_id)
+
+    # Brand IDs are positions in the dataset's brand list
+    certificates = CertificateFingerprintIndex()
+    for brand_id, brand in enumerate(brands):
+        certificates.add_brand(brand_id, brand.get('certificates'), brand['name'])
+
+    _worker.update(
+        brands={brand['name']: brand for brand in brands},
+        brand_ids={brand['name']: brand_id for brand_id, brand in enumerate(brands)},
+        profiles=[(brand['name'], BrandProfile(brand['name'])) for brand in brands],
+        official={pkg: brand['name'] for brand in brands for pkg in brand['package_ids']},
+        text=TextSimilarityDetector(),
+        reviews=ReviewFraudDetector(),
+        package_index=index,
+        certificates=certificates,
+    )
+
+
+def _timed(func):
+    start = time.thread_time()
+    value = func()
+    return value, time.thread_time() - start
+
+
+def _match_brand(case):
+    # Best brand by name similarity; this is the text signal
+    best_name, best_score = None, -1.0
+    for name, profile in _worker['profiles']:
+        score, _ = _worker['text'].compare_names(profile, case['app_name'])
+        if score > best_score:
+            best_name, best_score = name, score
+    return best_name, best_score
+
+
+def _package_imitation(case, brand):
+    index = _worker['package_index']
+    for official in brand['package_ids']:
+        matches = index.find_similar(official, max_distance=1) + \
+            index.find_similar(official, max_distance=1, namespace_depth=2)
+        if any(match['package_id'] == case['package_id'] for match in matches):
+            return 1.0
+    return 0.0
+
+
+def _certificate_mismatch(case, brand):
+    # As run_detection: no certificate is no evidence, matching goes through the fingerprint index
+    if not case.get('certificate_sha256'):
+        return None
+    brand_ids, _ = _worker['certificates'].verify({'sha256': case['certificate_sha256']})
+    return 0.0 if _worker['brand_ids'][brand['name']] in brand_ids else 1.0
+
+
+def _review_fraud(case, brand):
+    if not case.get('reviews'):
+        return None
+    # No app_id: the cross-app index would depend on how cases are split across workers
+    return _worker['reviews'].analyze_reviews(case['reviews'])['fraud_score']
+
+
+def _icon(case, brand):
+    # Stand-in for ml_models/icon_similarity: the dataset carries 64-bit perceptual
+    # hashes rather than icon images, so this is Hamming similarity of the hashes
+    if not case.get('icon_hash') or not brand.get('icon_hash'):
+        return None
+    distance = bin(int(case['icon_hash'], 16) ^ int(brand['icon_hash'], 16)).count('1')
+    return max(0.0, 1 - distance / 64.0)
+
+
+_DETECTORS = {
+    'package_imitation': _package_imitation,
+    'certificate_mismatch': _certificate_mismatch,
+    'review_fraud': _review_fraud,
+    'icon': _icon,
+}
+
+
+def _evaluate_case(task):
+    case, cached, signals = task
+    result = dict(cached or {})
+    outputs = dict(result.get('signals', {}))
+
+    if 'text' not in outputs:
+        (brand_name, score), cpu = _timed(lambda: _match_brand(case))
+        result['brand'] = brand_name
+        outputs['text'] = [score, cpu]
+
+    brand = _worker['brands'][result['brand']]
+    result['official'] = _worker['official'].get(case['package_id']) is not None
+
+    for signal in signals:
+        if signal not in outputs:
+            value, cpu = _timed(lambda: _DETECTORS[signal](case, brand))
+            outputs[signal] = [value, cpu]
+
+    result['signals'] = outputs
+    return case['package_id'], result
+
+
+def compute_signals(dataset, cache, workers=1):
+    """Signal values and CPU seconds for every case, reusing cached ones"""
+    package_ids = {case['package_id'] for case in dataset['cases']}
+    package_ids.update(pkg for brand in dataset['brands'] for pkg in brand['package_ids'])
+
+    entries = cache.setdefault(dataset['name'], {})
+    tasks = [(case, entries.get(case['package_id']), SIGNALS) for case in dataset['cases']
+             if set(SIGNALS) - set(entries.get(case['package_id'], {}).get('signals', {}))]
+
+    if tasks:
+        init_args = (dataset['brands'], sorted(package_ids))
+        if workers > 1:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as pool:
+                results = list(pool.map(_evaluate_case, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+        else:
+            _init_worker(*init_args)
+            results = [_evaluate_case(task) for task in tasks]
+        entries.update(results)
+
+    return [entries[case['package_id']] for case in dataset['cases']], len(tasks)
+
+
+def _weight_grid(multipliers):
+    base = np.array([DEFAULT_WEIGHTS.get(signal) or SWEEP_BASE_WEIGHT for signal in SIGNALS])
+    for subset_size in range(len(SIGNALS)):
+        for others in itertools.combinations(range(1, len(SIGNALS)), subset_size):
+            members = (0,) + others
+            for factors in itertools.product(multipliers, repeat=len(members)):
+                weights = np.zeros(len(SIGNALS))
+                for member, factor in zip(members, factors):
+                    weights[member] = base[member] * factor
+                yield members, weights
+
+
+def _metrics(predicted, labels):
+    tp = int((predicted & labels).sum())
+    fp = int((predicted & ~labels).sum())
+    fn = int((~predicted & labels).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4),
+            'tp': tp, 'fp': fp, 'fn': fn}
+
+
+def sweep(dataset, entries, thresholds, multipliers, target_precision, target_recall):
+    labels = np.array([case['is_fake'] for case in dataset['cases']])
+    official = np.array([entry['official'] for entry in entries])
+
+    values = np.array([[entry['signals'][s][0] if entry['signals'][s][0] is not None else np.nan
+                        for s in SIGNALS] for entry in entries], dtype=float)
+    cpu = np.array([[entry['signals'][s][1] for s in SIGNALS] for entry in entries], dtype=float)
+    available = ~np.isnan(values)
+    values = np.nan_to_num(values)
+    cpu_per_signal = cpu.mean(axis=0)
+
+    grid = list(_weight_grid(multipliers))
+    weights = np.array([w for _, w in grid])                          # configs x signals
+    numerator = (values * available) @ weights.T                      # cases x configs
+    denominator = available.astype(float) @ weights.T
+    scores = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+    scores[official] = 0.0
+    scores = np.round(scores, 4)
+
+    thresholds = np.array(thresholds)
+    predicted = scores[:, :, None] >= thresholds[None, None, :]       # cases x configs x thresholds
+    tp = (predicted & labels[:, None, None]).sum(axis=0)
+    fp = (predicted & ~labels[:, None, None]).sum(axis=0)
+    fn = (~predicted & labels[:, None, None]).sum(axis=0)
+    precision = np.divide(tp, tp + fp, out=np.zeros(tp.shape), where=(tp + fp) > 0)
+    recall = np.divide(tp, tp + fn, out=np.zeros(tp.shape), where=(tp + fn) > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(tp.shape),
+                   where=(precision + recall) > 0)
+
+    def describe(config, threshold_index):
+        members, config_weights = grid[config]
+        return {
+            'signals': [SIGNALS[m] for m in members],
+            'weights': {SIGNALS[m]: round(float(config_weights[m]), 4) for m in members},
+            'threshold': round(float(thresholds[threshold_index]), 4),
+            'precision': round(float(precision[config, threshold_index]), 4),
+            'recall': round(float(recall[config, threshold_index]), 4),
+            'f1': round(float(f1[config, threshold_index]), 4),
+            'cpu_ms_per_app': round(float(cpu_per_signal[list(members)].sum()) * 1000, 4),
+        }
+
+    # Best configuration per signal subset, ordered by cost
+    best = {}
+    for config, (members, _) in enumerate(grid):
+        threshold_index = int(f1[config].argmax())
+        if members not in best or f1[config, threshold_index] > f1[best[members]]:
+            best[members] = (config, threshold_index)
+    curve = sorted((describe(*position) for position in best.values()),
+                   key=lambda c: (c['cpu_ms_per_app'], -c['f1']))
+
+    # Cheapest configuration meeting the target
+    cheapest = None
+    meets = np.argwhere((precision >= target_precision) & (recall >= target_recall))
+    for config, threshold_index in meets:
+        candidate = describe(config, threshold_index)
+        if cheapest is None or (candidate['cpu_ms_per_app'], -candidate['f1']) < \
+                (cheapest['cpu_ms_per_app'], -cheapest['f1']):
+            cheapest = candidate
+
+    # The scoring engine as configured today
+    production_weights = np.array([DEFAULT_WEIGHTS.get(signal, 0.0) for signal in SIGNALS])
+    num = (values * available) @ production_weights
+    den = available.astype(float) @ production_weights
+    production_scores = np.round(np.divide(num, den, out=np.zeros_like(num), where=den > 0), 4)
+    production_scores[official] = 0.0
+    production_members = [i for i, w in enumerate(production_weights) if w > 0]
+    production = _metrics(production_scores >= DETECTION_THRESHOLD, labels)
+    production.update(threshold=DETECTION_THRESHOLD,
+                      weights={SIGNALS[i]: DEFAULT_WEIGHTS[SIGNALS[i]] for i in production_members},
+                      cpu_ms_per_app=round(float(cpu_per_signal[production_members].sum()) * 1000, 4))
+
+    signals = {
+        signal: {'available': round(float(available[:, i].mean()), 4),
+                 'cpu_ms_per_app': round(float(cpu_per_signal[i]) * 1000, 4)}
+        for i, signal in enumerate(SIGNALS)
+    }
+    return {
+        'configurations': len(grid) * len(thresholds),
+        'signals': signals,
+        'production': production,
+        'curve': curve,
+        'cheapest': cheapest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', action='store_true', help="Use a synthetic marketplace instead of the ground truth")
+    parser.add_argument('--brands', type=int, default=10)
+    parser.add_argument('--clones', type=int, default=20, help="Clones per brand")
+    parser.add_argument('--noise', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=20, help="Reviews per app")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--cache', help="JSON file caching per-signal outputs across runs")
+    parser.add_argument('--thresholds', default='0.3,0.4,0.5,0.55,0.6,0.65,0.7,0.75,0.8,0.85,0.9')
+    parser.add_argument('--multipliers', default='0.5,1,2', help="Weight multipliers swept per signal")
+    parser.add_argument('--target-precision', type=float, default=0.9)
+    parser.add_argument('--target-recall', type=float, default=0.9)
+    parser.add_argument('--output', help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        dataset = load_synthetic(args.brands, args.clones, args.noise, args.reviews, args.seed)
+    else:
+        dataset = load_labelled()
+
+    cache = {}
+    if args.cache and os.path.exists(args.cache):
+        with open(args.cache) as f:
+            cache = json.load(f)
+
+    start = time.perf_counter()
+    entries, computed = compute_signals(dataset, cache, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.cache and computed:
+        with open(args.cache, 'w') as f:
+            json.dump(cache, f)
+
+    results = {
+        'dataset': {
+            'name': dataset['name'],
+            'brands': len(dataset['brands']),
+            'cases': len(dataset['cases']),
+            'fake': sum(case['is_fake'] for case in dataset['cases']),
+        },
+        'computed_cases': computed,
+        'signal_seconds': round(elapsed, 3),
+        'target': {'precision': args.target_precision, 'recall': args.target_recall},
+    }
+    results.update(sweep(
+        dataset, entries,
+        thresholds=[float(t) for t in args.thresholds.split(',')],
+        multipliers=[float(m) for m in args.multipliers.split(',')],
+        target_precision=args.target_precision, target_recall=args.target_recall,
+    ))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
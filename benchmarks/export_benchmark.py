@@ -0,0 +1,182 @@
+"""
+Benchmark the columnar detections export
+
+Usage:
+    python benchmarks/export_benchmark.py --detections 200000 --output results.json
+    python benchmarks/export_benchmark.py --detections 500000 --chunk-sizes 10000,50000 --format arrow
+
+Fills a fresh SQLite database with one month of detections (with apps,
+brands and takedowns for a share of them), then times export_detections for
+each chunk size in its own process so peak RSS is per run. Reports rows/s,
+file size and peak RSS growth over the process baseline, plus an
+incremental run after a day of new detections to check the watermark.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MONTH_START = datetime(2024, 5, 1)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _setup_path():
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+
+def populate(detections: int, brands: int = 20, seed: int = 0, start: datetime = MONTH_START,
+             days: float = 30):
+    """Bulk insert detections spread over `days` from `start` through Core (not the ORM)"""
+    from database import Base, engine
+    from models.database_models import Brand, Detection, SuspiciousApp, Takedown
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(Brand.__table__.insert(), [
+            {'name': f"Brand{seed}_{i}", 'package_ids': [f"com.brand{i}.android"], 'icon_urls': [],
+             'developer_name': f"Brand {i} Inc."} for i in range(brands)
+        ])
+        brand_ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM brands")]
+        app_offset = conn.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM suspicious_apps").scalar()
+        detection_offset = conn.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM detections").scalar()
+
+        for chunk_start in range(0, detections, 20000):
+            count = min(20000, detections - chunk_start)
+            apps, rows, takedowns = [], [], []
+            for i in range(chunk_start, chunk_start + count):
+                at = start + timedelta(seconds=rng.random() * days * 86400)
+                app_id, detection_id = app_offset + i + 1, detection_offset + i + 1
+                apps.append({
+                    'id': app_id, 'package_id': f"com.fake{seed}_{i}.app", 'app_name': f"Fake app {i}",
+                    'developer_name': f"Dev {rng.randrange(1000)}", 'source': 'play_store',
+                    'store_url': f"https://play.example/{i}", 'download_count': rng.randrange(10 ** 6),
+                    'rating': round(rng.uniform(1, 5), 1), 'first_seen': at, 'last_checked': at,
+                })
+                rows.append({
+                    'id': detection_id, 'brand_id': rng.choice(brand_ids), 'suspicious_app_id': app_id,
+                    'icon_similarity_score': rng.random(), 'text_similarity_score': rng.random(),
+                    'certificate_match': False, 'review_fraud_score': rng.random(),
+                    'confidence_score': rng.uniform(0.7, 1.0), 'risk_level': rng.choice(['MEDIUM', 'HIGH', 'CRITICAL']),
+                    'detection_reasons': ['Name imitates brand', 'Certificate mismatch'],
+                    'status': rng.choice(['pending', 'confirmed', 'reported']), 'detected_at': at,
+                })
+                if rng.random() < 0.1:
+                    takedowns.append({'detection_id': detection_id, 'store': 'play_store',
+                                      'status': 'submitted', 'submitted_at': at + timedelta(hours=2)})
+            conn.execute(SuspiciousApp.__table__.insert(), apps)
+            conn.execute(Detection.__table__.insert(), rows)
+            if takedowns:
+                conn.execute(Takedown.__table__.insert(), takedowns)
+
+
+def run_child(args):
+    """One export in this process; prints a JSON result line"""
+    _setup_path()
+    from database import engine
+    from tasks.export_tasks import WRITERS, export_detections
+
+    baseline = _peak_rss_mb()
+    _, extension = WRITERS[args.format]
+    path = os.path.join(tempfile.mkdtemp(prefix='export_benchmark_'), f"detections.{extension}")
+
+    started = time.perf_counter()
+    exported = export_detections(path, format=args.format, chunk_size=args.chunk_size, bind=engine)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        'chunk_size': args.chunk_size,
+        'rows': exported['rows'],
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_s': round(exported['rows'] / elapsed, 1) if elapsed else None,
+        'file_mb': round(exported['bytes'] / (1024 * 1024), 2),
+        'peak_rss_growth_mb': round(_peak_rss_mb() - baseline, 1),
+    }))
+    os.remove(path)
+
+
+def _spawn(args, env, chunk_size):
+    command = [sys.executable, os.path.abspath(__file__), '--child', '--format', args.format,
+               '--chunk-size', str(chunk_size)]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='export_benchmark_')
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    env['EXPORT_DIR'] = os.path.join(workdir, 'exports')
+    env['REVIEW_INDEX_PATH'] = os.path.join(workdir, 'review_minhash.pkl')
+    env['REVIEWER_GRAPH_PATH'] = os.path.join(workdir, 'reviewer_graph.pkl')
+    os.environ.update(env)
+    _setup_path()
+
+    started = time.perf_counter()
+    populate(args.detections, seed=args.seed)
+    populate_s = time.perf_counter() - started
+
+    runs = [_spawn(args, env, int(size)) for size in args.chunk_sizes.split(',')]
+
+    # Incremental: the first run exports the month, the second only a new day
+    from tasks.export_tasks import run_incremental_export
+
+    until = MONTH_START + timedelta(days=31)
+    first = run_incremental_export(name='benchmark', format=args.format, until=until)
+    new_rows = max(args.detections // 30, 1)
+    populate(new_rows, seed=args.seed + 1, start=until, days=1)
+    started = time.perf_counter()
+    second = run_incremental_export(name='benchmark', format=args.format, until=until + timedelta(days=1))
+    incremental_s = time.perf_counter() - started
+
+    return {
+        'config': {'detections': args.detections, 'format': args.format, 'seed': args.seed},
+        'populate_s': round(populate_s, 2),
+        'exports': runs,
+        'incremental': {
+            'first_rows': first['rows'],
+            'second_rows': second['rows'],
+            'expected_second_rows': new_rows,
+            'second_elapsed_s': round(incremental_s, 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--detections', type=int, default=200000, help="Detections in the month")
+    parser.add_argument('--chunk-sizes', default='10000,50000', help="Comma-separated rows per chunk to compare")
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results JSON to this file")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--chunk-size', type=int, default=10000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Labelled datasets for detector evaluation
+
+Every loader returns {'name', 'brands': [...], 'cases': [...]} where a brand is
+{'name', 'package_ids', 'developer_name', 'certificates', 'icon_hash'} and a
+case is {'package_id', 'app_name', 'developer', 'is_fake', ...} with optional
+'reviews', 'icon_hash' and 'certificate_sha256' for the detectors that need them.
+"""
+import json
+import os
+import re
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROUND_TRUTH_PATH = os.path.join(ROOT, 'GROUND_TRUTH_DATASET.md')
+SAMPLE_RESULTS_PATH = os.path.join(ROOT, 'sample_outputs', 'detection_results_sample.json')
+
+_TABLE_ROW = re.compile(r'^\|\s*\d+\s*\|')
+
+
+def _table_rows(lines: List[str]) -> List[List[str]]:
+    return [[cell.strip() for cell in line.strip().strip('|').split('|')]
+            for line in lines if _TABLE_ROW.match(line.strip())]
+
+
+def load_ground_truth(path: str = GROUND_TRUTH_PATH) -> Dict:
+    """
+    GROUND_TRUTH_DATASET.md: the genuine apps are the protected brands, the
+    fakes are checked against them
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+
+    genuine_section, _, rest = text.partition('## ⚠️ Fake Apps')
+    fake_section = rest.split('## 📊', 1)[0]
+
+    brands, cases = [], []
+    for _, name, package_id, developer, *_ in _table_rows(genuine_section.splitlines()):
+        brands.append({'name': name, 'package_ids': [package_id], 'developer_name': developer,
+                       'certificates': [], 'icon_hash': None})
+        cases.append({'package_id': package_id, 'app_name': name, 'developer': developer, 'is_fake': False})
+
+    for _, name, package_id, developer, attack, *_ in _table_rows(fake_section.splitlines()):
+        cases.append({'package_id': package_id, 'app_name': name, 'developer': developer,
+                      'is_fake': True, 'attack': attack})
+
+    return {'name': 'ground_truth', 'brands': brands, 'cases': cases}
+
+
+def load_sample_results(path: str = SAMPLE_RESULTS_PATH, brands: List[Dict] = None) -> Dict:
+    """sample_outputs/detection_results_sample.json, checked against the ground truth brands"""
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)['detection_results']
+
+    cases = [{'package_id': r['package_id'], 'app_name': r['app_name'], 'developer': r['developer'],
+              'is_fake': r['is_fake']} for r in results]
+    return {'name': 'sample_results', 'brands': brands or load_ground_truth()['brands'], 'cases': cases}
+
+
+def load_labelled(include_samples: bool = True) -> Dict:
+    """Ground truth plus sample results, deduplicated by package ID"""
+    dataset = load_ground_truth()
+    if include_samples:
+        known = {case['package_id'] for case in dataset['cases']}
+        for case in load_sample_results(brands=dataset['brands'])['cases']:
+            if case['package_id'] not in known:
+                dataset['cases'].append(case)
+                known.add(case['package_id'])
+        dataset['name'] = 'ground_truth+samples'
+    return dataset
+
+
+def load_synthetic(brands: int = 10, clones_per_brand: int = 20, noise_apps: int = 200,
+                   reviews_per_app: int = 20, seed: int = 0) -> Dict:
+    """A synthetic marketplace, with reviews, icon hashes and certificates for every app"""
+    from benchmarks.synthetic_marketplace import generate_marketplace
+
+    marketplace = generate_marketplace(brands, clones_per_brand, noise_apps, reviews_per_app, seed)
+    cases = []
+    for app in marketplace['apps']:
+        cases.append({
+            'package_id': app['package_id'], 'app_name': app['app_name'], 'developer': app['developer'],
+            'is_fake': app['is_clone'], 'icon_hash': app['icon_hash'],
+            'certificate_sha256': app['certificate_sha256'],
+            'reviews': marketplace['reviews'][app['package_id']],
+        })
+    name = f"synthetic-b{brands}-c{clones_per_brand}-n{noise_apps}-r{reviews_per_app}-s{seed}"
+    return {'name': name, 'brands': marketplace['brands'], 'cases': cases}
+
+
+# Usage example
+if __name__ == "__main__":
+    for dataset in (load_labelled(), load_synthetic(brands=2, clones_per_brand=5, noise_apps=5)):
+        fakes = sum(case['is_fake'] for case in dataset['cases'])
+        print(f"{dataset['name']}: {len(dataset['brands'])} brands, "
+              f"{len(dataset['cases'])} cases ({fakes} fake)")
@@ -0,0 +1,121 @@
+"""
+Benchmark HTML parsing throughput of the APK site collectors
+
+Usage:
+    python benchmarks/html_parse_benchmark.py --runs 20 --output results.json
+
+Parses the pages in benchmarks/fixtures with each parsing strategy and
+reports pages/s and MB/s per collector page type:
+  - html.parser: full tree with the pure-Python parser (previous behaviour)
+  - lxml: full tree with lxml
+  - lxml+strainer: lxml building only the result containers (search pages)
+All strategies must extract the same data; the run aborts otherwise.
+
+The fixtures are hand-built in APKMirror's markup structure (result rows,
+navigation, sidebars, inline scripts) at realistic page weight.
+APKPure is not benchmarked: its collector does not parse results yet.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from bs4 import BeautifulSoup
+
+from collectors import html_parsing
+from collectors.apk_sites_collector import APKMirrorCollector
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _time_runs(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _with_parser(parser, func):
+    def run():
+        previous = html_parsing.HTML_PARSER
+        html_parsing.HTML_PARSER = parser
+        try:
+            return func()
+        finally:
+            html_parsing.HTML_PARSER = previous
+    return run
+
+
+def _full_tree_search(collector, content, parser):
+    # Search parsing as done before partial parsing: whole page, then find_all
+    def run():
+        soup = BeautifulSoup(content, parser)
+        return [collector._parse_app_element(element)
+                for element in soup.find_all('div', class_='listWidget')[:30]]
+    return run
+
+
+def _cases(collector):
+    search = open(os.path.join(FIXTURES, 'apkmirror_search.html'), 'rb').read()
+    details = open(os.path.join(FIXTURES, 'apkmirror_details.html'), 'rb').read()
+
+    return {
+        'apk_mirror.search': (search, {
+            'html.parser': _full_tree_search(collector, search, 'html.parser'),
+            'lxml': _full_tree_search(collector, search, 'lxml'),
+            'lxml+strainer': _with_parser('lxml', lambda: collector.parse_search_results(search)),
+        }),
+        'apk_mirror.details': (details, {
+            'html.parser': _with_parser('html.parser', lambda: collector.parse_apk_details(details)),
+            'lxml': _with_parser('lxml', lambda: collector.parse_apk_details(details)),
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--output', help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    collector = APKMirrorCollector()
+    results = {'runs': args.runs, 'default_parser': html_parsing.HTML_PARSER, 'pages': {}}
+
+    for name, (content, strategies) in _cases(collector).items():
+        expected = None
+        page = {'size_kb': round(len(content) / 1024, 1), 'strategies': {}}
+
+        for strategy, func in strategies.items():
+            output = func()
+            if expected is None:
+                expected = output
+            assert output == expected, f"{name}: {strategy} extracted different data"
+
+            seconds = _time_runs(func, args.runs)
+            page['strategies'][strategy] = {
+                'median_ms': round(seconds * 1000, 3),
+                'pages_per_s': round(1 / seconds, 1),
+                'mb_per_s': round(len(content) / (1024 * 1024) / seconds, 2),
+            }
+
+        baseline = page['strategies']['html.parser']['median_ms']
+        for stats in page['strategies'].values():
+            stats['speedup'] = round(baseline / stats['median_ms'], 2)
+        results['pages'][name] = page
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Benchmark end-to-end scan throughput against a synthetic marketplace
+
+Usage:
+    python benchmarks/scan_benchmark.py --brands 20 --clones 30 --noise 500 --output results.json
+    python benchmarks/scan_benchmark.py --compare baseline.json --output results.json
+
+Generates a marketplace (benchmarks/synthetic_marketplace.py), registers stub
+collectors for it and runs one run_scan_job per brand over both stub sources
+against a fresh SQLite database. Reports:
+  - apps/s over all scans
+  - per-stage latency percentiles (search, listing refresh, reviews, detection, ...)
+  - DB round trips (statements executed), total and per app
+  - peak RSS of the process
+  - detection precision/recall against the marketplace ground truth
+With --compare, metrics are also printed relative to an earlier results file.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from functools import wraps
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+# Keep the benchmark's database and state files out of data/
+_workdir = tempfile.mkdtemp(prefix='scan_benchmark_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'benchmark.db')}"
+os.environ['REVIEW_INDEX_PATH'] = os.path.join(_workdir, 'review_minhash.pkl')
+os.environ['REVIEWER_GRAPH_PATH'] = os.path.join(_workdir, 'reviewer_graph.pkl')
+os.environ['QUERY_PLANNER_PATH'] = os.path.join(_workdir, 'query_planner.json')
+os.environ['SCORING_CONFIG_PATH'] = os.path.join(_workdir, 'scoring_weights.json')
+
+from sqlalchemy import event
+
+from database import Base, SessionLocal, engine
+from models.database_models import Brand, Detection, ScanJob, SuspiciousApp
+from tasks import scan_tasks
+from benchmarks.synthetic_marketplace import MarketplaceCollector, generate_marketplace
+
+SOURCES = ['synthetic_store', 'synthetic_mirror']
+
+# Functions timed as scan stages, as looked up by scan_tasks
+STAGES = {
+    'score_candidate': 'score_candidate',
+    'detection': 'run_detection',
+    'listing_refresh': 'get_listing',
+    'reviews': 'ingest_app_reviews',
+    'apk_analysis': 'get_apk_analysis',
+}
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, stage, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+        return timed
+
+    def wrap_iterator(self, stage, func):
+        # Time spent waiting for each item of a generator
+        @wraps(func)
+        def timed(*args, **kwargs):
+            iterator = iter(func(*args, **kwargs))
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.samples[stage].append(time.perf_counter() - start)
+                yield item
+        return timed
+
+    def summary(self):
+        stages = {}
+        for stage, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            stages[stage] = {
+                'count': len(ordered),
+                'total_s': round(sum(ordered), 4),
+                'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+                'p95_ms': round(_percentile(ordered, 95) * 1000, 3),
+                'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+        return stages
+
+
+def _percentile(ordered, percent):
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method='inclusive')[percent - 1]
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _accuracy(db, marketplace):
+    truth = {app['package_id']: app for app in marketplace['apps']}
+    brand_names = {brand.id: brand.name for brand in db.query(Brand)}
+
+    flagged = set()
+    for detection, package_id in db.query(Detection, SuspiciousApp.package_id).join(
+            SuspiciousApp, Detection.suspicious_app_id == SuspiciousApp.id):
+        flagged.add((brand_names[detection.brand_id], package_id))
+
+    clones = {(app['brand'], pkg) for pkg, app in truth.items() if app['is_clone']}
+    true_positives = len(flagged & clones)
+    return {
+        'clones': len(clones),
+        'detections': len(flagged),
+        'true_positives': true_positives,
+        'precision': round(true_positives / len(flagged), 4) if flagged else None,
+        'recall': round(true_positives / len(clones), 4) if clones else None,
+    }
+
+
+def run(args):
+    marketplace = generate_marketplace(
+        brands=args.brands, clones_per_brand=args.clones, noise_apps=args.noise,
+        reviews_per_app=args.reviews, seed=args.seed,
+    )
+    MarketplaceCollector.marketplace = marketplace
+    MarketplaceCollector.latency = args.latency_ms / 1000
+    MarketplaceCollector.noise_per_search = args.noise_per_search
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    brand_ids = []
+    for brand in marketplace['brands']:
+        row = Brand(name=brand['name'], package_ids=brand['package_ids'],
+                    icon_urls=brand['icon_urls'], developer_name=brand['developer_name'])
+        db.add(row)
+        db.flush()
+        brand_ids.append(row.id)
+    db.commit()
+
+    timer = StageTimer()
+    for stage, name in STAGES.items():
+        setattr(scan_tasks, name, timer.wrap(stage, getattr(scan_tasks, name)))
+    scan_tasks.stream_apps = timer.wrap_iterator('search', scan_tasks.stream_apps)
+
+    round_trips = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_round_trip(conn, cursor, statement, parameters, context, executemany):
+        round_trips[0] += 1
+
+    started = time.perf_counter()
+    jobs = []
+    for brand_id in brand_ids:
+        job = ScanJob(brand_id=brand_id, sources=SOURCES, status='pending')
+        db.add(job)
+        db.commit()
+        scan_start = time.perf_counter()
+        scan_tasks.run_scan_job(job.id)
+        timer.samples['scan_job'].append(time.perf_counter() - scan_start)
+        jobs.append(job.id)
+    elapsed = time.perf_counter() - started
+    event.remove(engine, "before_cursor_execute", count_round_trip)
+
+    db.expire_all()
+    scans = db.query(ScanJob).filter(ScanJob.id.in_(jobs)).all()
+    failed = [scan.error_message for scan in scans if scan.status != 'completed']
+    apps_scanned = sum(scan.apps_scanned or 0 for scan in scans)
+
+    results = {
+        'commit': _git_commit(),
+        'config': {
+            'brands': args.brands, 'clones_per_brand': args.clones, 'noise_apps': args.noise,
+            'noise_per_search': args.noise_per_search, 'reviews_per_app': args.reviews,
+            'latency_ms': args.latency_ms, 'seed': args.seed, 'sources': SOURCES,
+        },
+        'scans': len(scans),
+        'failed_scans': failed,
+        'apps_scanned': apps_scanned,
+        'elapsed_s': round(elapsed, 3),
+        'apps_per_s': round(apps_scanned / elapsed, 2) if elapsed else None,
+        'db_round_trips': round_trips[0],
+        'db_round_trips_per_app': round(round_trips[0] / apps_scanned, 2) if apps_scanned else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        'stages': timer.summary(),
+        'accuracy': _accuracy(db, marketplace),
+    }
+    db.close()
+    return results
+
+
+def compare(results, baseline):
+    """Ratios of headline metrics to a baseline results file (>1 means higher now)"""
+    keys = ('apps_per_s', 'db_round_trips_per_app', 'peak_rss_mb')
+    comparison = {key: round(results[key] / baseline[key], 3)
+                  for key in keys if results.get(key) and baseline.get(key)}
+    comparison['stages_p95'] = {
+        stage: round(stats['p95_ms'] / baseline['stages'][stage]['p95_ms'], 3)
+        for stage, stats in results['stages'].items()
+        if baseline.get('stages', {}).get(stage, {}).get('p95_ms')
+    }
+    comparison['baseline_commit'] = baseline.get('commit')
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--brands', type=int, default=10)
+    parser.add_argument('--clones', type=int, default=20, help="Clones per brand")
+    parser.add_argument('--noise', type=int, default=200, help="Unrelated apps in the marketplace")
+    parser.add_argument('--noise-per-search', type=int, default=10)
+    parser.add_argument('--reviews', type=int, default=20, help="Reviews per app")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated latency per collector request")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--output', help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.compare:
+        with open(args.compare) as f:
+            results['comparison'] = compare(results, json.load(f))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Synthetic APK builder for benchmarks
+
+Writes a structurally valid APK: binary AndroidManifest.xml, launcher icons,
+a large stored payload, a v1 META-INF/CERT.RSA and an APK Signature Scheme
+v2 block, both holding a self-made X.509 certificate. The signatures are
+random bytes, so the file parses like a real APK but does not verify.
+"""
+import os
+import struct
+import zipfile
+from typing import List, Optional
+
+
+def _der(tag: int, content: bytes) -> bytes:
+    length = len(content)
+    if length < 0x80:
+        encoded = bytes([length])
+    else:
+        raw = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+        encoded = bytes([0x80 | len(raw)]) + raw
+    return bytes([tag]) + encoded + content
+
+
+def _oid(dotted: str) -> bytes:
+    arcs = [int(arc) for arc in dotted.split('.')]
+    body = bytes([arcs[0] * 40 + arcs[1]])
+    for arc in arcs[2:]:
+        chunk = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            chunk.insert(0, 0x80 | (arc & 0x7F))
+            arc >>= 7
+        body += bytes(chunk)
+    return _der(0x06, body)
+
+
+def _name(common_name: str, organization: str) -> bytes:
+    return _der(0x30,
+                _der(0x31, _der(0x30, _oid('2.5.4.3') + _der(0x0C, common_name.encode()))) +
+                _der(0x31, _der(0x30, _oid('2.5.4.10') + _der(0x0C, organization.encode()))))
+
+
+def build_certificate(common_name: str = "Android Debug", organization: str = "Android",
+                      serial: int = 1) -> bytes:
+    """DER X.509 certificate with the fields the analyzers read"""
+    algorithm = _der(0x30, _oid('1.2.840.113549.1.1.11') + _der(0x05, b''))
+    public_key = _der(0x30, _der(0x30, _oid('1.2.840.113549.1.1.1') + _der(0x05, b'')) +
+                      _der(0x03, b'\x00' + os.urandom(270)))
+    tbs = _der(0x30,
+               _der(0xA0, _der(0x02, b'\x02')) +
+               _der(0x02, serial.to_bytes(8, 'big')) +
+               algorithm +
+               _name(common_name, organization) +
+               _der(0x30, _der(0x17, b'230101000000Z') + _der(0x17, b'480101000000Z')) +
+               _name(common_name, organization) +
+               public_key)
+    return _der(0x30, tbs + algorithm + _der(0x03, b'\x00' + os.urandom(256)))
+
+
+def build_pkcs7(certificate: bytes) -> bytes:
+    """PKCS#7 SignedData carrying the certificate (v1 META-INF/CERT.RSA)"""
+    signed_data = _der(0x30,
+                       _der(0x02, b'\x01') +
+                       _der(0x31, _der(0x30, _oid('2.16.840.1.101.3.4.2.1') + _der(0x05, b''))) +
+                       _der(0x30, _oid('1.2.840.113549.1.7.1')) +
+                       _der(0xA0, certificate) +
+                       _der(0x31, b''))
+    return _der(0x30, _oid('1.2.840.113549.1.7.2') + _der(0xA0, signed_data))
+
+
+def build_manifest(package_id: str, permissions: List[str], min_sdk: int = 21) -> bytes:
+    """Binary (AXML) AndroidManifest.xml with package, uses-sdk and uses-permission"""
+    strings = ['manifest', 'package', package_id, 'uses-sdk', 'minSdkVersion',
+               'uses-permission', 'name', 'http://schemas.android.com/apk/res/android']
+    strings.extend(permissions)
+    index = {value: i for i, value in enumerate(strings)}
+    android_ns = index['http://schemas.android.com/apk/res/android']
+
+    pool_data = b''
+    offsets = []
+    for value in strings:
+        offsets.append(len(pool_data))
+        encoded = value.encode('utf-16-le')
+        pool_data += struct.pack('<H', len(value)) + encoded + b'\x00\x00'
+    pool_data += b'\x00' * (-len(pool_data) % 4)
+
+    strings_start = 28 + 4 * len(strings)
+    pool = struct.pack('<HHIIIIII', 0x0001, 28, strings_start + len(pool_data),
+                       len(strings), 0, 0, strings_start, 0)
+    pool += struct.pack(f'<{len(offsets)}I', *offsets) + pool_data
+
+    def start_element(name, attributes):
+        attrs = b''
+        for attr_ns, attr_name, value in attributes:
+            if isinstance(value, int):
+                attrs += struct.pack('<IIIHBBI', attr_ns, index[attr_name], 0xFFFFFFFF, 8, 0, 0x10, value)
+            else:
+                attrs += struct.pack('<IIIHBBI', attr_ns, index[attr_name], index[value], 8, 0, 0x03, index[value])
+        body = struct.pack('<IIIIHHHHHH', 0, 0xFFFFFFFF, 0xFFFFFFFF, index[name], 20, 20,
+                           len(attributes), 0, 0, 0) + attrs
+        return struct.pack('<HHI', 0x0102, 16, 8 + len(body)) + body
+
+    def end_element(name):
+        return struct.pack('<HHIIIII', 0x0103, 16, 24, 0, 0xFFFFFFFF, 0xFFFFFFFF, index[name])
+
+    body = start_element('manifest', [(0xFFFFFFFF, 'package', package_id)])
+    body += start_element('uses-sdk', [(android_ns, 'minSdkVersion', min_sdk)]) + end_element('uses-sdk')
+    for permission in permissions:
+        body += start_element('uses-permission', [(android_ns, 'name', permission)])
+        body += end_element('uses-permission')
+    body += end_element('manifest')
+
+    return struct.pack('<HHI', 0x0003, 8, 8 + len(pool) + len(body)) + pool + body
+
+
+def _length_prefixed(data: bytes) -> bytes:
+    return struct.pack('<I', len(data)) + data
+
+
+def build_signing_block(certificate: bytes) -> bytes:
+    """APK Signing Block holding a v2 signer with the given certificate"""
+    signed_data = (_length_prefixed(b'') +
+                   _length_prefixed(_length_prefixed(certificate)) +
+                   _length_prefixed(b''))
+    signer = (_length_prefixed(signed_data) +
+              _length_prefixed(os.urandom(64)) +
+              _length_prefixed(os.urandom(32)))
+    value = _length_prefixed(_length_prefixed(signer))
+
+    pairs = struct.pack('<QI', len(value) + 4, 0x7109871a) + value
+    size = len(pairs) + 8 + 16
+    return struct.pack('<Q', size) + pairs + struct.pack('<Q', size) + b'APK Sig Block 42'
+
+
+def build_apk(path: str, package_id: str = "com.paypa1.wallet",
+              permissions: Optional[List[str]] = None, payload_mb: int = 100,
+              certificate: Optional[bytes] = None) -> str:
+    """Write a synthetic APK of roughly payload_mb megabytes to path"""
+    permissions = permissions or [
+        'android.permission.INTERNET',
+        'android.permission.READ_SMS',
+        'android.permission.SEND_SMS',
+        'android.permission.SYSTEM_ALERT_WINDOW',
+    ]
+    certificate = certificate or build_certificate()
+
+    with zipfile.ZipFile(path, 'w') as apk:
+        apk.writestr('AndroidManifest.xml', build_manifest(package_id, permissions), zipfile.ZIP_DEFLATED)
+        for density, size in (('mdpi', 4 * 1024), ('xhdpi', 16 * 1024), ('xxxhdpi', 48 * 1024)):
+            apk.writestr(f'res/mipmap-{density}-v4/ic_launcher.png',
+                         b'\x89PNG\r\n\x1a\n' + os.urandom(size), zipfile.ZIP_STORED)
+        with apk.open('assets/payload.bin', 'w') as payload:
+            for _ in range(payload_mb):
+                payload.write(os.urandom(1024 * 1024))
+        for sdk_entry in ('META-INF/androidx.core_core.version', 'firebase-messaging.properties',
+                          'lib/arm64-v8a/libsqlcipher.so', 'okhttp3/internal/publicsuffix/publicsuffixes.gz'):
+            apk.writestr(sdk_entry, os.urandom(64), zipfile.ZIP_STORED)
+        apk.writestr('META-INF/MANIFEST.MF', b'Manifest-Version: 1.0\r\n\r\n', zipfile.ZIP_DEFLATED)
+        apk.writestr('META-INF/CERT.SF', b'Signature-Version: 1.0\r\n\r\n', zipfile.ZIP_DEFLATED)
+        apk.writestr('META-INF/CERT.RSA', build_pkcs7(certificate), zipfile.ZIP_DEFLATED)
+        apk.writestr('classes.dex', b'dex\n035\x00' + os.urandom(256 * 1024), zipfile.ZIP_STORED)
+
+    # Splice the signing block in front of the central directory
+    with open(path, 'r+b') as f:
+        f.seek(-22, os.SEEK_END)
+        eocd = bytearray(f.read(22))
+        cd_size, cd_offset = struct.unpack_from('<II', eocd, 12)
+        f.seek(cd_offset)
+        central_directory = f.read(cd_size)
+
+        block = build_signing_block(certificate)
+        struct.pack_into('<I', eocd, 16, cd_offset + len(block))
+
+        f.seek(cd_offset)
+        f.truncate()
+        f.write(block + central_directory + bytes(eocd))
+
+    return path
@@ -0,0 +1,292 @@
+"""
+Synthetic app marketplace for benchmarks
+
+Generates brands with official apps, clones of each brand (typos, homoglyphs,
+affix words, lookalike package namespaces, near-identical icons, bursts of
+templated reviews) and unrelated noise apps at any scale, deterministically
+from a seed. Stub collectors serve the marketplace through the collector
+registry so scans run end-to-end without network access.
+"""
+import hashlib
+import random
+import string
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from collectors.base import (
+    CAPABILITY_DETAILS, CAPABILITY_REVIEWS, BaseCollector, register_collector,
+)
+from ml_models.text_similarity.homoglyph_index import CHAR_SUBSTITUTIONS, CONFUSABLES
+
+
+BRAND_WORDS = [
+    'pay', 'chat', 'bank', 'wallet', 'cloud', 'photo', 'music', 'ride', 'food', 'shop',
+    'mail', 'maps', 'trade', 'fit', 'news', 'video', 'game', 'travel', 'crypto', 'health',
+]
+BRAND_SUFFIXES = ['pal', 'ly', 'io', 'hub', 'go', 'box', 'zen', 'nova', 'wise', 'up']
+AFFIXES = ['Pro', 'Lite', 'Official', 'Plus', 'Free', 'New', 'Premium', '2024', 'Gold', 'Update']
+TEMPLATE_REVIEWS = [
+    "Best app ever!!! Must download now 5 stars",
+    "Amazing app works perfectly, recommend to everyone",
+    "Great app very useful, five stars from me",
+]
+GENUINE_REVIEW_WORDS = [
+    'crashes', 'after', 'update', 'login', 'slow', 'support', 'helpful', 'transfer', 'fees',
+    'design', 'notifications', 'battery', 'fast', 'easy', 'confusing', 'feature', 'missing',
+]
+
+_HOMOGLYPHS = {}
+for _lookalike, _latin in CONFUSABLES.items():
+    if len(_latin) == 1:
+        _HOMOGLYPHS.setdefault(_latin, []).append(_lookalike)
+
+
+def _icon_hash(rng: random.Random, base: Optional[int] = None, flips: int = 0) -> str:
+    # 64-bit perceptual-hash-like value; clones flip a few bits of the brand's
+    value = rng.getrandbits(64) if base is None else base
+    for _ in range(flips):
+        value ^= 1 << rng.randrange(64)
+    return f"{value:016x}"
+
+
+def _certificate(rng: random.Random) -> str:
+    return '%064x' % rng.getrandbits(256)
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    letters = list(name)
+    kind = rng.choice(('substitute', 'transpose', 'double', 'drop'))
+    positions = [i for i, c in enumerate(letters) if c.lower() in CHAR_SUBSTITUTIONS]
+
+    if kind == 'substitute' and positions:
+        i = rng.choice(positions)
+        letters[i] = rng.choice(CHAR_SUBSTITUTIONS[letters[i].lower()])
+    elif kind == 'transpose' and len(letters) > 2:
+        i = rng.randrange(len(letters) - 1)
+        letters[i], letters[i + 1] = letters[i + 1], letters[i]
+    elif kind == 'double':
+        i = rng.randrange(len(letters))
+        letters.insert(i, letters[i])
+    elif len(letters) > 3:
+        del letters[rng.randrange(1, len(letters))]
+    return ''.join(letters)
+
+
+def _homoglyph(rng: random.Random, name: str) -> str:
+    letters = list(name)
+    positions = [i for i, c in enumerate(letters) if c.lower() in _HOMOGLYPHS]
+    for i in rng.sample(positions, k=min(len(positions), rng.randint(1, 2))):
+        letters[i] = rng.choice(_HOMOGLYPHS[letters[i].lower()])
+    return ''.join(letters)
+
+
+def _package_component(rng: random.Random, component: str) -> str:
+    # One edit, the way clones squat on a namespace (paypal -> paypa1)
+    swaps = {'l': '1', 'o': '0', 'i': '1', 'e': '3', 'a': '4', 's': '5'}
+    positions = [i for i, c in enumerate(component) if c in swaps]
+    if positions:
+        i = rng.choice(positions)
+        return component[:i] + swaps[component[i]] + component[i + 1:]
+    return component + rng.choice(string.ascii_lowercase)
+
+
+def _reviews(rng: random.Random, package_id: str, count: int, fraudulent: bool, now: datetime) -> List[Dict]:
+    reviews = []
+    for i in range(count):
+        if fraudulent and rng.random() < 0.7:
+            text = rng.choice(TEMPLATE_REVIEWS)
+            rating = 5
+            at = now - timedelta(hours=rng.random() * 48)  # posted in a burst
+        else:
+            text = ' '.join(rng.choices(GENUINE_REVIEW_WORDS, k=rng.randint(5, 15))).capitalize()
+            rating = rng.randint(1, 5)
+            at = now - timedelta(days=rng.random() * 365)
+        reviews.append({
+            'review_id': hashlib.md5(f"{package_id}:{i}".encode()).hexdigest(),
+            'text': text,
+            'rating': rating,
+            'date': at.strftime('%Y-%m-%d'),
+            'at': at,
+            'author': f"user{rng.randrange(10 ** 6)}",
+            'helpful_count': rng.randint(0, 5) if not fraudulent else 0,
+        })
+    return sorted(reviews, key=lambda r: r['at'], reverse=True)
+
+
+def generate_marketplace(brands: int = 10, clones_per_brand: int = 20, noise_apps: int = 200,
+                         reviews_per_app: int = 20, seed: int = 0) -> Dict:
+    """
+    Returns {'brands': [...], 'apps': [...], 'reviews': {package_id: [...]}}
+    Every app dict carries 'brand' (the brand it imitates, or None) and
+    'is_clone' as ground truth
+    """
+    rng = random.Random(seed)
+    now = datetime(2024, 6, 1)
+    used_names = set()
+    marketplace = {'brands': [], 'apps': [], 'reviews': {}}
+
+    def add_app(app, fraudulent):
+        marketplace['apps'].append(app)
+        marketplace['reviews'][app['package_id']] = _reviews(
+            rng, app['package_id'], reviews_per_app, fraudulent, now
+        )
+
+    for _ in range(brands):
+        while True:
+            name = rng.choice(BRAND_WORDS).capitalize() + rng.choice(BRAND_SUFFIXES).capitalize()
+            if name not in used_names:
+                used_names.add(name)
+                break
+
+        company = name.lower()
+        developer = f"{name} Inc."
+        package_id = f"com.{company}.android"
+        icon = int(_icon_hash(rng), 16)
+        certificate = _certificate(rng)
+
+        brand = {
+            'name': name,
+            'package_ids': [package_id],
+            'developer_name': developer,
+            'icon_urls': [f"https://img.example/{company}.png"],
+            'icon_hash': f"{icon:016x}",
+            'certificates': [certificate],
+        }
+        marketplace['brands'].append(brand)
+
+        add_app({
+            'package_id': package_id, 'app_name': name, 'developer': developer,
+            'icon_url': brand['icon_urls'][0], 'icon_hash': brand['icon_hash'],
+            'certificate_sha256': certificate,
+            'rating': round(rng.uniform(4.0, 4.8), 1), 'download_count': 10 ** rng.randint(6, 9),
+            'brand': name, 'is_clone': False,
+        }, fraudulent=False)
+
+        for i in range(clones_per_brand):
+            style = rng.choice(('typo', 'homoglyph', 'affix', 'exact'))
+            if style == 'typo':
+                clone_name = _typo(rng, name)
+            elif style == 'homoglyph':
+                clone_name = _homoglyph(rng, name)
+            elif style == 'affix':
+                clone_name = f"{name} {rng.choice(AFFIXES)}"
+            else:
+                clone_name = name
+
+            if rng.random() < 0.5:
+                clone_package = f"com.{_package_component(rng, company)}.android"
+                if i:
+                    clone_package += f".v{i}"
+            else:
+                clone_package = f"com.{''.join(rng.choices(string.ascii_lowercase, k=8))}.{company}{i}"
+
+            add_app({
+                'package_id': clone_package, 'app_name': clone_name,
+                'developer': rng.choice([developer, f"{name} Team", f"Dev{rng.randrange(1000)}"]),
+                'icon_url': f"https://img.example/clone/{clone_package}.png",
+                'icon_hash': _icon_hash(rng, icon, flips=rng.randint(1, 6)),
+                'certificate_sha256': _certificate(rng),
+                'rating': round(rng.uniform(3.0, 5.0), 1), 'download_count': 10 ** rng.randint(2, 5),
+                'brand': name, 'is_clone': True,
+            }, fraudulent=rng.random() < 0.6)
+
+    for i in range(noise_apps):
+        words = rng.sample(BRAND_WORDS, 2)
+        noise_name = f"{words[0].capitalize()} {words[1].capitalize()} {rng.choice(['Master', 'Tools', 'Daily', 'Lab'])}"
+        add_app({
+            'package_id': f"com.{''.join(rng.choices(string.ascii_lowercase, k=6))}.{words[0]}{i}",
+            'app_name': noise_name, 'developer': f"Studio {rng.randrange(10 ** 4)}",
+            'icon_url': f"https://img.example/noise/{i}.png", 'icon_hash': _icon_hash(rng),
+            'certificate_sha256': _certificate(rng),
+            'rating': round(rng.uniform(2.5, 4.9), 1), 'download_count': 10 ** rng.randint(2, 7),
+            'brand': None, 'is_clone': False,
+        }, fraudulent=False)
+
+    return marketplace
+
+
+class MarketplaceCollector(BaseCollector):
+    """Serves a synthetic marketplace; set .marketplace before scanning"""
+
+    marketplace: Dict = {'brands': [], 'apps': [], 'reviews': {}}
+    latency: float = 0.0  # seconds per request
+    noise_per_search: int = 10
+
+    def _request(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _matches(self, query: str) -> List[Dict]:
+        apps = [app for app in self.marketplace['apps'] if app['brand'] == query]
+        noise = [app for app in self.marketplace['apps'] if app['brand'] is None]
+        # Same noise for the same query on every source
+        rng = random.Random(query)
+        return apps + rng.sample(noise, k=min(len(noise), self.noise_per_search))
+
+    @staticmethod
+    def _public(app: Dict) -> Dict:
+        return {k: v for k, v in app.items() if k not in ('brand', 'is_clone')}
+
+    def iter_search(self, query: str, max_results: int = 50) -> Iterator[Dict]:
+        self._request()
+        for app in self._matches(query)[:max_results]:
+            yield {**self._public(app), 'store_url': f"https://store.example/{app['package_id']}"}
+
+
+@register_collector
+class SyntheticStoreCollector(MarketplaceCollector):
+    """Store-like source: package IDs in results, details and reviews"""
+
+    source = 'synthetic_store'
+    capabilities = frozenset({CAPABILITY_DETAILS, CAPABILITY_REVIEWS})
+    max_concurrency = 4
+
+    def get_app_details(self, package_id: str) -> Optional[Dict]:
+        self._request()
+        for app in self.marketplace['apps']:
+            if app['package_id'] == package_id:
+                return {
+                    **self._public(app),
+                    'developer_name': app['developer'],
+                    'reviews_count': len(self.marketplace['reviews'].get(package_id, [])),
+                    'exists': True,
+                }
+        return None
+
+    def get_app_reviews(self, package_id: str, max_reviews: int = 100,
+                        since: Optional[datetime] = None, cursor: Optional[Dict] = None) -> Tuple[List[Dict], bool]:
+        self._request()
+        reviews = [dict(r) for r in self.marketplace['reviews'].get(package_id, []) if not since or r['at'] >= since]
+        start = cursor.get('offset', 0) if cursor else 0
+        if cursor is not None:
+            cursor['offset'] = start + max_reviews
+        return reviews[start:start + max_reviews], len(reviews) <= start + max_reviews
+
+
+@register_collector
+class SyntheticMirrorCollector(MarketplaceCollector):
+    """APK-site-like source: listings without package IDs, resolved per listing"""
+
+    source = 'synthetic_mirror'
+    capabilities = frozenset()
+    max_concurrency = 2
+
+    def iter_search(self, query: str, max_results: int = 50) -> Iterator[Dict]:
+        for app in super().iter_search(query, max_results):
+            app['apk_url'] = f"https://mirror.example/apk/{app.pop('package_id')}"
+            yield app
+
+    def resolve_package_id(self, app: Dict) -> Optional[str]:
+        self._request()
+        return app.get('apk_url', '').rsplit('/', 1)[-1] or None
+
+
+# Usage example
+if __name__ == "__main__":
+    marketplace = generate_marketplace(brands=2, clones_per_brand=6, noise_apps=3, seed=1)
+    for brand in marketplace['brands']:
+        print(f"{brand['name']} ({brand['package_ids'][0]})")
+        for app in marketplace['apps']:
+            if app['brand'] == brand['name'] and app['is_clone']:
+                print(f"  clone: {app['app_name']!r:24} {app['package_id']}")
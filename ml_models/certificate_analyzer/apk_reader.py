@@ -0,0 +1,510 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# ZIP structures
+_EOCD_SIGNATURE = b'PK\x05\x06'
+_EOCD_MAX_SEARCH = 22 + 0xFFFF
+_CD_ENTRY = struct.Struct('<IHHHHHHIIIHHHHHII')
+_CD_ENTRY_SIGNATURE = 0x02014b50
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+
+# Largest entry (manifest, signature, icon) we inflate; bounds zip bombs
+_MAX_ENTRY_SIZE = 16 * 1024 * 1024
+
+# APK Signature Scheme v2/v3 block
+_SIG_BLOCK_MAGIC = b'APK Sig Block 42'
+_SIG_BLOCK_V2_ID = 0x7109871a
+_SIG_BLOCK_V3_ID = 0xf05368c0
+
+# Binary XML (AXML) chunk types
+_RES_STRING_POOL_TYPE = 0x0001
+_RES_XML_START_ELEMENT_TYPE = 0x0102
+_UTF8_FLAG = 0x100
+_TYPE_STRING = 0x03
+_NO_ENTRY = 0xFFFFFFFF
+_XML_ATTRIBUTE = struct.Struct('<IIIHBBI')
+
+_ICON_PATTERN = re.compile(r'^res/(mipmap|drawable)[^/]*/(ic_launcher|icon|app_icon)[^/]*\.(png|webp)$')
+
+# Third-party SDK fingerprints visible in ZIP entry names
+_SDK_PATTERNS = [
+    re.compile(r'^META-INF/([^/]+)\.version$'),           # AndroidX / Google libraries
+    re.compile(r'^([a-z0-9][a-z0-9\-]+)\.properties$'),     # firebase-*, play-services-*
+    re.compile(r'^lib/[^/]+/lib([^/]+)\.so$'),              # Native libraries
+    re.compile(r'^(okhttp3|kotlin|kotlinx)/'),              # Bundled library resources
+]
+
+# X.509 name attribute OIDs
+_NAME_OIDS = {
+    '2.5.4.3': 'CN',
+    '2.5.4.6': 'C',
+    '2.5.4.7': 'L',
+    '2.5.4.8': 'ST',
+    '2.5.4.10': 'O',
+    '2.5.4.11': 'OU',
+}
+
+
+class _MmapSource:
+    """Random access to a local APK through mmap (no full read into memory)"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        if self.size == 0:
+            self._file.close()
+            raise APKParseError("Empty APK file")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset: int, size: int) -> bytes:
+        return self._map[offset:offset + size]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class _HTTPRangeSource:
+    """Random access to a remote APK through HTTP range requests"""
+
+    def __init__(self, url: str, headers: Optional[Dict] = None, timeout: int = 30):
+        import requests
+
+        self.url = url
+        self.headers = headers or {}
+        self.timeout = timeout
+        self._session = requests.Session()
+
+        response = self._session.get(
+            url, headers={**self.headers, 'Range': 'bytes=0-0'}, timeout=timeout
+        )
+        if response.status_code != 206 or 'Content-Range' not in response.headers:
+            raise ValueError("Server does not support range requests")
+        self.size = int(response.headers['Content-Range'].rsplit('/', 1)[1])
+
+    def read(self, offset: int, size: int) -> bytes:
+        if size <= 0:
+            return b''
+        end = min(offset + size, self.size) - 1
+        response = self._session.get(
+            self.url, headers={**self.headers, 'Range': f'bytes={offset}-{end}'},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        self._session.close()
+
+
+class APKParseError(ValueError):
+    """Raised for truncated, corrupt or unsupported APKs"""
+
+
+class StreamingAPKAnalyzer:
+    """
+    Single-pass APK analysis without full extraction
+
+    Reads only the ZIP central directory, the APK signing block, the binary
+    AndroidManifest.xml and the launcher icon, hashing each of them once.
+    Works on local files (mmap) and on remote URLs (HTTP range requests), so
+    a 100MB APK costs a few small reads instead of a full download and parse.
+    """
+
+    def analyze_file(self, apk_path: str) -> Dict:
+        """Analyze a local APK file"""
+        source = _MmapSource(apk_path)
+        try:
+            return self._analyze(source)
+        finally:
+            source.close()
+
+    def analyze_url(self, url: str, headers: Optional[Dict] = None) -> Dict:
+        """Analyze a remote APK without downloading it"""
+        source = _HTTPRangeSource(url, headers=headers)
+        try:
+            return self._analyze(source)
+        finally:
+            source.close()
+
+    def _analyze(self, source) -> Dict:
+        try:
+            return self._parse(source)
+        except APKParseError:
+            raise
+        except (IndexError, KeyError, ValueError, struct.error, zlib.error) as e:
+            raise APKParseError(f"Malformed APK: {e}") from e
+
+    def _parse(self, source) -> Dict:
+        cd_offset, cd_size, entries, sdks = self._read_central_directory(source)
+
+        # Signing certificate: v2/v3 signing block first, v1 JAR signature as fallback
+        cert_der, scheme = self._read_signing_block(source, cd_offset)
+        if cert_der is None:
+            for name, entry in entries.items():
+                if re.match(r'^META-INF/[^/]+\.(RSA|DSA|EC)$', name):
+                    cert_der = _pkcs7_first_certificate(self._read_entry(source, entry))
+                    scheme = 'v1'
+                    break
+
+        result = {
+            'certificate': _certificate_info(cert_der, scheme) if cert_der else None,
+            'package_id': None,
+            'permissions': [],
+            'min_sdk': None,
+            'manifest_sha256': None,
+            'icon': None,
+            'sdks': sdks,
+            'size': source.size,
+        }
+
+        manifest_entry = entries.get('AndroidManifest.xml')
+        if manifest_entry:
+            manifest = self._read_entry(source, manifest_entry)
+            result['manifest_sha256'] = hashlib.sha256(manifest).hexdigest()
+            result.update(_parse_manifest(manifest))
+
+        # Highest density launcher icon is the largest candidate
+        icons = [entry for name, entry in entries.items() if _ICON_PATTERN.match(name)]
+        if icons:
+            icon_entry = max(icons, key=lambda e: e['uncompressed_size'])
+            icon = self._read_entry(source, icon_entry)
+            result['icon'] = {
+                'path': icon_entry['name'],
+                'sha256': hashlib.sha256(icon).hexdigest(),
+                'size': len(icon),
+                'data': icon,
+            }
+
+        return result
+
+    def _read_central_directory(self, source) -> Tuple[int, int, Dict[str, Dict], List[str]]:
+        """
+        Locate the EOCD record and parse the entries we care about
+        Returns (cd_offset, cd_size, entries, SDK names seen in entry names)
+        """
+        tail_size = min(source.size, _EOCD_MAX_SEARCH)
+        tail = source.read(source.size - tail_size, tail_size)
+
+        eocd = tail.rfind(_EOCD_SIGNATURE)
+        if eocd < 0:
+            raise APKParseError("Not a ZIP/APK file (no end of central directory)")
+
+        entry_count, cd_size, cd_offset = struct.unpack_from('<HII', tail, eocd + 10)
+        if cd_offset == 0xFFFFFFFF or entry_count == 0xFFFF:
+            raise APKParseError("ZIP64 APKs are not supported")
+
+        # Central directory usually sits inside the tail we already read
+        tail_start = source.size - tail_size
+        if cd_offset >= tail_start:
+            directory = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+        else:
+            directory = source.read(cd_offset, cd_size)
+
+        entries = {}
+        sdks = set()
+        pos = 0
+        for _ in range(entry_count):
+            (signature, _, _, _, method, _, _, _, compressed_size, uncompressed_size,
+             name_len, extra_len, comment_len, _, _, _, local_offset) = _CD_ENTRY.unpack_from(directory, pos)
+            if signature != _CD_ENTRY_SIGNATURE:
+                raise APKParseError("Corrupt central directory")
+
+            name = directory[pos + _CD_ENTRY.size:pos + _CD_ENTRY.size + name_len].decode('utf-8', 'replace')
+            pos += _CD_ENTRY.size + name_len + extra_len + comment_len
+
+            for pattern in _SDK_PATTERNS:
+                match = pattern.match(name)
+                if match:
+                    sdks.add(match.group(1))
+                    break
+
+            if (name == 'AndroidManifest.xml' or name.startswith('META-INF/')
+                    or _ICON_PATTERN.match(name)):
+                entries[name] = {
+                    'name': name,
+                    'method': method,
+                    'compressed_size': compressed_size,
+                    'uncompressed_size': uncompressed_size,
+                    'local_offset': local_offset,
+                }
+
+        return cd_offset, cd_size, entries, sorted(sdks)
+
+    def _read_entry(self, source, entry: Dict) -> bytes:
+        """Read and inflate one ZIP entry"""
+        header = source.read(entry['local_offset'], _LOCAL_HEADER.size)
+        name_len, extra_len = _LOCAL_HEADER.unpack(header)[9:11]
+        data_offset = entry['local_offset'] + _LOCAL_HEADER.size + name_len + extra_len
+        data = source.read(data_offset, entry['compressed_size'])
+
+        if entry['method'] == 0:
+            return data
+        if entry['method'] == 8:
+            # Inflate no more than the declared size, a lying header can't expand further
+            max_length = min(entry['uncompressed_size'], _MAX_ENTRY_SIZE)
+            inflater = zlib.decompressobj(-15)
+            inflated = inflater.decompress(data, max_length)
+            if inflater.unconsumed_tail:
+                raise APKParseError(f"{entry['name']} inflates past {max_length} bytes")
+            return inflated
+        raise APKParseError(f"Unsupported compression method {entry['method']}")
+
+    def _read_signing_block(self, source, cd_offset: int) -> Tuple[Optional[bytes], Optional[str]]:
+        """Extract the first signer certificate from the APK Signing Block"""
+        if cd_offset < 32:
+            return None, None
+
+        footer = source.read(cd_offset - 24, 24)
+        if footer[8:] != _SIG_BLOCK_MAGIC:
+            return None, None
+
+        block_size = struct.unpack_from('<Q', footer)[0]
+        block_start = cd_offset - block_size - 8
+        if block_start < 0:
+            return None, None
+
+        block = source.read(block_start + 8, block_size - 24)
+
+        pairs = {}
+        pos = 0
+        while pos + 12 <= len(block):
+            pair_len, pair_id = struct.unpack_from('<QI', block, pos)
+            pairs[pair_id] = block[pos + 12:pos + 8 + pair_len]
+            pos += 8 + pair_len
+
+        for pair_id, scheme in ((_SIG_BLOCK_V3_ID, 'v3'), (_SIG_BLOCK_V2_ID, 'v2')):
+            if pair_id in pairs:
+                return _first_scheme_certificate(pairs[pair_id]), scheme
+
+        return None, None
+
+
+def _length_prefixed(buf: bytes, pos: int) -> Tuple[int, int]:
+    """(start, end) of a uint32-length-prefixed field at pos"""
+    length = struct.unpack_from('<I', buf, pos)[0]
+    return pos + 4, pos + 4 + length
+
+
+def _first_scheme_certificate(value: bytes) -> bytes:
+    """First certificate of the first signer in a v2/v3 signature block value"""
+    signers_start, _ = _length_prefixed(value, 0)
+    signer_start, _ = _length_prefixed(value, signers_start)
+    signed_data_start, _ = _length_prefixed(value, signer_start)
+    _, digests_end = _length_prefixed(value, signed_data_start)
+    certificates_start, _ = _length_prefixed(value, digests_end)
+    cert_start, cert_end = _length_prefixed(value, certificates_start)
+    return value[cert_start:cert_end]
+
+
+def _der_element(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """Parse a DER TLV at pos, returns (tag, value_start, value_end)"""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        num_bytes = length & 0x7F
+        length = int.from_bytes(data[pos:pos + num_bytes], 'big')
+        pos += num_bytes
+    return tag, pos, pos + length
+
+
+def _der_children(data: bytes, start: int, end: int) -> List[Tuple[int, int, int, int]]:
+    """Children of a constructed DER value, as (tag, tlv_start, value_start, value_end)"""
+    children = []
+    pos = start
+    while pos < end:
+        tag, value_start, value_end = _der_element(data, pos)
+        children.append((tag, pos, value_start, value_end))
+        pos = value_end
+    return children
+
+
+def _pkcs7_first_certificate(data: bytes) -> Optional[bytes]:
+    """First certificate of a PKCS#7 SignedData blob (v1 META-INF/*.RSA)"""
+    try:
+        _, content_start, content_end = _der_element(data, 0)
+        _, _, explicit_start, explicit_end = _der_children(data, content_start, content_end)[1]
+        _, signed_start, signed_end = _der_element(data, explicit_start)
+        for tag, _, value_start, value_end in _der_children(data, signed_start, signed_end):
+            if tag == 0xA0:
+                _, cert_start, _, cert_end = _der_children(data, value_start, value_end)[0]
+                return data[cert_start:cert_end]
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def _decode_oid(value: bytes) -> str:
+    arcs = [value[0] // 40, value[0] % 40]
+    current = 0
+    for byte in value[1:]:
+        current = (current << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(current)
+            current = 0
+    return '.'.join(str(arc) for arc in arcs)
+
+
+def _decode_name(data: bytes, start: int, end: int) -> str:
+    parts = []
+    for _, _, set_start, set_end in _der_children(data, start, end):
+        for _, _, seq_start, seq_end in _der_children(data, set_start, set_end):
+            (_, _, oid_start, oid_end), (_, _, val_start, val_end) = _der_children(data, seq_start, seq_end)[:2]
+            oid = _decode_oid(data[oid_start:oid_end])
+            value = data[val_start:val_end].decode('utf-8', 'replace')
+            parts.append(f"{_NAME_OIDS.get(oid, oid)}={value}")
+    return ', '.join(parts)
+
+
+def _decode_time(tag: int, value: bytes) -> Optional[str]:
+    text = value.decode('ascii', 'replace').rstrip('Z')
+    try:
+        if tag == 0x17:  # UTCTime
+            parsed = datetime.strptime(text[:12], '%y%m%d%H%M%S')
+        else:  # GeneralizedTime
+            parsed = datetime.strptime(text[:14], '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+    return parsed.strftime('%Y-%m-%d')
+
+
+def _certificate_info(cert_der: bytes, scheme: Optional[str]) -> Dict:
+    """
+    Fingerprints and basic fields of an X.509 certificate
+    Same keys as CertificateAnalyzer.extract_certificate_info
+    """
+    info = {
+        'md5': hashlib.md5(cert_der).hexdigest(),
+        'sha1': hashlib.sha1(cert_der).hexdigest(),
+        'sha256': hashlib.sha256(cert_der).hexdigest(),
+        'issuer': 'Unknown',
+        'subject': 'Unknown',
+        'valid_from': None,
+        'valid_to': None,
+        'serial_number': None,
+        'scheme': scheme,
+    }
+
+    try:
+        _, cert_start, cert_end = _der_element(cert_der, 0)
+        _, _, tbs_start, tbs_end = _der_children(cert_der, cert_start, cert_end)[0]
+        fields = _der_children(cert_der, tbs_start, tbs_end)
+        if fields[0][0] == 0xA0:  # Explicit version
+            fields = fields[1:]
+
+        serial, _, issuer, validity, subject = fields[:5]
+        info['serial_number'] = str(int.from_bytes(cert_der[serial[2]:serial[3]], 'big'))
+        info['issuer'] = _decode_name(cert_der, issuer[2], issuer[3])
+        info['subject'] = _decode_name(cert_der, subject[2], subject[3])
+
+        not_before, not_after = _der_children(cert_der, validity[2], validity[3])[:2]
+        info['valid_from'] = _decode_time(not_before[0], cert_der[not_before[2]:not_before[3]])
+        info['valid_to'] = _decode_time(not_after[0], cert_der[not_after[2]:not_after[3]])
+    except (IndexError, ValueError):
+        pass
+
+    return info
+
+
+def _read_string_pool(data: bytes, pos: int) -> List[str]:
+    """Decode an AXML string pool chunk starting at pos"""
+    _, _, _, string_count, _, flags, strings_start = struct.unpack_from('<HHIIIII', data, pos)
+    is_utf8 = bool(flags & _UTF8_FLAG)
+    offsets = struct.unpack_from(f'<{string_count}I', data, pos + 28)
+    base = pos + strings_start
+
+    strings = []
+    for offset in offsets:
+        cursor = base + offset
+        if is_utf8:
+            # UTF-16 length then UTF-8 byte length, each 1 or 2 bytes
+            for _ in range(2):
+                length = data[cursor]
+                cursor += 1
+                if length & 0x80:
+                    length = ((length & 0x7F) << 8) | data[cursor]
+                    cursor += 1
+            strings.append(data[cursor:cursor + length].decode('utf-8', 'replace'))
+        else:
+            length = struct.unpack_from('<H', data, cursor)[0]
+            cursor += 2
+            if length & 0x8000:
+                length = ((length & 0x7FFF) << 16) | struct.unpack_from('<H', data, cursor)[0]
+                cursor += 2
+            strings.append(data[cursor:cursor + length * 2].decode('utf-16-le', 'replace'))
+
+    return strings
+
+
+def _parse_manifest(data: bytes) -> Dict:
+    """Extract package, permissions and minSdk from binary AndroidManifest.xml"""
+    result = {'package_id': None, 'permissions': [], 'min_sdk': None}
+    strings: List[str] = []
+
+    header_size = struct.unpack_from('<H', data, 2)[0]
+    pos = header_size
+    while pos + 8 <= len(data):
+        chunk_type, _, chunk_size = struct.unpack_from('<HHI', data, pos)
+        if chunk_size == 0:
+            break
+
+        if chunk_type == _RES_STRING_POOL_TYPE:
+            strings = _read_string_pool(data, pos)
+
+        elif chunk_type == _RES_XML_START_ELEMENT_TYPE:
+            name_idx, attr_start, attr_size, attr_count = struct.unpack_from('<4xIHHH', data, pos + 16)
+            element = strings[name_idx] if name_idx < len(strings) else ''
+
+            attributes = {}
+            attr_pos = pos + 16 + attr_start
+            for _ in range(attr_count):
+                _, attr_name, raw_value, _, _, data_type, value = _XML_ATTRIBUTE.unpack_from(data, attr_pos)
+                name = strings[attr_name] if attr_name < len(strings) else ''
+                if raw_value != _NO_ENTRY and raw_value < len(strings):
+                    attributes[name] = strings[raw_value]
+                elif data_type == _TYPE_STRING and value < len(strings):
+                    attributes[name] = strings[value]
+                else:
+                    attributes[name] = value
+                attr_pos += attr_size
+
+            if element == 'manifest':
+                result['package_id'] = attributes.get('package')
+            elif element in ('uses-permission', 'uses-permission-sdk-23'):
+                if attributes.get('name'):
+                    result['permissions'].append(attributes['name'])
+            elif element == 'uses-sdk' and isinstance(attributes.get('minSdkVersion'), int):
+                result['min_sdk'] = attributes['minSdkVersion']
+
+        pos += chunk_size
+
+    return result
+
+
+# Usage example
+if __name__ == "__main__":
+    import sys
+
+    analyzer = StreamingAPKAnalyzer()
+    target = sys.argv[1] if len(sys.argv) > 1 else "suspicious_app.apk"
+
+    if target.startswith('http'):
+        analysis = analyzer.analyze_url(target)
+    else:
+        analysis = analyzer.analyze_file(target)
+
+    print(f"Package: {analysis['package_id']}")
+    if analysis['certificate']:
+        print(f"Signer SHA256 ({analysis['certificate']['scheme']}): {analysis['certificate']['sha256']}")
+        print(f"Issuer: {analysis['certificate']['issuer']}")
+    print(f"Permissions: {len(analysis['permissions'])}")
+    if analysis['icon']:
+        print(f"Icon: {analysis['icon']['path']} ({analysis['icon']['sha256'][:16]}...)")
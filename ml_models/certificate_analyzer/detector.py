@@ -3,6 +3,9 @@ import re
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 
+from ml_models.certificate_analyzer.apk_reader import APKParseError, StreamingAPKAnalyzer
+from ml_models.certificate_analyzer.fingerprint_index import normalize_fingerprint
+
 
 class CertificateAnalyzer:
     """Analyze APK certificates and signatures"""
@@ -12,20 +15,30 @@ class CertificateAnalyzer:
         Initialize with list of known legitimate certificate fingerprints
         """
         self.legitimate_certs = legitimate_certificates or []
-    
+        self._legitimate_set = {normalize_fingerprint(c) for c in self.legitimate_certs if c}
+
     def extract_certificate_info(self, apk_path: str) -> Dict:
         """
         Extract certificate information from APK
-        In production, use androguard for actual APK analysis
+        Uses the streaming reader (signing block only), androguard as fallback
         """
+        try:
+            cert_info = StreamingAPKAnalyzer().analyze_file(apk_path)['certificate']
+            if cert_info:
+                return cert_info
+        except (OSError, APKParseError) as e:
+            print(f"Streaming certificate extraction failed, using androguard: {e}")
+
         try:
             from androguard.core.bytecodes.apk import APK
-            
+
             apk = APK(apk_path)
-            
-            # Get certificate information
-            cert = apk.get_certificate_der(apk.get_signature_names()[0])
-            
+
+            # Get certificate information (parse the signature once)
+            signature_name = apk.get_signature_names()[0]
+            cert = apk.get_certificate_der(signature_name)
+            x509 = apk.get_certificate(signature_name)
+
             # Calculate fingerprints
             md5 = hashlib.md5(cert).hexdigest()
             sha1 = hashlib.sha1(cert).hexdigest()
@@ -36,8 +49,8 @@ class CertificateAnalyzer:
                 'md5': md5,
                 'sha1': sha1,
                 'sha256': sha256,
-                'issuer': apk.get_certificate(apk.get_signature_names()[0]).get('issuer', 'Unknown'),
-                'subject': apk.get_certificate(apk.get_signature_names()[0]).get('subject', 'Unknown'),
+                'issuer': x509.get('issuer', 'Unknown'),
+                'subject': x509.get('subject', 'Unknown'),
                 'valid_from': None,  # Extract from cert
                 'valid_to': None,    # Extract from cert
                 'serial_number': None,
@@ -78,13 +91,14 @@ class CertificateAnalyzer:
         if not suspicious_cert:
             return False, ["No certificate information available"]
         
-        # Check against known legitimate certificates
-        for legit_cert in self.legitimate_certs:
-            if suspicious_cert['sha256'] == legit_cert:
-                return True, ["Certificate matches legitimate app"]
-            
-            if suspicious_cert['sha1'] == legit_cert:
-                return True, ["Certificate matches legitimate app (SHA1)"]
+        # Check against known legitimate certificates (hash lookup)
+        if suspicious_cert.get('sha256') and \
+                normalize_fingerprint(suspicious_cert['sha256']) in self._legitimate_set:
+            return True, ["Certificate matches legitimate app"]
+
+        if suspicious_cert.get('sha1') and \
+                normalize_fingerprint(suspicious_cert['sha1']) in self._legitimate_set:
+            return True, ["Certificate matches legitimate app (SHA1)"]
         
         # If no match found
         reasons.append("Certificate does not match any known legitimate certificates")
@@ -0,0 +1,154 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalize_fingerprint(fingerprint: str) -> str:
+    """Normalize a hex fingerprint ('AB:CD:..' or 'abcd..') to lowercase hex"""
+    return fingerprint.replace(':', '').replace(' ', '').strip().lower()
+
+
+class CertificateFingerprintIndex:
+    """
+    Global hash index from signing certificate fingerprint to brands
+
+    Holds SHA-256 and SHA-1 fingerprints of every brand's legitimate
+    certificates, so one dictionary lookup answers "is this signer legit, and
+    for which brand". Also tracks which suspicious packages each unknown signer
+    has been seen on, to flag one signer shared across many fakes.
+    """
+
+    def __init__(self, shared_signer_threshold: int = 3):
+        self.shared_signer_threshold = shared_signer_threshold
+
+        self._brands_by_fingerprint: Dict[str, Set[int]] = {}
+        self._fingerprints_by_brand: Dict[int, Set[str]] = {}
+        self._brand_names: Dict[int, str] = {}
+
+        # Unknown signer sha256 -> suspicious packages signed with it
+        self._packages_by_signer: Dict[str, Set[str]] = {}
+
+    def __len__(self):
+        return len(self._brands_by_fingerprint)
+
+    def add_brand(self, brand_id: int, certificates: Iterable[str], name: Optional[str] = None):
+        """Index (or re-index) a brand's legitimate certificate fingerprints"""
+        self.remove_brand(brand_id)
+
+        fingerprints = {normalize_fingerprint(c) for c in certificates or [] if c}
+        self._fingerprints_by_brand[brand_id] = fingerprints
+        if name:
+            self._brand_names[brand_id] = name
+
+        for fingerprint in fingerprints:
+            self._brands_by_fingerprint.setdefault(fingerprint, set()).add(brand_id)
+
+    def remove_brand(self, brand_id: int):
+        """Drop a brand from the index"""
+        for fingerprint in self._fingerprints_by_brand.pop(brand_id, set()):
+            brands = self._brands_by_fingerprint.get(fingerprint)
+            if brands is None:
+                continue
+            brands.discard(brand_id)
+            if not brands:
+                del self._brands_by_fingerprint[fingerprint]
+
+        self._brand_names.pop(brand_id, None)
+
+    def lookup(self, fingerprint: str) -> Set[int]:
+        """Get IDs of brands that legitimately use this fingerprint"""
+        if not fingerprint:
+            return set()
+        return set(self._brands_by_fingerprint.get(normalize_fingerprint(fingerprint), ()))
+
+    def verify(self, cert_info: Dict) -> Tuple[Set[int], List[str]]:
+        """
+        Verify a certificate (CertificateAnalyzer.extract_certificate_info format)
+        Returns (matching brand IDs, reasons)
+        """
+        if not cert_info:
+            return set(), ["No certificate information available"]
+
+        brands = self.lookup(cert_info.get('sha256'))
+        if brands:
+            return brands, [f"Certificate matches legitimate {self._describe(brands)} app"]
+
+        brands = self.lookup(cert_info.get('sha1'))
+        if brands:
+            return brands, [f"Certificate matches legitimate {self._describe(brands)} app (SHA1)"]
+
+        return set(), ["Certificate does not match any known legitimate certificates"]
+
+    def record_signer(self, fingerprint: str, package_id: str) -> int:
+        """
+        Remember that an unknown signer signed a suspicious package
+        Returns the number of distinct packages seen with this signer
+        """
+        packages = self._packages_by_signer.setdefault(normalize_fingerprint(fingerprint), set())
+        packages.add(package_id)
+        return len(packages)
+
+    def packages_for_signer(self, fingerprint: str) -> Set[str]:
+        """Get suspicious packages seen signed with this fingerprint"""
+        return set(self._packages_by_signer.get(normalize_fingerprint(fingerprint), ()))
+
+    def shared_signers(self, min_packages: Optional[int] = None) -> Dict[str, Set[str]]:
+        """Get unknown signers seen on at least min_packages suspicious packages"""
+        min_packages = min_packages or self.shared_signer_threshold
+        return {
+            fingerprint: set(packages)
+            for fingerprint, packages in self._packages_by_signer.items()
+            if len(packages) >= min_packages
+        }
+
+    def verify_batch(self, certificates: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Verify a batch of APK certificates in one pass
+        certificates: {package_id: cert_info}
+        Returns {package_id: {'legitimate', 'brand_ids', 'reasons', 'shared_signer_packages'}}
+        """
+        results = {}
+
+        # First pass: one lookup per APK, record unknown signers
+        for package_id, cert_info in certificates.items():
+            brand_ids, reasons = self.verify(cert_info)
+            if not brand_ids and cert_info and cert_info.get('sha256'):
+                self.record_signer(cert_info['sha256'], package_id)
+
+            results[package_id] = {
+                'legitimate': bool(brand_ids),
+                'brand_ids': sorted(brand_ids),
+                'reasons': reasons,
+                'shared_signer_packages': 0,
+            }
+
+        # Second pass: flag signers shared across many suspicious packages
+        for package_id, result in results.items():
+            cert_info = certificates[package_id]
+            if result['legitimate'] or not cert_info or not cert_info.get('sha256'):
+                continue
+
+            shared = len(self._packages_by_signer.get(normalize_fingerprint(cert_info['sha256']), ()))
+            result['shared_signer_packages'] = shared
+            if shared >= self.shared_signer_threshold:
+                result['reasons'].append(f"⚠️ Signer shared across {shared} suspicious packages")
+
+        return results
+
+    def _describe(self, brand_ids: Set[int]) -> str:
+        return ', '.join(self._brand_names.get(b, f"brand #{b}") for b in sorted(brand_ids))
+
+
+# Usage example
+if __name__ == "__main__":
+    index = CertificateFingerprintIndex()
+    index.add_brand(1, ["AB:CD:EF:01"], name="PayPal")
+    index.add_brand(2, ["1234567890ab"], name="WhatsApp")
+
+    batch = {
+        "com.paypal.android.p2pmobile": {'sha256': "abcdef01", 'sha1': None},
+        "com.paypa1.wallet": {'sha256': "deadbeef", 'sha1': None},
+        "com.whatsap.plus": {'sha256': "deadbeef", 'sha1': None},
+        "com.phonepe.pro": {'sha256': "deadbeef", 'sha1': None},
+    }
+
+    for package_id, result in index.verify_batch(batch).items():
+        print(f"{package_id}: legitimate={result['legitimate']} {result['reasons']}")
@@ -1,14 +1,20 @@
+import copy
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 from collections import Counter
 import numpy as np
 
+from ml_models.review_fraud.minhash import ReviewMinHashIndex
+
 
 class ReviewFraudDetector:
     """Detect fake/fraudulent reviews on app stores"""
     
-    def __init__(self):
+    def __init__(self, minhash_index: Optional[ReviewMinHashIndex] = None):
+        # Near-duplicate index shared across every app this detector analyzes
+        self.minhash_index = minhash_index if minhash_index is not None else ReviewMinHashIndex()
+        
         # Suspicious review patterns
         self.spam_keywords = [
             'best app ever', 'amazing app', 'must download', 'five stars',
@@ -23,10 +29,14 @@ class ReviewFraudDetector:
             r'highly\s+recommend',
         ]
     
-    def analyze_reviews(self, reviews: List[Dict]) -> Dict:
+    def analyze_reviews(self, reviews: List[Dict], app_id: Optional[str] = None) -> Dict:
         """
         Analyze a list of reviews for fraud patterns
-        
+
+        app_id: package ID of the reviewed app. When given, the reviews are
+        added to the shared near-duplicate index so that templates reused
+        on other apps are flagged.
+
         reviews format: [
             {
                 'text': 'Review text',
@@ -44,7 +54,7 @@ class ReviewFraudDetector:
         total_reviews = len(reviews)
         
         # Various fraud indicators
-        duplicate_count = self._detect_duplicate_reviews(reviews)
+        duplicate_count, cross_app_count = self._detect_duplicate_reviews(reviews, app_id)
         bot_like_count = self._detect_bot_reviews(reviews)
         suspicious_timing = self._detect_suspicious_timing(reviews)
         rating_manipulation = self._detect_rating_manipulation(reviews)
@@ -68,6 +78,7 @@ class ReviewFraudDetector:
             'risk_level': self._get_risk_level(fraud_score),
             'indicators': {
                 'duplicate_reviews': duplicate_count,
+                'cross_app_duplicates': cross_app_count,
                 'bot_like_reviews': bot_like_count,
                 'suspicious_timing': suspicious_timing,
                 'rating_manipulation_score': rating_manipulation,
@@ -76,76 +87,83 @@ class ReviewFraudDetector:
             },
             'flags': self._get_fraud_flags(
                 duplicate_count, bot_like_count, suspicious_timing,
-                rating_manipulation, low_effort_count, template_count
+                rating_manipulation, low_effort_count, template_count,
+                cross_app_count
             )
         }
     
-    def _detect_duplicate_reviews(self, reviews: List[Dict]) -> int:
-        """Detect duplicate or near-duplicate reviews"""
-        review_texts = [r['text'].lower().strip() for r in reviews]
-        
-        # Count exact duplicates
-        text_counts = Counter(review_texts)
-        duplicates = sum(count - 1 for count in text_counts.values() if count > 1)
-        
-        return duplicates
+    def _detect_duplicate_reviews(self, reviews: List[Dict],
+                                  app_id: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Detect duplicate or near-duplicate reviews
+        Returns (duplicates within this app, reviews also seen on other apps)
+        """
+        review_texts = [r['text'] or '' for r in reviews]
+        signatures = [self.minhash_index.signature(text) for text in review_texts]
+
+        # Near-duplicate clusters within this app (exact duplicates included)
+        clusters = self.minhash_index.find_clusters(signatures)
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+
+        # Reviews reusing a template already seen on other apps
+        cross_app = 0
+        if app_id:
+            cross_app = sum(
+                1 for signature in signatures
+                if self.minhash_index.query(signature, exclude_app=app_id)
+            )
+
+            for text, signature in zip(review_texts, signatures):
+                self.minhash_index.add(app_id, text, signature)
+
+        return duplicates, cross_app
     
     def _detect_bot_reviews(self, reviews: List[Dict]) -> int:
         """Detect bot-generated reviews"""
-        bot_count = 0
+        return sum(1 for review in reviews if self._is_bot_like(review))
+    
+    def _is_bot_like(self, review: Dict) -> bool:
+        """Check a single review for bot-generated patterns"""
+        text = review['text'].lower()
         
-        for review in reviews:
-            text = review['text'].lower()
-            
-            # Check for spam keywords
-            if any(keyword in text for keyword in self.spam_keywords):
-                bot_count += 1
-                continue
-            
-            # Check for bot patterns
-            if any(re.search(pattern, text) for pattern in self.bot_patterns):
-                bot_count += 1
-                continue
-            
-            # Very short reviews with max rating
-            if len(text.split()) <= 3 and review.get('rating', 0) == 5:
-                bot_count += 1
+        # Check for spam keywords
+        if any(keyword in text for keyword in self.spam_keywords):
+            return True
+        
+        # Check for bot patterns
+        if any(re.search(pattern, text) for pattern in self.bot_patterns):
+            return True
         
-        return bot_count
+        # Very short reviews with max rating
+        return len(text.split()) <= 3 and review.get('rating', 0) == 5
     
     def _detect_suspicious_timing(self, reviews: List[Dict]) -> float:
         """Detect suspicious review timing patterns"""
-        if len(reviews) < 10:
-            return 0.0
-        
-        # Parse dates
-        dates = []
-        for review in reviews:
+        day_counts = Counter(review.get('date') for review in reviews if review.get('date'))
+        return self._timing_from_day_counts(day_counts)
+    
+    def _timing_from_day_counts(self, day_counts: Dict[str, int]) -> float:
+        """Spike score from a per-day review histogram ('%Y-%m-%d' -> count)"""
+        dates = {}
+        for day, count in day_counts.items():
             try:
-                date = datetime.strptime(review['date'], '%Y-%m-%d')
-                dates.append(date)
-            except:
+                dates[datetime.strptime(day, '%Y-%m-%d')] = count
+            except (TypeError, ValueError):
                 continue
         
-        if len(dates) < 10:
+        total = sum(dates.values())
+        if total < 10:
             return 0.0
         
-        dates.sort()
-        
         # Check for sudden spikes
         # Count reviews in 24-hour windows
         spike_count = 0
-        for i in range(len(dates) - 5):
-            window_start = dates[i]
-            window_end = window_start + timedelta(days=1)
-            
-            reviews_in_window = sum(
-                1 for date in dates[i:] if window_start <= date <= window_end
-            )
+        for date, count in dates.items():
+            reviews_in_window = count + dates.get(date + timedelta(days=1), 0)
             
             # If more than 20% of reviews in a single day
-            if reviews_in_window > len(dates) * 0.2:
-                spike_count += 1
+            if reviews_in_window > total * 0.2:
+                spike_count += count
         
         # Normalize spike score
         spike_score = min(spike_count / 5, 1.0)
@@ -154,24 +172,26 @@ class ReviewFraudDetector:
     
     def _detect_rating_manipulation(self, reviews: List[Dict]) -> float:
         """Detect rating manipulation patterns"""
-        ratings = [r.get('rating', 0) for r in reviews if r.get('rating')]
+        rating_counts = Counter(r.get('rating', 0) for r in reviews if r.get('rating'))
+        return self._rating_manipulation_from_counts(rating_counts)
+    
+    def _rating_manipulation_from_counts(self, rating_counts: Dict[int, int]) -> float:
+        """Rating manipulation score from a rating histogram (rating -> count)"""
+        total_ratings = sum(rating_counts.values())
         
-        if not ratings:
+        if not total_ratings:
             return 0.0
         
-        # Calculate rating distribution
-        rating_counts = Counter(ratings)
-        
         # Suspicious if too many 5-star ratings
-        five_star_ratio = rating_counts.get(5, 0) / len(ratings)
+        five_star_ratio = rating_counts.get(5, 0) / total_ratings
         
         # Suspicious if bimodal distribution (many 5s and 1s, few in between)
-        if len(ratings) > 20:
+        if total_ratings > 20:
             middle_ratings = rating_counts.get(2, 0) + rating_counts.get(3, 0) + rating_counts.get(4, 0)
-            middle_ratio = middle_ratings / len(ratings)
+            middle_ratio = middle_ratings / total_ratings
             
             # If < 20% middle ratings and > 70% extreme ratings
-            if middle_ratio < 0.2 and (five_star_ratio > 0.7 or rating_counts.get(1, 0) / len(ratings) > 0.3):
+            if middle_ratio < 0.2 and (five_star_ratio > 0.7 or rating_counts.get(1, 0) / total_ratings > 0.3):
                 return 0.8
         
         # High concentration of 5-star reviews is suspicious
@@ -186,44 +206,141 @@ class ReviewFraudDetector:
     
     def _detect_low_effort_reviews(self, reviews: List[Dict]) -> int:
         """Detect low-effort reviews (very short, generic)"""
-        low_effort_count = 0
-        
+        return sum(1 for review in reviews if self._is_low_effort(review))
+    
+    def _is_low_effort(self, review: Dict) -> bool:
+        """Check a single review for low effort (very short, generic)"""
         generic_phrases = [
             'good', 'great', 'nice', 'cool', 'ok', 'okay', 'fine',
             'good app', 'nice app', 'love it', 'like it'
         ]
         
-        for review in reviews:
-            text = review['text'].lower().strip()
-            
-            # Very short reviews
-            if len(text.split()) <= 2:
-                low_effort_count += 1
-            # Generic single-phrase reviews
-            elif text in generic_phrases:
-                low_effort_count += 1
-        
-        return low_effort_count
+        text = review['text'].lower().strip()
+        
+        # Very short reviews, or generic single-phrase reviews
+        return len(text.split()) <= 2 or text in generic_phrases
     
     def _detect_template_reviews(self, reviews: List[Dict]) -> int:
         """Detect reviews following templates"""
-        # Find common patterns in reviews
-        review_texts = [r['text'].lower() for r in reviews]
-        
-        # Simple template detection: find reviews with similar structure
-        template_count = 0
-        
         # Look for reviews starting with same phrases
-        first_words = [' '.join(text.split()[:3]) for text in review_texts if len(text.split()) >= 3]
-        word_counts = Counter(first_words)
+        opening_counts = Counter(
+            opening for opening in (self._review_opening(r) for r in reviews) if opening
+        )
+        return self._templates_from_counts(opening_counts, len(reviews))
+    
+    def _review_opening(self, review: Dict) -> Optional[str]:
+        """First three words of a review, None for shorter reviews"""
+        words = review['text'].lower().split()
+        return ' '.join(words[:3]) if len(words) >= 3 else None
+    
+    def _templates_from_counts(self, opening_counts: Dict[str, int], total: int) -> int:
+        """Template review count from an opening-phrase histogram"""
+        template_count = 0
         
         # If many reviews start the same way
-        for phrase, count in word_counts.items():
-            if count > max(len(reviews) * 0.1, 3):  # More than 10% or 3+ reviews
+        for phrase, count in opening_counts.items():
+            if count > max(total * 0.1, 3):  # More than 10% or 3+ reviews
                 template_count += count
         
         return template_count
     
+    def update_aggregates(self, aggregates: Optional[Dict], new_reviews: List[Dict],
+                          app_id: Optional[str] = None) -> Dict:
+        """
+        Fold newly collected reviews into an app's running aggregates
+        
+        Aggregates are plain JSON-serializable counters, so they can be stored
+        next to the review watermark and updated without re-reading history.
+        Returns a new aggregates dict (the input is not modified).
+        """
+        aggregates = copy.deepcopy(aggregates) if aggregates else {
+            'total_reviews': 0,
+            'duplicate_reviews': 0,
+            'cross_app_duplicates': 0,
+            'bot_like_reviews': 0,
+            'low_effort_reviews': 0,
+            'rating_counts': {},
+            'day_counts': {},
+            'opening_counts': {},
+        }
+        
+        for review in new_reviews:
+            text = review['text'] or ''
+            review = dict(review, text=text)
+            
+            # Near-duplicates of this app's earlier reviews or of other apps
+            signature = self.minhash_index.signature(text)
+            matching_apps = self.minhash_index.query(signature)
+            if app_id:
+                if app_id in matching_apps:
+                    aggregates['duplicate_reviews'] += 1
+                if any(other != app_id for other in matching_apps):
+                    aggregates['cross_app_duplicates'] += 1
+                self.minhash_index.add(app_id, text, signature)
+            
+            aggregates['total_reviews'] += 1
+            aggregates['bot_like_reviews'] += int(self._is_bot_like(review))
+            aggregates['low_effort_reviews'] += int(self._is_low_effort(review))
+            
+            # JSON object keys are strings
+            for key, value in (('rating_counts', review.get('rating')),
+                               ('day_counts', review.get('date')),
+                               ('opening_counts', self._review_opening(review))):
+                if value:
+                    counts = aggregates[key]
+                    counts[str(value)] = counts.get(str(value), 0) + 1
+        
+        return aggregates
+    
+    def analyze_aggregates(self, aggregates: Optional[Dict]) -> Dict:
+        """
+        Compute the fraud analysis from running aggregates
+        Returns the same structure as analyze_reviews()
+        """
+        if not aggregates or not aggregates.get('total_reviews'):
+            return self._create_empty_analysis()
+        
+        total_reviews = aggregates['total_reviews']
+        duplicate_count = aggregates['duplicate_reviews']
+        cross_app_count = aggregates['cross_app_duplicates']
+        bot_like_count = aggregates['bot_like_reviews']
+        low_effort_count = aggregates['low_effort_reviews']
+        suspicious_timing = self._timing_from_day_counts(aggregates['day_counts'])
+        rating_manipulation = self._rating_manipulation_from_counts(
+            {int(rating): count for rating, count in aggregates['rating_counts'].items()}
+        )
+        template_count = self._templates_from_counts(aggregates['opening_counts'], total_reviews)
+        
+        fraud_score = self._calculate_fraud_score(
+            total_reviews,
+            duplicate_count,
+            bot_like_count,
+            suspicious_timing,
+            rating_manipulation,
+            low_effort_count,
+            template_count
+        )
+        
+        return {
+            'total_reviews': total_reviews,
+            'fraud_score': fraud_score,
+            'risk_level': self._get_risk_level(fraud_score),
+            'indicators': {
+                'duplicate_reviews': duplicate_count,
+                'cross_app_duplicates': cross_app_count,
+                'bot_like_reviews': bot_like_count,
+                'suspicious_timing': suspicious_timing,
+                'rating_manipulation_score': rating_manipulation,
+                'low_effort_reviews': low_effort_count,
+                'template_reviews': template_count,
+            },
+            'flags': self._get_fraud_flags(
+                duplicate_count, bot_like_count, suspicious_timing,
+                rating_manipulation, low_effort_count, template_count,
+                cross_app_count
+            )
+        }
+    
     def _calculate_fraud_score(self, total, duplicates, bots, timing, 
                                 rating, low_effort, templates) -> float:
         """Calculate overall fraud score (0-1)"""
@@ -269,7 +386,7 @@ class ReviewFraudDetector:
             return "LOW"
     
     def _get_fraud_flags(self, duplicates, bots, timing, rating, 
-                         low_effort, templates) -> List[str]:
+                         low_effort, templates, cross_app=0) -> List[str]:
         """Generate list of fraud flags"""
         flags = []
         
@@ -285,6 +402,8 @@ class ReviewFraudDetector:
             flags.append("MANY_LOW_EFFORT_REVIEWS")
         if templates > 10:
             flags.append("TEMPLATE_REVIEWS")
+        if cross_app > 5:
+            flags.append("CROSS_APP_TEMPLATE_REVIEWS")
         
         return flags
     
@@ -0,0 +1,195 @@
+import pickle
+import re
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+# Universal hashing parameters (same scheme as classic MinHash implementations)
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class ReviewMinHashIndex:
+    """
+    MinHash + LSH index over review shingles
+
+    Finds near-duplicate (lightly paraphrased) reviews in roughly linear time.
+    The index keeps the signatures of every review it has seen, keyed by app,
+    so one review farm's templates are caught on every app it touches.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 2,
+                 threshold: float = 0.6, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        # (app_id, text digest) -> signature
+        self._signatures: Dict[Tuple[str, int], np.ndarray] = {}
+        # One bucket table per band: band bytes -> keys
+        self._buckets: List[Dict[bytes, Set[Tuple[str, int]]]] = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hash word shingles of a normalized review text"""
+        tokens = _TOKEN_PATTERN.findall((text or '').lower())
+
+        if len(tokens) < self.shingle_size:
+            return {zlib.crc32(' '.join(tokens).encode('utf-8'))}
+
+        return {
+            zlib.crc32(' '.join(tokens[i:i + self.shingle_size]).encode('utf-8'))
+            for i in range(len(tokens) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a review text"""
+        values = np.fromiter(self.shingles(text), dtype=np.uint64)
+
+        # (num_shingles, num_perm) permuted hash values, minimum per permutation
+        permuted = (np.outer(values, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def jaccard(self, sig1: np.ndarray, sig2: np.ndarray) -> float:
+        """Estimate Jaccard similarity from two signatures"""
+        return float(np.count_nonzero(sig1 == sig2)) / self.num_perm
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def add(self, app_id: str, text: str, signature: Optional[np.ndarray] = None) -> bool:
+        """
+        Add a review to the index
+        Returns False if the same text was already indexed for this app
+        """
+        key = (app_id, zlib.crc32((text or '').lower().strip().encode('utf-8')))
+        if key in self._signatures:
+            return False
+
+        if signature is None:
+            signature = self.signature(text)
+
+        self._signatures[key] = signature
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(band_key, set()).add(key)
+
+        return True
+
+    def query(self, signature: np.ndarray, exclude_app: Optional[str] = None) -> List[str]:
+        """
+        Find apps holding a near-duplicate of the given signature
+        Returns the list of matching app IDs
+        """
+        candidates = set()
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(band_key, ()))
+
+        apps = set()
+        for key in candidates:
+            if key[0] == exclude_app or key[0] in apps:
+                continue
+            if self.jaccard(signature, self._signatures[key]) >= self.threshold:
+                apps.add(key[0])
+
+        return sorted(apps)
+
+    def find_clusters(self, signatures: List[np.ndarray]) -> List[List[int]]:
+        """
+        Group a batch of signatures into near-duplicate clusters
+        Returns clusters (lists of batch indices) with more than one member
+        """
+        parent = list(range(len(signatures)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for idx, signature in enumerate(signatures):
+            for band_idx, band_key in enumerate(self._band_keys(signature)):
+                buckets.setdefault((band_idx, band_key), []).append(idx)
+
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_first, root_other = find(first), find(other)
+                if root_first == root_other:
+                    continue
+                if self.jaccard(signatures[first], signatures[other]) >= self.threshold:
+                    parent[root_other] = root_first
+
+        clusters: Dict[int, List[int]] = {}
+        for idx in range(len(signatures)):
+            clusters.setdefault(find(idx), []).append(idx)
+
+        return [members for members in clusters.values() if len(members) > 1]
+
+    def save(self, path: str):
+        """Persist the index to disk"""
+        state = {
+            'params': {
+                'num_perm': self.num_perm,
+                'bands': self.bands,
+                'shingle_size': self.shingle_size,
+                'threshold': self.threshold,
+                'seed': self.seed,
+            },
+            'signatures': self._signatures,
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReviewMinHashIndex':
+        """Load an index previously written with save()"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+
+        index = cls(**state['params'])
+        for key, signature in state['signatures'].items():
+            index._signatures[key] = signature
+            for band, band_key in zip(index._buckets, index._band_keys(signature)):
+                band.setdefault(band_key, set()).add(key)
+
+        return index
+
+
+# Usage example
+if __name__ == "__main__":
+    index = ReviewMinHashIndex()
+
+    farm_reviews = [
+        "This app is really great and helped me send money to my family quickly",
+        "This app is really great and it helped me send money to my family quickly",
+        "Really great app, helped me send money to my family quickly",
+    ]
+
+    signatures = [index.signature(text) for text in farm_reviews]
+    print(f"Clusters within app: {index.find_clusters(signatures)}")
+
+    for text, signature in zip(farm_reviews, signatures):
+        index.add("com.fake.one", text, signature)
+
+    other = index.signature("This app is really great and helped me send money to my family fast")
+    print(f"Apps sharing this template: {index.query(other, exclude_app='com.fake.two')}")
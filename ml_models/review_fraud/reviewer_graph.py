@@ -0,0 +1,228 @@
+import pickle
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+
+
+class ReviewerGraph:
+    """
+    Incremental reviewer-app bipartite graph
+
+    Reviewers and apps are mapped to dense integer IDs and each node keeps its
+    neighbours in a compact unsigned-int array, so millions of edges fit in
+    memory. Used to surface groups of accounts that review the same set of
+    suspicious apps (review farms).
+    """
+
+    def __init__(self):
+        self._reviewer_ids: Dict[str, int] = {}
+        self._app_ids: Dict[str, int] = {}
+        self._reviewer_names: List[str] = []
+        self._app_names: List[str] = []
+
+        # Adjacency arrays indexed by integer ID
+        self._reviewer_apps: List[array] = []
+        self._app_reviewers: List[array] = []
+
+        self.edge_count = 0
+
+    def _reviewer_id(self, author: str) -> int:
+        reviewer_id = self._reviewer_ids.get(author)
+        if reviewer_id is None:
+            reviewer_id = len(self._reviewer_names)
+            self._reviewer_ids[author] = reviewer_id
+            self._reviewer_names.append(author)
+            self._reviewer_apps.append(array('I'))
+        return reviewer_id
+
+    def _app_id(self, package_id: str) -> int:
+        app_id = self._app_ids.get(package_id)
+        if app_id is None:
+            app_id = len(self._app_names)
+            self._app_ids[package_id] = app_id
+            self._app_names.append(package_id)
+            self._app_reviewers.append(array('I'))
+        return app_id
+
+    def add_edge(self, author: str, package_id: str) -> bool:
+        """
+        Record that a reviewer reviewed an app
+        Returns False if the edge already existed
+        """
+        reviewer_id = self._reviewer_id(author)
+        app_id = self._app_id(package_id)
+
+        # Reviewers touch few apps, so a linear scan of their array is cheap
+        apps = self._reviewer_apps[reviewer_id]
+        if app_id in apps:
+            return False
+
+        apps.append(app_id)
+        self._app_reviewers[app_id].append(reviewer_id)
+        self.edge_count += 1
+        return True
+
+    def add_reviews(self, package_id: str, reviews: List[Dict]) -> int:
+        """
+        Add reviews collected for an app (PlayStoreCollector.get_app_reviews format)
+        Returns number of new edges
+        """
+        added = 0
+        for review in reviews:
+            author = review.get('author')
+            if author and self.add_edge(author, package_id):
+                added += 1
+        return added
+
+    def apps_for_reviewer(self, author: str) -> List[str]:
+        """Get apps reviewed by a reviewer"""
+        reviewer_id = self._reviewer_ids.get(author)
+        if reviewer_id is None:
+            return []
+        return [self._app_names[a] for a in self._reviewer_apps[reviewer_id]]
+
+    def reviewers_for_app(self, package_id: str) -> List[str]:
+        """Get reviewers of an app"""
+        app_id = self._app_ids.get(package_id)
+        if app_id is None:
+            return []
+        return [self._reviewer_names[r] for r in self._app_reviewers[app_id]]
+
+    def related_apps(self, package_id: str, min_shared: int = 2) -> List[Dict]:
+        """
+        Find apps sharing reviewers with the given app
+        Returns [{'package_id', 'shared_reviewers'}] sorted by overlap
+        """
+        app_id = self._app_ids.get(package_id)
+        if app_id is None:
+            return []
+
+        shared: Dict[int, int] = {}
+        for reviewer_id in self._app_reviewers[app_id]:
+            for other in self._reviewer_apps[reviewer_id]:
+                if other != app_id:
+                    shared[other] = shared.get(other, 0) + 1
+
+        related = [
+            {'package_id': self._app_names[other], 'shared_reviewers': count}
+            for other, count in shared.items() if count >= min_shared
+        ]
+        related.sort(key=lambda x: x['shared_reviewers'], reverse=True)
+
+        return related
+
+    def find_review_farms(self, suspicious_apps: Iterable[str], min_apps: int = 2,
+                          min_reviewers: int = 3, seed: Optional[int] = 42) -> List[Dict]:
+        """
+        Batch community detection over reviewers of suspicious apps
+
+        Reviewers that reviewed at least min_apps of the suspicious apps are
+        projected onto a reviewer-reviewer graph weighted by the number of
+        suspicious apps they share, then Louvain communities are computed.
+        Returns clusters sorted by size, each with reviewers, apps and density
+        """
+        suspicious_ids: Set[int] = {
+            self._app_ids[package_id] for package_id in suspicious_apps
+            if package_id in self._app_ids
+        }
+        if not suspicious_ids:
+            return []
+
+        # Suspicious apps reviewed by each candidate reviewer
+        reviewer_apps: Dict[int, List[int]] = {}
+        for app_id in suspicious_ids:
+            for reviewer_id in self._app_reviewers[app_id]:
+                reviewer_apps.setdefault(reviewer_id, []).append(app_id)
+        reviewer_apps = {r: apps for r, apps in reviewer_apps.items() if len(apps) >= min_apps}
+
+        app_members: Dict[int, List[int]] = {}
+        for reviewer_id, apps in reviewer_apps.items():
+            for app_id in apps:
+                app_members.setdefault(app_id, []).append(reviewer_id)
+
+        shared: Dict[Tuple[int, int], int] = {}
+        for members in app_members.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pair = (first, second) if first < second else (second, first)
+                    shared[pair] = shared.get(pair, 0) + 1
+
+        graph = nx.Graph()
+        for (first, second), weight in shared.items():
+            if weight >= min_apps:
+                graph.add_edge(first, second, weight=weight)
+
+        if graph.number_of_edges() == 0:
+            return []
+
+        communities = nx.algorithms.community.louvain_communities(graph, weight='weight', seed=seed)
+
+        farms = []
+        for community in communities:
+            if len(community) < min_reviewers:
+                continue
+
+            # Apps reviewed by at least min_reviewers accounts of the cluster
+            app_counts: Dict[int, int] = {}
+            for reviewer_id in community:
+                for app_id in reviewer_apps[reviewer_id]:
+                    app_counts[app_id] = app_counts.get(app_id, 0) + 1
+            app_ids = [a for a, count in app_counts.items() if count >= min_reviewers]
+
+            if len(app_ids) < min_apps:
+                continue
+
+            edges = sum(app_counts[a] for a in app_ids)
+            farms.append({
+                'reviewers': sorted(self._reviewer_names[r] for r in community),
+                'apps': sorted(self._app_names[a] for a in app_ids),
+                'density': round(edges / (len(community) * len(app_ids)), 4),
+            })
+
+        farms.sort(key=lambda x: (len(x['reviewers']), x['density']), reverse=True)
+
+        return farms
+
+    def save(self, path: str):
+        """Persist the graph to disk"""
+        with open(path, 'wb') as f:
+            pickle.dump({
+                'reviewers': self._reviewer_names,
+                'apps': self._app_names,
+                'reviewer_apps': self._reviewer_apps,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReviewerGraph':
+        """Load a graph previously written with save()"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+
+        graph = cls()
+        for package_id in state['apps']:
+            graph._app_id(package_id)
+        for author, apps in zip(state['reviewers'], state['reviewer_apps']):
+            reviewer_id = graph._reviewer_id(author)
+            graph._reviewer_apps[reviewer_id] = apps
+            for app_id in apps:
+                graph._app_reviewers[app_id].append(reviewer_id)
+            graph.edge_count += len(apps)
+
+        return graph
+
+
+# Usage example
+if __name__ == "__main__":
+    graph = ReviewerGraph()
+
+    farm = [f"farm_account_{i}" for i in range(6)]
+    for package_id in ["com.paypa1.wallet", "com.whatsap.plus", "com.phonepe.pro"]:
+        graph.add_reviews(package_id, [{'author': author} for author in farm])
+        graph.add_reviews(package_id, [{'author': f"{package_id}_user_{i}"} for i in range(4)])
+
+    print(f"Edges: {graph.edge_count}")
+    print(f"Related to com.paypa1.wallet: {graph.related_apps('com.paypa1.wallet')}")
+
+    for farm_cluster in graph.find_review_farms(["com.paypa1.wallet", "com.whatsap.plus", "com.phonepe.pro"]):
+        print(f"Farm: {len(farm_cluster['reviewers'])} reviewers across {farm_cluster['apps']}")
@@ -1,9 +1,81 @@
+from collections import Counter
 from difflib import SequenceMatcher
+from functools import lru_cache
 from fuzzywuzzy import fuzz
 import Levenshtein
 import re
 from typing import List, Tuple
 
+from ml_models.text_similarity.homoglyph_index import CHAR_SUBSTITUTIONS, skeleton
+
+
+_PREFIX = re.compile(r'^(the|app|official|real|new|pro|plus|lite)\s+')
+_SUFFIX = re.compile(r'\s+(app|application|apk|free|pro|plus|lite|beta)$')
+_NON_ALNUM = re.compile(r'[^a-z0-9]')
+
+# q-gram size of the Levenshtein lower bound
+QGRAM = 2
+
+# fuzz ratios are rounded to whole percents, bounds get that much slack
+_ROUNDING_SLACK = 0.005
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(text: str) -> str:
+    """Lowercase alphanumerics without common prefix/suffix words (memoized)"""
+    text = text.lower()
+    text = _PREFIX.sub('', text)
+    text = _SUFFIX.sub('', text)
+    return _NON_ALNUM.sub('', text)
+
+
+def _qgrams(text: str) -> Counter:
+    return Counter(text[i:i + QGRAM] for i in range(len(text) - QGRAM + 1))
+
+
+class BrandProfile:
+    """
+    A name with everything compare_names needs precomputed once:
+    normalized form, skeleton, character multiset and q-grams
+    """
+
+    __slots__ = ('name', 'normalized', 'skeleton', 'length', 'chars', 'qgrams')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.normalized = normalize_name(name)
+        self.skeleton = skeleton(name)
+        self.length = len(self.normalized)
+        self.chars = Counter(self.normalized)
+        self.qgrams = _qgrams(self.normalized)
+
+    def max_combined_score(self, other: 'BrandProfile') -> float:
+        """
+        Upper bound of the weighted metric score in compare_names
+        Matched characters never exceed the shared character multiset, and
+        the q-gram lemma bounds the edit distance from below
+        """
+        la, lb = self.length, other.length
+        if not la or not lb:
+            return 1.0 if la == lb else 0.0
+
+        common = sum((self.chars & other.chars).values())
+        longest = max(la, lb)
+
+        shared_qgrams = sum((self.qgrams & other.qgrams).values())
+        max_qgrams = max(sum(self.qgrams.values()), sum(other.qgrams.values()))
+        min_distance = max(longest - common, -(-(max_qgrams - shared_qgrams) // QGRAM))
+
+        levenshtein = 1 - min_distance / longest
+        ratio = 2 * common / (la + lb) + _ROUNDING_SLACK
+        partial = min(1.0, common / min(la, lb)) + _ROUNDING_SLACK
+        return 0.30 * levenshtein + 0.30 * ratio + 0.20 * partial + 0.20 * ratio
+
+
+@lru_cache(maxsize=65536)
+def _candidate_profile(name: str) -> BrandProfile:
+    return BrandProfile(name)
+
 
 class TextSimilarityDetector:
     """Detect similar app names and package IDs"""
@@ -12,28 +84,15 @@ class TextSimilarityDetector:
         self.threshold = threshold
         
         # Common typosquatting patterns
-        self.char_substitutions = {
-            'o': ['0', 'ο', 'о'],  # o, zero, greek omicron, cyrillic o
-            'a': ['α', 'а'],       # a, alpha, cyrillic a
-            'i': ['1', 'l', 'ı'],  # i, one, lowercase L, dotless i
-            'e': ['ε', 'е'],       # e, epsilon, cyrillic e
-            'm': ['rn'],           # m vs rn
-            'w': ['vv'],           # w vs double v
-        }
+        self.char_substitutions = {char: list(subs) for char, subs in CHAR_SUBSTITUTIONS.items()}
     
     def normalize_text(self, text):
         """Normalize text for comparison"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove common prefixes/suffixes
-        text = re.sub(r'^(the|app|official|real|new|pro|plus|lite)\s+', '', text)
-        text = re.sub(r'\s+(app|application|apk|free|pro|plus|lite|beta)$', '', text)
-        
-        # Remove special characters
-        text = re.sub(r'[^a-z0-9]', '', text)
-        
-        return text
+        return normalize_name(text)
+    
+    def profile(self, name):
+        """Precompute a brand name once for many comparisons"""
+        return BrandProfile(name)
     
     def levenshtein_similarity(self, str1, str2):
         """Calculate Levenshtein distance-based similarity"""
@@ -94,14 +153,17 @@ class TextSimilarityDetector:
         
         return score, reasons
     
-    def compare_names(self, legitimate_name, suspicious_name):
+    def compare_names(self, legitimate_name, suspicious_name, min_score=None):
         """
         Compare two app names using multiple algorithms
+        legitimate_name may be a BrandProfile to skip re-normalizing it
+        With min_score, pairs that cannot reach it skip the metrics and score 0.0
         Returns (similarity_score, reasons)
         """
-        # Normalize both names
-        norm_legit = self.normalize_text(legitimate_name)
-        norm_susp = self.normalize_text(suspicious_name)
+        legit = legitimate_name if isinstance(legitimate_name, BrandProfile) else BrandProfile(legitimate_name)
+        susp = _candidate_profile(suspicious_name)
+        norm_legit = legit.normalized
+        norm_susp = susp.normalized
         
         reasons = []
         
@@ -109,11 +171,22 @@ class TextSimilarityDetector:
         if norm_legit == norm_susp:
             return 1.0, ["Exact match after normalization"]
         
+        # Lookalike characters (Cyrillic/Greek letters, fullwidth forms, 0/o, rn/m)
+        # are folded away by the skeleton, normalize_text would drop them instead
+        if legit.skeleton == susp.skeleton:
+            return 0.95, ["Homoglyph match: name looks identical to the legitimate name"]
+        
         # Check for typosquatting
         typo_score, typo_reasons = self.detect_typosquatting(norm_legit, norm_susp)
         if typo_score > 0:
             return typo_score, typo_reasons
         
+        # Length and q-gram filters: skip the metrics when even their upper
+        # bound (or the containment floor) stays below min_score
+        contained = norm_legit in norm_susp or norm_susp in norm_legit
+        if min_score is not None and not contained and legit.max_combined_score(susp) < min_score:
+            return 0.0, []
+        
         # Calculate various similarity metrics
         levenshtein = self.levenshtein_similarity(norm_legit, norm_susp)
         fuzzy = self.fuzzy_ratio(norm_legit, norm_susp)
@@ -137,7 +210,7 @@ class TextSimilarityDetector:
             reasons.append(f"Strong partial match: {partial_fuzzy:.2%}")
         
         # Check for substring containment
-        if norm_legit in norm_susp or norm_susp in norm_legit:
+        if contained:
             combined_score = max(combined_score, 0.80)
             reasons.append("One name contains the other")
         
@@ -178,16 +251,19 @@ class TextSimilarityDetector:
         
         return round(avg_score, 4), reasons
     
-    def batch_compare(self, legitimate_name, suspicious_names):
+    def batch_compare(self, legitimate_name, suspicious_names, min_score=None):
         """
         Compare one legitimate name against multiple suspicious names
+        With min_score, names scoring below it are left out
         Returns list of (name, score, reasons) tuples
         """
         results = []
+        profile = legitimate_name if isinstance(legitimate_name, BrandProfile) else self.profile(legitimate_name)
         
         for susp_name in suspicious_names:
-            score, reasons = self.compare_names(legitimate_name, susp_name)
-            results.append((susp_name, score, reasons))
+            score, reasons = self.compare_names(profile, susp_name, min_score=min_score)
+            if min_score is None or score >= min_score:
+                results.append((susp_name, score, reasons))
         
         # Sort by similarity (highest first)
         results.sort(key=lambda x: x[1], reverse=True)
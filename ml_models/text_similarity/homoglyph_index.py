@@ -0,0 +1,238 @@
+import pickle
+import re
+import unicodedata
+from typing import Dict, Hashable, List, Optional, Set
+
+
+# Common typosquatting patterns (TextSimilarityDetector.char_substitutions)
+CHAR_SUBSTITUTIONS = {
+    'o': ['0', 'ο', 'о'],  # o, zero, greek omicron, cyrillic o
+    'a': ['α', 'а'],       # a, alpha, cyrillic a
+    'i': ['1', 'l', 'ı'],  # i, one, lowercase L, dotless i
+    'e': ['ε', 'е'],       # e, epsilon, cyrillic e
+    'm': ['rn'],           # m vs rn
+    'w': ['vv'],           # w vs double v
+}
+
+
+# Non-Latin letters that render like Latin ones (subset of Unicode TR39
+# confusables covering Cyrillic, Greek and Armenian lookalikes seen in clones)
+CONFUSABLES = {
+    # Cyrillic
+    'а': 'a', 'в': 'b', 'с': 'c', 'ԁ': 'd', 'е': 'e', 'ё': 'e', 'һ': 'h', 'і': 'i', 'ї': 'i',
+    'ј': 'j', 'к': 'k', 'ӏ': 'l', 'м': 'm', 'н': 'h', 'о': 'o', 'р': 'p', 'ԛ': 'q', 'г': 'r',
+    'ѕ': 's', 'т': 't', 'ц': 'u', 'ѵ': 'v', 'ԝ': 'w', 'х': 'x', 'у': 'y', 'з': '3',
+    # Greek
+    'α': 'a', 'β': 'b', 'ϲ': 'c', 'ε': 'e', 'η': 'n', 'ι': 'i', 'κ': 'k', 'ν': 'v', 'ο': 'o',
+    'ρ': 'p', 'τ': 't', 'υ': 'u', 'χ': 'x', 'γ': 'y', 'ω': 'w', 'ϳ': 'j',
+    # Armenian
+    'օ': 'o', 'ս': 'u', 'ց': 'g', 'հ': 'h', 'ո': 'n',
+    # Latin lookalikes NFKC does not fold
+    'ı': 'i', 'ȷ': 'j', 'ɑ': 'a', 'ɡ': 'g', 'ɩ': 'i', 'ʟ': 'l', 'ß': 'ss', 'ø': 'o', 'ł': 'l', 'đ': 'd',
+}
+
+# Words clones add around the brand name ("PayPal Official", "New PayPal App")
+AFFIX_WORDS = frozenset([
+    'the', 'app', 'application', 'apk', 'official', 'real', 'new', 'pro', 'plus', 'lite',
+    'free', 'beta', 'update', 'premium', 'secure', 'verified', 'original', 'latest', 'mod', 'gold',
+])
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]')
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+def _build_substitutions():
+    # Every member of a substitution class folds to the same prototype
+    multi_char, single_char = [], {}
+    for prototype, substitutes in CHAR_SUBSTITUTIONS.items():
+        for substitute in substitutes:
+            folded = ''.join(CONFUSABLES.get(c, c) for c in substitute)
+            if len(folded) > 1:
+                multi_char.append((folded, prototype))
+            elif folded != prototype:
+                single_char[folded] = prototype
+    return multi_char, str.maketrans(single_char)
+
+
+_MULTI_CHAR, _SINGLE_CHAR = _build_substitutions()
+
+
+def skeleton(text: str) -> str:
+    """
+    Confusable-folded form of a name: two names that look alike share a skeleton
+    NFKC (fullwidth, math letters), case folding, confusables, accents removed,
+    then the typosquat substitution table ('rn' -> 'm', '0' -> 'o', 'l' -> 'i')
+    """
+    if not text:
+        return ''
+
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ''.join(CONFUSABLES.get(c, c) for c in text)
+    text = ''.join(c for c in unicodedata.normalize('NFD', text) if not unicodedata.combining(c))
+    text = _NON_ALNUM.sub('', text)
+
+    for substitute, prototype in _MULTI_CHAR:
+        text = text.replace(substitute, prototype)
+    return text.translate(_SINGLE_CHAR)
+
+
+def strip_affixes(name: str) -> str:
+    """Name without leading/trailing affix words ("New PayPal App" -> "paypal")"""
+    tokens = _TOKEN.findall(unicodedata.normalize('NFKC', name or '').casefold())
+    while tokens and skeleton(tokens[0]) in _AFFIX_SKELETONS:
+        tokens.pop(0)
+    while tokens and skeleton(tokens[-1]) in _AFFIX_SKELETONS:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def skeleton_keys(name: str) -> Set[str]:
+    """Skeletons a listing is indexed under: full name and name without affix words"""
+    keys = {skeleton(name), skeleton(strip_affixes(name))}
+    keys.discard('')
+    return keys
+
+
+def _literal(name: str) -> str:
+    # Case-folded ASCII letters and digits only, no NFKC: fullwidth or math
+    # letters stay distinct from the brand's own spelling
+    return _NON_ALNUM.sub('', (name or '').casefold())
+
+
+_AFFIX_SKELETONS = frozenset(skeleton(word) for word in AFFIX_WORDS)
+
+
+class HomoglyphIndex:
+    """
+    Skeleton index of brand names and listing names
+    Every listing that looks like a brand name is found with one dict lookup
+    instead of comparing each listing against each brand
+    """
+
+    def __init__(self):
+        self._brands: Dict[Hashable, Dict] = {}
+        self._brand_skeletons: Dict[str, Set[Hashable]] = {}
+        self._listings: Dict[Hashable, Dict] = {}
+        self._listing_skeletons: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def add_brand(self, brand_id: Hashable, names: List[str]):
+        """Index a brand under the skeletons of its name(s), replacing earlier names"""
+        self.remove_brand(brand_id)
+        skeletons = {skeleton(name) for name in names if name} - {''}
+        self._brands[brand_id] = {'names': list(names), 'skeletons': skeletons}
+        for key in skeletons:
+            self._brand_skeletons.setdefault(key, set()).add(brand_id)
+
+    def remove_brand(self, brand_id: Hashable):
+        brand = self._brands.pop(brand_id, None)
+        if brand:
+            for key in brand['skeletons']:
+                self._brand_skeletons.get(key, set()).discard(brand_id)
+
+    def add_listing(self, listing_id: Hashable, name: str):
+        """Index a listing (e.g. by package ID), replacing an earlier name"""
+        self.remove_listing(listing_id)
+        keys = skeleton_keys(name)
+        self._listings[listing_id] = {'name': name, 'keys': keys}
+        for key in keys:
+            self._listing_skeletons.setdefault(key, set()).add(listing_id)
+
+    def remove_listing(self, listing_id: Hashable):
+        listing = self._listings.pop(listing_id, None)
+        if listing:
+            for key in listing['keys']:
+                self._listing_skeletons.get(key, set()).discard(listing_id)
+
+    def brands_for_name(self, name: str) -> Set[Hashable]:
+        """Brands a name is a lookalike of (or identical to)"""
+        brand_ids = set()
+        for key in skeleton_keys(name):
+            brand_ids |= self._brand_skeletons.get(key, set())
+        return brand_ids
+
+    def name_match(self, brand_id: Hashable, name: str) -> Optional[str]:
+        """
+        How a name imitates a brand name:
+        'exact'     one of the brand's names (ignoring case)
+        'spacing'   the same letters with other spacing or punctuation ("Pay Pal")
+        'affix'     the brand name plus affix words ("PayPal Official")
+        'homoglyph' confusable or fullwidth characters ("PayPaI", "РayPal", "PayPa1 App")
+        None when the name doesn't fold to the brand's skeleton
+        """
+        brand = self._brands.get(brand_id)
+        if not brand or not name:
+            return None
+
+        literals = {_literal(n) for n in brand['names']}
+        if skeleton(name) in brand['skeletons']:
+            if any(n.casefold() == name.casefold() for n in brand['names']):
+                return 'exact'
+            return 'spacing' if _literal(name) in literals else 'homoglyph'
+
+        stripped = strip_affixes(name)
+        if skeleton(stripped) in brand['skeletons']:
+            literal = _literal(name)
+            return 'affix' if any(l and l in literal for l in literals) else 'homoglyph'
+        return None
+
+    def is_homoglyph(self, brand_id: Hashable, name: str) -> bool:
+        """True when name only looks like the brand through confusable characters"""
+        return self.name_match(brand_id, name) == 'homoglyph'
+
+    def find_clones(self, brand_id: Hashable, include_exact: bool = False) -> List[Dict]:
+        """Every indexed listing whose name folds to one of the brand's skeletons, with its name_match"""
+        brand = self._brands.get(brand_id)
+        if not brand:
+            return []
+
+        clones = []
+        listing_ids = set()
+        for key in brand['skeletons']:
+            listing_ids |= self._listing_skeletons.get(key, set())
+
+        for listing_id in listing_ids:
+            name = self._listings[listing_id]['name']
+            match = self.name_match(brand_id, name)
+            if match != 'exact' or include_exact:
+                clones.append({'listing_id': listing_id, 'name': name, 'match': match,
+                               'homoglyph': match == 'homoglyph'})
+        return clones
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(self.__dict__, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'HomoglyphIndex':
+        index = cls()
+        with open(path, 'rb') as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+
+# Usage example
+if __name__ == "__main__":
+    index = HomoglyphIndex()
+    index.add_brand(1, ["PayPal"])
+
+    listings = {
+        'com.paypal.android.p2pmobile': "PayPal",
+        'com.paypa1.wallet': "PayPaI Wallet",
+        'com.fake.cyrillic': "РayPal",  # Cyrillic Р
+        'com.fake.fullwidth': "ＰａｙＰａｌ Official",
+        'com.fake.spaced': "Pay Pal",
+        'com.fake.affix': "New PayPal App",
+        'com.unrelated': "Venmo",
+    }
+    for package_id, name in listings.items():
+        index.add_listing(package_id, name)
+
+    for name in listings.values():
+        print(f"{name!r:28} skeleton={skeleton(name)!r:16} keys={sorted(skeleton_keys(name))}")
+
+    print("\nLookalikes of PayPal:")
+    for clone in index.find_clones(1):
+        print(f"  {clone['listing_id']}: {clone['name']} ({clone['match']})")
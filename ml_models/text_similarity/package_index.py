@@ -0,0 +1,194 @@
+import pickle
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import Levenshtein
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings with Levenshtein distance"""
+
+    def __init__(self):
+        self._root = None  # (word, {distance: child})
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str):
+        if self._root is None:
+            self._root = (word, {})
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = Levenshtein.distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """Every stored word within max_distance, pruned by the triangle inequality"""
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = Levenshtein.distance(word, candidate)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return matches
+
+
+class _TrieNode:
+    __slots__ = ('children', 'labels', 'packages')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.labels = BKTree()  # BK-tree over the keys of children
+        self.packages: Set[str] = set()  # package IDs ending at this node
+
+
+class PackageNamespaceIndex:
+    """
+    Reversed-domain trie of package IDs with a BK-tree per node
+    Finds every package whose components are each within edit distance k of
+    an official package ID (com.paypa1.android, com.paypal.andr0id, ...)
+    without comparing against every known package
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._packages: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    def __contains__(self, package_id: str) -> bool:
+        return package_id in self._packages
+
+    @staticmethod
+    def components(package_id: str) -> List[str]:
+        return [part for part in package_id.lower().split('.') if part]
+
+    def add(self, package_id: str):
+        node = self._root
+        for component in self.components(package_id):
+            child = node.children.get(component)
+            if child is None:
+                child = node.children[component] = _TrieNode()
+                node.labels.add(component)
+            node = child
+        node.packages.add(package_id)
+        self._packages.add(package_id)
+
+    def remove(self, package_id: str):
+        # Trie labels stay (BK-trees have no delete); empty branches yield nothing
+        node = self._root
+        for component in self.components(package_id):
+            node = node.children.get(component)
+            if node is None:
+                return
+        node.packages.discard(package_id)
+        self._packages.discard(package_id)
+
+    def _subtree(self, node: _TrieNode) -> Iterator[str]:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield from node.packages
+            stack.extend(node.children.values())
+
+    def find_similar(self, package_id: str, max_distance: int = 1, max_total: Optional[int] = None,
+                     namespace_depth: Optional[int] = None, include_exact: bool = False) -> List[Dict]:
+        """
+        Packages within max_distance edits on every component (max_total edits overall)
+        With namespace_depth, only the first components must match and everything
+        under a matching namespace is returned: namespace_depth=2 on
+        com.paypal.android finds com.paypa1.* at any depth, and other packages
+        under com.paypal itself at distance 0. Only the queried package is
+        left out unless include_exact
+        Returns [{'package_id', 'distance', 'namespace'}] sorted by distance
+        """
+        query = self.components(package_id)
+        depth = min(namespace_depth or len(query), len(query))
+        max_total = max_distance if max_total is None else max_total
+
+        results = {}
+        stack = [(self._root, 0, 0, [])]
+        while stack:
+            node, level, total, path = stack.pop()
+
+            if level == depth:
+                namespace = '.'.join(path)
+                packages = self._subtree(node) if namespace_depth else node.packages
+                for match in packages:
+                    # Distance 0 under a namespace is another package in the official namespace
+                    exact = total == 0 and self.components(match) == query
+                    if (include_exact or not exact) and (match not in results or total < results[match]['distance']):
+                        results[match] = {'package_id': match, 'distance': total, 'namespace': namespace}
+                continue
+
+            radius = min(max_distance, max_total - total)
+            for label, distance in node.labels.search(query[level], radius):
+                stack.append((node.children[label], level + 1, total + distance, path + [label]))
+
+        return sorted(results.values(), key=lambda r: (r['distance'], r['package_id']))
+
+    def sweep(self, namespace: str) -> List[str]:
+        """Every package under an exact namespace ('com.paypa1' -> com.paypa1.*)"""
+        node = self._root
+        for component in self.components(namespace.rstrip('*').rstrip('.')):
+            node = node.children.get(component)
+            if node is None:
+                return []
+        return sorted(self._subtree(node))
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(self.__dict__, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'PackageNamespaceIndex':
+        index = cls()
+        with open(path, 'rb') as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+
+# Usage example
+if __name__ == "__main__":
+    index = PackageNamespaceIndex()
+    for package_id in [
+        "com.paypal.android.p2pmobile",
+        "com.paypa1.android.p2pmobile",
+        "com.paypal.andr0id.p2pmobile",
+        "com.paypa1.wallet",
+        "com.paypa1.wallet.pro",
+        "com.paypal.fakeapp",
+        "com.paypall.android.p2pmobile",
+        "com.venmo",
+        "org.paypal.android.p2pmobile",
+    ]:
+        index.add(package_id)
+
+    official = "com.paypal.android.p2pmobile"
+    print(f"Within 1 edit per component of {official}:")
+    for match in index.find_similar(official, max_distance=1):
+        print(f"  {match['package_id']} (distance {match['distance']})")
+
+    print(f"\nNamespaces within 1 edit of com.paypal, whole subtrees:")
+    for match in index.find_similar(official, max_distance=1, namespace_depth=2):
+        print(f"  {match['package_id']} (namespace {match['namespace']})")
+
+    print(f"\nSweep com.paypa1.*: {index.sweep('com.paypa1.*')}")
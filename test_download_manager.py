@@ -0,0 +1,127 @@
+"""
+Tests for the APK download manager against a local HTTP server
+"""
+import sys
+import os
+import hashlib
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from collectors.download_manager import APKDownloadManager
+
+PAYLOAD = os.urandom(300 * 1024)
+SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class APKHandler(BaseHTTPRequestHandler):
+    """
+    /resume.apk: the first transfer is cut off halfway, ranges are honoured
+    /norange.apk: Range is ignored, always 200 with the whole file
+    """
+    requests_seen = []
+
+    def do_GET(self):
+        range_header = self.headers.get('Range')
+        APKHandler.requests_seen.append((self.path, range_header))
+
+        if self.path == '/resume.apk' and range_header:
+            offset = int(range_header.split('=')[1].rstrip('-'))
+            body = PAYLOAD[offset:]
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {offset}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        first = sum(1 for path, _ in APKHandler.requests_seen if path == self.path) == 1
+        if self.path == '/resume.apk' and first:
+            # Truncated transfer: half the promised bytes, then the connection drops
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), APKHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _manager(**kwargs):
+    return APKDownloadManager(download_dir=tempfile.mkdtemp(prefix='test_downloads_'), timeout=5, **kwargs)
+
+
+def test_resumes_truncated_transfer_with_range():
+    server, base = _serve()
+    APKHandler.requests_seen = []
+    try:
+        result = _manager().download(f"{base}/resume.apk")
+    finally:
+        server.shutdown()
+
+    assert result['status'] == 'downloaded', result
+    assert result['resumed']
+    assert result['sha256'] == SHA256 and result['size'] == len(PAYLOAD)
+    with open(result['path'], 'rb') as f:
+        assert f.read() == PAYLOAD
+    # The retry asks for the rest from what reached disk before the drop
+    ranges = [range_header for _, range_header in APKHandler.requests_seen]
+    assert len(ranges) == 2 and ranges[0] is None
+    offset = int(ranges[1].split('=')[1].rstrip('-'))
+    assert 0 < offset <= len(PAYLOAD) // 2
+
+
+def test_restarts_when_server_ignores_range():
+    server, base = _serve()
+    APKHandler.requests_seen = []
+    manager = _manager()
+    url = f"{base}/norange.apk"
+
+    # A stale partial file from an earlier attempt makes the manager ask for a range
+    part_path = os.path.join(manager.download_dir, hashlib.sha1(url.encode()).hexdigest()) + '.part'
+    with open(part_path, 'wb') as f:
+        f.write(b'stale partial bytes')
+    try:
+        result = manager.download(url)
+    finally:
+        server.shutdown()
+
+    assert APKHandler.requests_seen == [('/norange.apk', 'bytes=19-')]
+    assert result['status'] == 'downloaded', result
+    assert not result['resumed']
+    assert result['sha256'] == SHA256 and result['size'] == len(PAYLOAD)
+    with open(result['path'], 'rb') as f:
+        assert f.read() == PAYLOAD
+
+
+def test_known_hash_is_reported_as_duplicate():
+    server, base = _serve()
+    manager = _manager(is_known_hash=lambda sha256: sha256 == SHA256)
+    try:
+        result = manager.download(f"{base}/norange.apk")
+        again = _manager().download(f"{base}/norange.apk", is_known_hash=lambda sha256: False)
+    finally:
+        server.shutdown()
+
+    assert result['status'] == 'duplicate' and result['sha256'] == SHA256
+    assert result['path'] is None
+    assert os.listdir(manager.download_dir) == []
+    assert again['status'] == 'downloaded'
+
+
+if __name__ == "__main__":
+    test_resumes_truncated_transfer_with_range()
+    test_restarts_when_server_ignores_range()
+    test_known_hash_is_reported_as_duplicate()
+    print("✅ ALL DOWNLOAD MANAGER TESTS PASSED")
@@ -0,0 +1,69 @@
+"""
+Tests for cross-source candidate resolution
+"""
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from utils.entity_resolution import CandidateResolver
+
+OFFICIAL = ['com.paypal.android']
+ICON = 'f0e1d2c3b4a59687'
+
+
+def test_same_app_merges_across_sources():
+    resolver = CandidateResolver(OFFICIAL)
+    play, _ = resolver.add('google_play', {'package_id': 'com.paypa1.wallet', 'app_name': 'PayPa1 Wallet',
+                                           'developer': 'Wallet Labs', 'icon_hash': ICON})
+    mirror, merged = resolver.add('apk_mirror', {'app_name': 'PayPa1 Wallet 2.1.0',
+                                                 'developer': 'Wallet Labs Inc.', 'icon_hash': ICON})
+
+    assert merged and mirror is play
+    assert len(resolver) == 1
+
+
+def test_shared_icon_alone_does_not_merge():
+    resolver = CandidateResolver()
+    resolver.add('google_play', {'package_id': 'com.paypa1.wallet', 'app_name': 'PayPa1 Wallet',
+                                 'developer': 'Wallet Labs', 'icon_hash': ICON})
+    _, merged = resolver.add('apk_mirror', {'app_name': 'Wallet Pro', 'developer': 'Other Dev', 'icon_hash': ICON})
+
+    assert not merged
+    assert len(resolver) == 2
+
+
+def test_fake_without_package_never_joins_official_app():
+    """A fake reusing the official icon, name and developer stays its own candidate"""
+    resolver = CandidateResolver(OFFICIAL)
+    official, _ = resolver.add('google_play', {'package_id': 'com.paypal.android', 'app_name': 'PayPal',
+                                               'developer': 'PayPal Inc.', 'icon_hash': ICON})
+    fake, merged = resolver.add('apk_mirror', {'app_name': 'PayPal Wallet Pro MOD',
+                                               'developer': 'PayPal Inc.', 'icon_hash': ICON})
+    copy, copy_merged = resolver.add('apk_pure', {'app_name': 'PayPal', 'developer': 'PayPal Inc.',
+                                                  'icon_hash': ICON})
+
+    assert not merged and not copy_merged
+    assert fake is not official and copy is not official
+    assert fake.package_id is None and copy.package_id is None
+    assert official.package_id == 'com.paypal.android'
+
+
+def test_official_listing_does_not_absorb_earlier_fake():
+    resolver = CandidateResolver(OFFICIAL)
+    fake, _ = resolver.add('apk_mirror', {'app_name': 'PayPal', 'developer': 'PayPal Inc.', 'icon_hash': ICON})
+    official, merged = resolver.add('google_play', {'package_id': 'com.paypal.android', 'app_name': 'PayPal',
+                                                    'developer': 'PayPal Inc.', 'icon_hash': ICON})
+
+    assert not merged and official is not fake
+    assert fake.package_id is None
+    assert resolver.unresolved() == [fake]
+
+
+if __name__ == "__main__":
+    test_same_app_merges_across_sources()
+    test_shared_icon_alone_does_not_merge()
+    test_fake_without_package_never_joins_official_app()
+    test_official_listing_does_not_absorb_earlier_fake()
+    print("✅ ALL ENTITY RESOLUTION TESTS PASSED")
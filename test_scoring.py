@@ -0,0 +1,114 @@
+"""
+Tests for detection confidence scoring
+"""
+import sys
+import os
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+# Throwaway database and indexes, set before the backend modules are imported
+_workdir = tempfile.mkdtemp(prefix='test_scoring_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ['REPLICA_DATABASE_URLS'] = ''
+os.environ['SCORING_CONFIG_PATH'] = os.path.join(_workdir, 'scoring_weights.json')
+os.environ['REVIEW_INDEX_PATH'] = os.path.join(_workdir, 'review_minhash.pkl')
+os.environ['REVIEWER_GRAPH_PATH'] = os.path.join(_workdir, 'reviewer_graph.pkl')
+
+from utils.scoring import DETECTION_THRESHOLD, ScoringEngine
+
+
+def test_unavailable_signal_is_left_out():
+    """A signal returning None drops out of the normalization"""
+    engine = ScoringEngine()
+    engine.add_signal('text', lambda: 0.6, cost=1)
+    engine.add_signal('certificate_mismatch', lambda: None, cost=2)
+    result = engine.evaluate()
+
+    assert result['confidence_score'] == 0.6
+    assert result['risk_level'] == 'LOW'
+    assert result['signals']['certificate_mismatch'] is None
+
+
+def test_certificate_mismatch_still_counts():
+    engine = ScoringEngine()
+    engine.add_signal('text', lambda: 0.6, cost=1)
+    engine.add_signal('certificate_mismatch', lambda: 1.0, cost=2)
+    result = engine.evaluate()
+
+    assert result['confidence_score'] == round((0.35 * 0.6 + 0.15) / 0.5, 4)
+    assert result['risk_level'] == 'MEDIUM'
+
+
+def test_text_only_app_without_certificate_is_not_detected():
+    """A partial name match with no certificate must not become a MEDIUM detection"""
+    from database import Base, SessionLocal, engine
+    from models.database_models import Brand, SuspiciousApp
+    from collectors.registry import get_collector
+    from tasks.scan_tasks import run_detection
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        brand = Brand(name="PayPal", package_ids=["com.paypal.android"], icon_urls=[],
+                      developer_name="PayPal Inc.", certificates=["AB:CD:EF:01"])
+        app = SuspiciousApp(package_id="com.example.paypro", app_name="PayPro", source="apk_mirror")
+        db.add_all([brand, app])
+        db.commit()
+
+        # APK site listing: no certificate, no APK and no reviews
+        result = run_detection(db, brand, app, {'app_name': app.app_name}, get_collector('apk_mirror'))
+
+        assert result['text_similarity'] < DETECTION_THRESHOLD
+        assert result['confidence_score'] == round(result['text_similarity'], 4)
+        assert result['confidence_score'] < DETECTION_THRESHOLD
+        assert result['risk_level'] == 'LOW'
+        assert not any('ertificate' in reason for reason in result['reasons'])
+    finally:
+        db.close()
+
+
+class _NoReviewsCollector:
+    """Store with reviews that has none yet for the app"""
+    source = 'play_store'
+
+    def has_capability(self, capability):
+        return capability == 'reviews'
+
+    def get_app_reviews(self, package_id, max_reviews=100, **kwargs):
+        return [], True
+
+
+def test_fresh_clone_without_reviews_is_detected():
+    """A homoglyph clone with no reviews yet scores on its name alone, as on an APK site"""
+    from database import Base, SessionLocal, engine
+    from models.database_models import Brand, SuspiciousApp
+    from tasks.scan_tasks import run_detection
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        brand = db.query(Brand).filter(Brand.name == "PayPal").first() or Brand(
+            name="PayPal", package_ids=["com.paypal.android"], icon_urls=[],
+            developer_name="PayPal Inc.", certificates=["AB:CD:EF:01"])
+        app = SuspiciousApp(package_id="com.example.paypai", app_name="PayPaI", source="play_store")
+        db.add_all([brand, app])
+        db.commit()
+
+        result = run_detection(db, brand, app, {'app_name': app.app_name}, _NoReviewsCollector())
+
+        assert result['confidence_score'] == round(result['text_similarity'], 4)
+        assert result['confidence_score'] >= DETECTION_THRESHOLD
+        assert result['review_fraud_score'] == 0.0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    test_unavailable_signal_is_left_out()
+    test_certificate_mismatch_still_counts()
+    test_text_only_app_without_certificate_is_not_detected()
+    test_fresh_clone_without_reviews_is_detected()
+    print("✅ ALL SCORING TESTS PASSED")